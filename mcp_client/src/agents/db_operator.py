@@ -15,15 +15,16 @@ Workflow Overview:
 """
 
 import asyncio, os
-from contextlib import AsyncExitStack
 from dotenv import load_dotenv
 from pathlib import Path
-from langchain_mcp_adapters.tools import load_mcp_tools
-from mcp import ClientSession, StdioServerParameters
-from mcp.client.stdio import stdio_client
+from mcp import StdioServerParameters
+from src.agents.server_manager import MCPServerManager, get_server_manager
+from src.agents.tool_cache import ToolCache
+from src.agents.tool_loader import ToolLoader
 from langchain_core.messages import HumanMessage
 # For OCI GenAI Service
 from langchain.agents import initialize_agent, Tool, AgentType
+from langgraph.prebuilt import create_react_agent
 from langchain_core.messages import AIMessage
 from src.llm.oci_genai import initialize_llm
 from src.prompt_engineering.topics.db_operator import promt_oracle_db_operator
@@ -77,8 +78,28 @@ tavily_server = StdioServerParameters(
     command="npx",
     args=["-y", "mcp-remote", TAVILY_MCP_SERVER])
 
+# Started together and kept connected by the server manager
+MCP_SERVERS = {"adb": adb_server, "tavily": tavily_server, "local_file": local_file_server}
+SERVER_LABELS = {
+    "adb": ("Oracle SQLCL MCP Server", "SQL tools"),
+    "tavily": ("Tavily MCP Server", "Tavily tools"),
+    "local_file": ("Local File Server MCP Server", "Local File Server tools"),
+}
+# Seconds to wait for each server's handshake and tools/list before starting a session without it;
+# MCP_CONNECT_TIMEOUT_<NAME> (e.g. MCP_CONNECT_TIMEOUT_ADB) overrides the default per server
+MCP_CONNECT_TIMEOUT = float(os.getenv("MCP_CONNECT_TIMEOUT", "60"))
+# Build tools from the on-disk tool schema cache and verify them in the background (MCP_TOOL_CACHE=0 disables)
+MCP_TOOL_CACHE = os.getenv("MCP_TOOL_CACHE", "1") != "0"
+MCP_CONNECT_TIMEOUTS = {name: float(os.environ[f"MCP_CONNECT_TIMEOUT_{name.upper()}"])
+                        for name in MCP_SERVERS if os.getenv(f"MCP_CONNECT_TIMEOUT_{name.upper()}")}
+
 # Global Auto-Approve flag (will be set dynamically)
 AUTO_APPROVE = 'N'  # Default to 'N'
+APPROVAL_LOCK = asyncio.Lock()
+
+# "structured": one tool call per LLM step (STRUCTURED_CHAT ReAct agent)
+# "graph": LangGraph ReAct agent; tool calls the model emits in one step run concurrently
+AGENT_MODE = os.getenv("DB_OPERATOR_AGENT_MODE", "structured").lower()
 
 from langchain_core.tools import StructuredTool
 from pydantic import BaseModel, Field
@@ -107,10 +128,12 @@ def user_confirmed_tool(tool):
         if AUTO_APPROVE == 'Y':
             approved = True
         else:
-            print(f"\n\033[93mA SQL query is about to be executed by the agent:\033[0m")
-            print(f"\033[97m{sql_query}\033[0m")
-            confirmation = await asyncio.to_thread(input, "ALLOW this SQL execution? (y/n): ")
-            approved = confirmation.lower() in {'y', 'yes'}
+            # Tool calls may run concurrently (graph mode); ask about one query at a time
+            async with APPROVAL_LOCK:
+                print(f"\n\033[93mA SQL query is about to be executed by the agent:\033[0m")
+                print(f"\033[97m{sql_query}\033[0m")
+                confirmation = await asyncio.to_thread(input, "ALLOW this SQL execution? (y/n): ")
+                approved = confirmation.lower() in {'y', 'yes'}
 
         if approved:
             payload = {
@@ -139,97 +162,110 @@ def user_confirmed_tool(tool):
 
 
 
-async def main() -> None:
-    async with AsyncExitStack() as stack:
-        adb_session = None  # Default in case connection fails
-
-        # Attempt SQLCL MCP connection
-        try:
-            adb_read, adb_write = await stack.enter_async_context(stdio_client(adb_server))
-            adb_session = await stack.enter_async_context(ClientSession(adb_read, adb_write))
-            await adb_session.initialize()
-        except Exception as conn_err:
-            print(f"\n❌ Could not connect to Oracle SQLCL MCP Server: {conn_err}")
-            print("⚠️  You can continue asking questions, but SQL tools will be unavailable.\n")
-
-        # Attempt Tavily MCP connection
-        try:
-            tavily_read, tavily_write = await stack.enter_async_context(stdio_client(tavily_server))
-            tavily_server_session = await stack.enter_async_context(ClientSession(tavily_read, tavily_write))
-            await tavily_server_session.initialize()
-        except Exception as tavily_conn_err:
-            print(f"\n❌ Could not connect to Tavily MCP Server: {tavily_conn_err}")
-            print("⚠️  You can continue asking questions, but Tavily tools will be unavailable.\n")
-
-        # Attempt Local File Server MCP connection
-        try:
-            local_file_read, local_file_write = await stack.enter_async_context(stdio_client(local_file_server))
-            local_file_session = await stack.enter_async_context(ClientSession(local_file_read, local_file_write))
-            await local_file_session.initialize()
-        except Exception as tavily_conn_err:
-            print(f"\n❌ Could not connect to Local File Server MCP Server: {tavily_conn_err}")
-            print("⚠️  You can continue asking questions, but Local File Server tools will be unavailable.\n")
-
-        try:
-            # Load tools
-            mcp_tools = []
-
-            # original_tools = [await load_mcp_tools(adb_session), await load_mcp_tools(tavily_server_session)]
-            if adb_session is not None:
-                mcp_tools.extend(await load_mcp_tools(adb_session))
-
-            if 'tavily_server_session' in locals() and tavily_server_session is not None:
-                mcp_tools.extend(await load_mcp_tools(tavily_server_session))
-
-            if 'local_file_session' in locals() and local_file_session is not None:
-                mcp_tools.extend(await load_mcp_tools(local_file_session))
-            
-            tools = []
-
-            def is_sql_tool(tool):
-                return any(kw in tool.name.lower() for kw in ["adb", "sql", "oracle"])
-
-            for t in mcp_tools:
-                if is_sql_tool(t):
-                    wrapped = user_confirmed_tool(t)
-                    wrapped.name = t.name  # overwrite name so "run-sqlcl" matches
-                    tools.append(wrapped)
-                else:
-                    tools.append(t)
+def is_sql_tool(tool):
+    return any(kw in tool.name.lower() for kw in ["adb", "sql", "oracle"])
+
+
+def register_mcp_tools(mcp_tools) -> list:
+    """MCP tools as agent tools; SQL tools ask for approval first."""
+    tools = []
+    for t in mcp_tools:
+        if is_sql_tool(t):
+            wrapped = user_confirmed_tool(t)
+            wrapped.name = t.name  # overwrite name so "run-sqlcl" matches
+            tools.append(wrapped)
+        else:
+            tools.append(t)
+    return tools
+
+
+def build_agent(tools):
+    if AGENT_MODE == "graph":
+        return create_react_agent(model, tools, prompt=promt_oracle_db_operator)
+    return initialize_agent(
+        tools=tools,
+        llm=model,
+        agent=AgentType.STRUCTURED_CHAT_ZERO_SHOT_REACT_DESCRIPTION,
+        handle_parsing_errors=True,
+        verbose=True,
+        agent_kwargs={"prefix": promt_oracle_db_operator},
+    )
+
 
+async def ask_graph_agent(agent, message_history) -> AIMessage | None:
+    """Run the LangGraph agent on the conversation; returns its final answer."""
+    answer = None
+    async for update in agent.astream({"messages": message_history}, stream_mode="updates"):
+        for state in update.values():
+            for msg in (state or {}).get("messages", []):
+                if isinstance(msg, AIMessage) and msg.tool_calls:
+                    names = [call["name"] for call in msg.tool_calls]
+                    print(f"🔧 Calling {len(names)} tool(s){' concurrently' if len(names) > 1 else ''}: {names}")
+                elif isinstance(msg, AIMessage):
+                    answer = msg
+    return answer
+
+
+async def run_agent_session(manager: MCPServerManager) -> None:
+    """One chat session; MCP servers stay connected in `manager` between sessions."""
+    # Handshakes and tools/list run concurrently; servers slower than their timeout join later
+    loader = ToolLoader(manager, MCP_CONNECT_TIMEOUTS, MCP_CONNECT_TIMEOUT,
+                        cache=ToolCache() if MCP_TOOL_CACHE else None)
+    server_tools = await loader.initial()
+    print(f"⏱  MCP startup:\n{loader.report()}")
+    for name in loader.pending():
+        label, tools_label = SERVER_LABELS[name]
+        print(f"\n⚠️  {label} is still starting; {tools_label} will be added once it is ready.")
+    for name, server in loader.servers.items():
+        if server.status == "failed":
+            label, tools_label = SERVER_LABELS[name]
+            print(f"\n❌ Could not connect to {label}: {server.error}")
+            print(f"⚠️  You can continue asking questions, but {tools_label} will be unavailable until it recovers.\n")
+
+    try:
+        # Load tools; they call through the manager, so they survive server restarts
+        def all_tools():
+            tools = register_mcp_tools([t for loaded in server_tools.values() for t in loaded])
             tools.append(run_python)  # Add your Python tool
             tools.append(_rag_agent_service)  # Add your RAG tool
+            return tools
+
+        tools = all_tools()
+
+        print(f"✅ Registered tools: {[t.name for t in tools]}")
+
+        # Prompt for auto-approval
+        global AUTO_APPROVE
+        print("Do you want to auto-approve all SQL executions without prompting each time? (y/n):")
+        confirmation = await asyncio.to_thread(input, "You: ")
+        AUTO_APPROVE = 'Y' if confirmation.lower() in {'y', 'yes'} else 'N'
 
-            print(f"✅ Registered tools: {[t.name for t in tools]}")
-
-            # Prompt for auto-approval
-            global AUTO_APPROVE
-            print("Do you want to auto-approve all SQL executions without prompting each time? (y/n):")
-            confirmation = await asyncio.to_thread(input, "You: ")
-            AUTO_APPROVE = 'Y' if confirmation.lower() in {'y', 'yes'} else 'N'
-
-            # Initialize agent
-            agent = initialize_agent(
-                tools=tools,
-                llm=model,
-                agent=AgentType.STRUCTURED_CHAT_ZERO_SHOT_REACT_DESCRIPTION,
-                handle_parsing_errors=True,
-                verbose=True,
-                agent_kwargs={"prefix": promt_oracle_db_operator},
-            )
-
-            message_history = []
-            print("Type a question (empty / 'exit' to quit):")
-            while True:
-                user_input = await asyncio.to_thread(input, "You: ")
-                if user_input.strip().lower() in {"exit", "quit"}:
-                    print("👋  Bye!")
-                    break
-
-                message_history.append(HumanMessage(content=user_input))
-                message_history = message_history[-30:]
-
-                try:
+        # Initialize agent
+        agent = build_agent(tools)
+
+        message_history = []
+        print("Type a question (empty / 'exit' to quit):")
+        while True:
+            user_input = await asyncio.to_thread(input, "You: ")
+            if user_input.strip().lower() in {"exit", "quit"}:
+                print("👋  Bye!")
+                break
+
+            # Register tools of servers that finished starting (or whose cached tools changed) since the last turn
+            late = loader.take_late()
+            if late:
+                server_tools.update(late)
+                agent = build_agent(all_tools())
+                for name, loaded in late.items():
+                    print(f"✅ {SERVER_LABELS[name][0]} ready; registered {[t.name for t in loaded]}")
+
+            message_history.append(HumanMessage(content=user_input))
+            message_history = message_history[-30:]
+
+            try:
+                if AGENT_MODE == "graph":
+                    msg = await ask_graph_agent(agent, message_history)
+                else:
                     ai_response = await agent.ainvoke({"input": message_history})
 
                     # Improved output extraction
@@ -241,25 +277,35 @@ async def main() -> None:
                     else:
                         msg = ai_response  # Fallback for other types
 
-                    # Now process and print
-                    if isinstance(msg, AIMessage):
-                        message_history.append(msg)
-                        print(f"AI: {msg.content}\n")
-                    elif isinstance(msg, str):
-                        ai_msg = AIMessage(content=msg)
-                        message_history.append(ai_msg)
-                        print(f"AI: {msg}\n")
-                    elif isinstance(msg, dict) and "content" in msg:
-                        # Handle if it's a dict with 'content' (e.g., parsed Final Answer)
-                        ai_msg = AIMessage(content=msg.get("content", "<<no content>>"))
-                        message_history.append(ai_msg)
-                        print(f"AI: {ai_msg.content}\n")
-                    else:
-                        print("AI: <<no response>>\n")  # Only fallback if truly nothing
-                except Exception as agent_err:
-                    print(f"⚠️  Agent failed to respond: {agent_err}")
-        except Exception as final_err:
-            print(f"\n❌ Unhandled error: {final_err}")
+                # Now process and print
+                if isinstance(msg, AIMessage):
+                    message_history.append(msg)
+                    print(f"AI: {msg.content}\n")
+                elif isinstance(msg, str):
+                    ai_msg = AIMessage(content=msg)
+                    message_history.append(ai_msg)
+                    print(f"AI: {msg}\n")
+                elif isinstance(msg, dict) and "content" in msg:
+                    # Handle if it's a dict with 'content' (e.g., parsed Final Answer)
+                    ai_msg = AIMessage(content=msg.get("content", "<<no content>>"))
+                    message_history.append(ai_msg)
+                    print(f"AI: {ai_msg.content}\n")
+                else:
+                    print("AI: <<no response>>\n")  # Only fallback if truly nothing
+            except Exception as agent_err:
+                print(f"⚠️  Agent failed to respond: {agent_err}")
+    except Exception as final_err:
+        print(f"\n❌ Unhandled error: {final_err}")
+    finally:
+        await loader.close()
+
+
+async def main() -> None:
+    manager = get_server_manager(MCP_SERVERS)
+    try:
+        await run_agent_session(manager)
+    finally:
+        await manager.stop()
 
 
 if __name__ == "__main__":
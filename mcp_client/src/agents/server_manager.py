@@ -0,0 +1,319 @@
+"""
+server_manager.py
+=================================
+==MCP Server Manager==
+=================================
+Keeps the agent's MCP servers connected for as long as the client process runs.
+
+- Every configured server (a stdio command, or the URL of a streamable-HTTP server) is
+  started concurrently in its own task, which owns the subprocess and ClientSession.
+- A health check pings each ready server; a server that crashed or stopped answering
+  is restarted with exponential backoff.
+- `manager.session(name)` returns a ManagedSession: a stand-in for ClientSession whose
+  calls always go to the server's current connection. Tools loaded through it
+  (load_mcp_tools) therefore survive restarts, and several agent sessions can share the
+  warm servers. Read-only requests (list_*, read_resource, ping) interrupted by a dropped
+  connection are retried once after the reconnect; tool calls are not, since the server
+  may already have run them (e.g. DML), and raise ServerUnavailable instead.
+
+Servers that must outlive the client process (e.g. across launches) can be run as
+streamable-HTTP servers and configured by URL.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from contextlib import AsyncExitStack
+from dataclasses import dataclass, field
+from typing import Any, Dict, Mapping
+
+import anyio
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+from mcp.client.streamable_http import streamablehttp_client
+from mcp.shared.exceptions import McpError
+from mcp.types import CONNECTION_CLOSED
+
+log = logging.getLogger(__name__)
+
+# Requests without side effects, safe to send again when the connection dropped mid-call
+_RETRYABLE_METHODS = {"send_ping", "read_resource", "get_prompt"}
+
+# A stdio server command, or the URL of a streamable-HTTP server
+ServerConfig = StdioServerParameters | str
+
+# Errors meaning the connection to the server is gone (as opposed to a failing tool call)
+CONNECTION_ERRORS = (anyio.ClosedResourceError, anyio.BrokenResourceError, anyio.EndOfStream,
+                     ConnectionError, EOFError)
+
+
+def is_connection_error(error: BaseException) -> bool:
+    if isinstance(error, McpError):
+        return error.error.code == CONNECTION_CLOSED
+    return isinstance(error, CONNECTION_ERRORS)
+
+
+class ServerUnavailable(RuntimeError):
+    """The server is not connected and did not (re)connect in time."""
+
+    def __init__(self, name: str, reason: str):
+        super().__init__(f"MCP server '{name}' is unavailable: {reason}")
+        self.name = name
+        self.reason = reason
+
+
+@dataclass
+class ManagedServer:
+    name: str
+    config: ServerConfig
+    status: str = "stopped"          # stopped | starting | ready | failed
+    session: ClientSession | None = None
+    error: str | None = None
+    restarts: int = 0
+    started_at: float | None = None  # when the current connection became ready
+    timings: Dict[str, float] = field(default_factory=dict)  # seconds per phase of the last connect
+    server_info: Dict[str, Any] = field(default_factory=dict)  # name/version from the initialize handshake
+    ready: asyncio.Event = field(default_factory=asyncio.Event)
+    lost: asyncio.Event = field(default_factory=asyncio.Event)
+    failed: asyncio.Event = field(default_factory=asyncio.Event)  # the current connection attempt failed
+    task: asyncio.Task | None = None
+
+
+class MCPServerManager:
+    """Starts, health-checks and restarts a set of MCP servers.
+
+    Args:
+        servers: name -> StdioServerParameters or streamable-HTTP URL
+        health_interval: Seconds between pings of each ready server
+        ping_timeout: Seconds a ping may take before the server counts as hung
+        max_backoff: Longest pause between restart attempts
+
+    Use as `async with MCPServerManager(...) as manager:`, or call start()/stop().
+
+    Env:
+        MCP_HEALTH_INTERVAL: Default health_interval (30)
+        MCP_PING_TIMEOUT: Default ping_timeout (10)
+    """
+
+    def __init__(self, servers: Mapping[str, ServerConfig], health_interval: float | None = None,
+                 ping_timeout: float | None = None, max_backoff: float = 60.0):
+        self.servers: Dict[str, ManagedServer] = {name: ManagedServer(name, config)
+                                                  for name, config in servers.items() if config}
+        self.health_interval = health_interval if health_interval is not None else float(
+            os.getenv("MCP_HEALTH_INTERVAL", "30"))
+        self.ping_timeout = ping_timeout if ping_timeout is not None else float(os.getenv("MCP_PING_TIMEOUT", "10"))
+        self.max_backoff = max_backoff
+        self.started: float | None = None
+        self._stopping = False
+
+    async def __aenter__(self) -> "MCPServerManager":
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+    # ─── lifecycle ────────────────────────────────────────────
+
+    def start(self) -> None:
+        """Launch every server concurrently; use wait_ready() to wait for the handshakes."""
+        self._stopping = False
+        self.started = self.started or time.monotonic()
+        for server in self.servers.values():
+            if server.task is None or server.task.done():
+                server.task = asyncio.create_task(self._run(server), name=f"mcp-server-{server.name}")
+
+    async def stop(self) -> None:
+        self._stopping = True
+        tasks = [s.task for s in self.servers.values() if s.task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for server in self.servers.values():
+            server.task = None
+            server.status = "stopped"
+        self.started = None
+
+    async def wait_ready(self, timeout: float | None = None) -> Dict[str, bool]:
+        """Wait up to `timeout` for all servers to connect; returns name -> ready."""
+        waits = {name: asyncio.create_task(s.ready.wait()) for name, s in self.servers.items()}
+        if waits:
+            _, pending = await asyncio.wait(waits.values(), timeout=timeout)
+            for task in pending:
+                task.cancel()
+        return {name: server.ready.is_set() for name, server in self.servers.items()}
+
+    async def wait_settled(self, name: str) -> bool:
+        """Wait until the server is ready (True) or its current connection attempt fails (False)."""
+        server = self.servers[name]
+        waits = {asyncio.create_task(server.ready.wait()), asyncio.create_task(server.failed.wait())}
+        _, pending = await asyncio.wait(waits, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+        return server.ready.is_set()
+
+    async def restart(self, name: str) -> None:
+        """Drop the server's current connection; its task reconnects."""
+        server = self.servers[name]
+        server.lost.set()
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: {
+                "status": s.status,
+                "restarts": s.restarts,
+                "uptime": round(time.monotonic() - s.started_at, 1) if s.started_at and s.status == "ready" else 0,
+                "timings": {phase: round(seconds, 3) for phase, seconds in s.timings.items()},
+                "error": s.error,
+            }
+            for name, s in self.servers.items()
+        }
+
+    async def _run(self, server: ManagedServer) -> None:
+        """Own one server: connect, serve until the connection is lost, reconnect with backoff."""
+        backoff = 1.0
+        while not self._stopping:
+            server.status = "starting"
+            server.lost.clear()
+            server.failed.clear()
+            try:
+                async with AsyncExitStack() as stack:
+                    session = await self._connect(stack, server)
+                    server.session = session
+                    server.status = "ready"
+                    server.error = None
+                    server.started_at = time.monotonic()
+                    server.ready.set()
+                    log.info("MCP server '%s' ready", server.name)
+                    backoff = 1.0
+                    await self._watch(server)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:  # subprocess/transport failures arrive as (grouped) exceptions
+                server.error = str(e) or type(e).__name__
+                server.failed.set()
+                log.warning("MCP server '%s' failed: %s", server.name, server.error)
+            finally:
+                server.session = None
+                server.ready.clear()
+                if self._stopping:
+                    server.status = "stopped"
+            if self._stopping:
+                return
+            server.status = "failed"
+            server.restarts += 1
+            log.info("Restarting MCP server '%s' in %.0fs", server.name, backoff)
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, self.max_backoff)
+
+    @staticmethod
+    async def _connect(stack: AsyncExitStack, server: ManagedServer) -> ClientSession:
+        launched = time.monotonic()
+        if isinstance(server.config, str):
+            read, write, _ = await stack.enter_async_context(streamablehttp_client(server.config))
+        else:
+            read, write = await stack.enter_async_context(stdio_client(server.config))
+        connected = time.monotonic()
+        session = await stack.enter_async_context(ClientSession(read, write))
+        result = await session.initialize()
+        server.server_info = {"name": result.serverInfo.name, "version": result.serverInfo.version}
+        server.timings = {"launch": connected - launched, "initialize": time.monotonic() - connected}
+        return session
+
+    async def _watch(self, server: ManagedServer) -> None:
+        """Return once the server stops answering pings or a caller reported it lost."""
+        while True:
+            try:
+                await asyncio.wait_for(server.lost.wait(), self.health_interval)
+                log.warning("MCP server '%s' connection lost", server.name)
+                return
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await asyncio.wait_for(server.session.send_ping(), self.ping_timeout)  # type: ignore[union-attr]
+            except Exception as e:
+                log.warning("MCP server '%s' failed its health check: %s", server.name,
+                            str(e) or type(e).__name__)
+                return
+
+    # ─── sessions ─────────────────────────────────────────────
+
+    async def get_session(self, name: str, timeout: float | None = None) -> ClientSession:
+        """The server's current ClientSession, waiting up to `timeout` for it to (re)connect."""
+        server = self.servers.get(name)
+        if server is None:
+            raise ServerUnavailable(name, "not configured")
+        if not server.ready.is_set():
+            try:
+                await asyncio.wait_for(server.ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                raise ServerUnavailable(name, server.error or server.status) from None
+        return server.session  # type: ignore[return-value]
+
+    def session(self, name: str, timeout: float = 60.0) -> "ManagedSession":
+        return ManagedSession(self, name, timeout)
+
+    async def call(self, name: str, method: str, *args, timeout: float = 60.0, **kwargs) -> Any:
+        """Call `ClientSession.<method>` on the server, reconnecting if the connection broke.
+
+        Read-only methods are retried once on the new connection. Others (call_tool) raise
+        ServerUnavailable, because the server may have run them before the connection dropped.
+        """
+        retryable = method in _RETRYABLE_METHODS or method.startswith("list_")
+        for attempt in range(2):
+            session = await self.get_session(name, timeout)
+            try:
+                return await getattr(session, method)(*args, **kwargs)
+            except Exception as e:
+                if not is_connection_error(e):
+                    raise
+                log.warning("MCP server '%s' dropped during %s; reconnecting", name, method)
+                server = self.servers[name]
+                if server.session is session:
+                    server.ready.clear()
+                    server.lost.set()
+                if attempt or not retryable:
+                    raise ServerUnavailable(name, f"connection lost during {method}; it was not retried "
+                                                  "and may or may not have completed") from e
+
+
+class ManagedSession:
+    """ClientSession stand-in routed through MCPServerManager (reconnects transparently)."""
+
+    def __init__(self, manager: MCPServerManager, name: str, timeout: float = 60.0):
+        self.manager = manager
+        self.name = name
+        self.timeout = timeout
+
+    async def initialize(self) -> None:
+        await self.manager.get_session(self.name, self.timeout)
+
+    async def list_tools(self, *args, **kwargs):
+        return await self.manager.call(self.name, "list_tools", *args, timeout=self.timeout, **kwargs)
+
+    async def call_tool(self, tool_name: str, arguments: dict[str, Any] | None = None, *args, **kwargs):
+        return await self.manager.call(self.name, "call_tool", tool_name, arguments, *args,
+                                       timeout=self.timeout, **kwargs)
+
+    async def send_ping(self):
+        return await self.manager.call(self.name, "send_ping", timeout=self.timeout)
+
+    def __getattr__(self, method: str):
+        async def forward(*args, **kwargs):
+            return await self.manager.call(self.name, method, *args, timeout=self.timeout, **kwargs)
+        return forward
+
+
+_manager: MCPServerManager | None = None
+
+
+def get_server_manager(servers: Mapping[str, ServerConfig] | None = None) -> MCPServerManager:
+    """Process-wide manager, created (and started) on first use so agent sessions share warm servers."""
+    global _manager
+    if _manager is None:
+        if servers is None:
+            raise RuntimeError("The first get_server_manager() call must pass the server configs")
+        _manager = MCPServerManager(servers)
+        _manager.start()
+    return _manager
@@ -0,0 +1,89 @@
+"""
+tool_cache.py
+=================================
+==MCP Tool Schema Cache==
+=================================
+Keeps each MCP server's tools/list result on disk so agents can build their tools
+before the server has even started.
+
+- Entries are keyed by the server command (command, args and cwd, or the URL).
+- Each entry records the server name/version from the initialize handshake and a hash
+  of the tool schemas. A cached entry is current while both still match what the
+  running server reports; ToolLoader checks this in the background.
+
+Env:
+    MCP_TOOL_CACHE_DIR: Where entries are stored (~/.cache/mcp_client/tools)
+"""
+
+import hashlib
+import json
+import logging
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List
+
+from mcp.types import Tool
+
+from src.agents.server_manager import ServerConfig
+
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class CachedTools:
+    server: Dict[str, Any]  # serverInfo from initialize: name, version
+    hash: str
+    tools: List[Tool]
+
+    def matches(self, server: Dict[str, Any], schema_hash: str) -> bool:
+        return self.server == server and self.hash == schema_hash
+
+
+class ToolCache:
+    def __init__(self, directory: str | Path | None = None):
+        self.directory = Path(directory or os.getenv("MCP_TOOL_CACHE_DIR")
+                              or Path.home() / ".cache" / "mcp_client" / "tools").expanduser()
+
+    @staticmethod
+    def server_key(config: ServerConfig) -> str:
+        if isinstance(config, str):
+            identity: Dict[str, Any] = {"url": config}
+        else:
+            identity = {"command": config.command, "args": config.args,
+                        "cwd": str(config.cwd) if config.cwd else None}
+        return hashlib.sha256(json.dumps(identity, sort_keys=True).encode()).hexdigest()[:24]
+
+    @staticmethod
+    def schema_hash(tools: List[Tool]) -> str:
+        schemas = [tool.model_dump(mode="json", exclude_none=True) for tool in tools]
+        return hashlib.sha256(json.dumps(schemas, sort_keys=True).encode()).hexdigest()
+
+    def path(self, config: ServerConfig) -> Path:
+        return self.directory / f"{self.server_key(config)}.json"
+
+    def load(self, config: ServerConfig) -> CachedTools | None:
+        try:
+            data = json.loads(self.path(config).read_text())
+            return CachedTools(data["server"], data["hash"], [Tool.model_validate(t) for t in data["tools"]])
+        except FileNotFoundError:
+            return None
+        except Exception as e:  # unreadable or from an incompatible version; it gets rewritten
+            log.warning("Ignoring tool cache entry %s: %s", self.path(config), e)
+            return None
+
+    def save(self, config: ServerConfig, server: Dict[str, Any], tools: List[Tool]) -> CachedTools:
+        entry = CachedTools(server, self.schema_hash(tools), tools)
+        path = self.path(config)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text(json.dumps({
+                "server": entry.server,
+                "hash": entry.hash,
+                "tools": [tool.model_dump(mode="json", exclude_none=True) for tool in tools],
+            }))
+            os.replace(tmp, path)
+        except OSError as e:
+            log.warning("Could not write tool cache entry %s: %s", path, e)
+        return entry
@@ -0,0 +1,180 @@
+"""
+tool_loader.py
+=================================
+==MCP Tool Loader==
+=================================
+Discovers the tools of every managed MCP server concurrently.
+
+- Each server's handshake and tools/list run in their own task, so startup takes as long
+  as the slowest server that is waited for, not the sum of all of them.
+- initial() waits for each server only up to its own timeout. Servers that are still
+  starting keep loading in the background; take_late() hands over their tools once
+  they arrive, so the agent can register them between turns.
+- report() prints a per-server timing breakdown.
+- With a ToolCache, servers with a cached tools/list get their tools immediately. The
+  live list is fetched in the background; if it changed, the cache is rewritten and
+  take_late() hands over the new tools for that server.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping
+
+from langchain_mcp_adapters.tools import convert_mcp_tool_to_langchain_tool
+from mcp.types import Tool
+
+from src.agents.server_manager import MCPServerManager
+from src.agents.tool_cache import CachedTools, ToolCache
+
+
+@dataclass
+class ServerTools:
+    name: str
+    status: str = "pending"         # pending | cached | ready | failed (a failed server may still turn ready)
+    tools: List[Any] = field(default_factory=list)
+    ready_at: float | None = None   # seconds after the manager started that it became ready or failed
+    list_seconds: float | None = None
+    error: str | None = None
+    late: bool = False              # arrived after initial() returned
+    taken: bool = False             # handed to the agent
+    cached: CachedTools | None = None
+    updated: bool = False           # the live tools differed from the cached ones
+    settled: asyncio.Event = field(default_factory=asyncio.Event)  # ready or failed at least once
+
+
+class ToolLoader:
+    """Loads LangChain tools from every server of `manager`.
+
+    Args:
+        manager: The (started) server manager
+        timeouts: name -> seconds initial() waits for that server; others use `default_timeout`
+        default_timeout: Seconds to wait for servers without their own timeout
+        cache: Tool schema cache to start from and keep current (None: always list live)
+    """
+
+    def __init__(self, manager: MCPServerManager, timeouts: Mapping[str, float] | None = None,
+                 default_timeout: float = 60.0, cache: ToolCache | None = None):
+        self.manager = manager
+        self.cache = cache
+        self.timeouts = dict(timeouts or {})
+        self.default_timeout = default_timeout
+        self.servers: Dict[str, ServerTools] = {name: ServerTools(name) for name in manager.servers}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._initial_done = False
+
+    def start(self) -> None:
+        for name, server in self.servers.items():
+            if self.cache is not None and server.status == "pending":
+                server.cached = self.cache.load(self.manager.servers[name].config)
+                if server.cached is not None:
+                    server.tools = self._convert(name, server.cached.tools)
+                    self._finish(server, "cached")
+            if name not in self._tasks:
+                self._tasks[name] = asyncio.create_task(self._load(name), name=f"mcp-tools-{name}")
+
+    async def initial(self) -> Dict[str, List[Any]]:
+        """Tools of the servers that were ready within their timeouts (name -> tools)."""
+        self.start()
+        await asyncio.gather(*(self._settle(name) for name in self._tasks))
+        self._initial_done = True
+        return self._take()
+
+    async def _settle(self, name: str) -> None:
+        """Wait until `name` loaded its tools, failed or ran out of time."""
+        try:
+            await asyncio.wait_for(self.servers[name].settled.wait(), self.timeouts.get(name, self.default_timeout))
+        except asyncio.TimeoutError:
+            pass
+
+    def take_late(self) -> Dict[str, List[Any]]:
+        """Tools of servers that became ready, or whose cached tools changed, since the last call (name -> tools).
+
+        A server's tools here replace any it handed over before.
+        """
+        return self._take()
+
+    def pending(self) -> List[str]:
+        return [name for name, server in self.servers.items() if server.status == "pending"]
+
+    async def close(self) -> None:
+        for task in self._tasks.values():
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+
+    def report(self) -> str:
+        """Per-server timing breakdown of the startup."""
+        rows = [f"{'server':<14}{'status':<9}{'launch':>8}{'init':>8}{'tools/list':>12}{'done at':>10}{'tools':>7}"]
+        for name, server in self.servers.items():
+            timings = self.manager.servers[name].timings
+            status = ("updated" if server.updated
+                      else "late" if server.late and server.cached is None and server.status == "ready"
+                      else server.status)
+            rows.append(f"{name:<14}{status:<9}{_seconds(timings.get('launch')):>8}"
+                        f"{_seconds(timings.get('initialize')):>8}{_seconds(server.list_seconds):>12}"
+                        f"{_seconds(server.ready_at):>10}{len(server.tools) if server.tools else '-':>7}")
+            if server.error:
+                rows.append(f"{'':<14}{server.error}")
+        return "\n".join(rows)
+
+    def _take(self) -> Dict[str, List[Any]]:
+        ready = {}
+        for name, server in self.servers.items():
+            if server.status in ("cached", "ready") and not server.taken:
+                server.taken = True
+                ready[name] = server.tools
+        return ready
+
+    async def _load(self, name: str) -> None:
+        server = self.servers[name]
+        try:
+            if not await self.manager.wait_settled(name):
+                # Report the failure now; the manager keeps retrying and the tools arrive late if it recovers
+                self._finish(server, "failed", self.manager.servers[name].error)
+            await self.manager.get_session(name)
+            started = time.monotonic()
+            listed = await self._list_tools(name)
+            server.list_seconds = time.monotonic() - started
+            if self.cache is not None:
+                managed = self.manager.servers[name]
+                if server.cached is not None and server.cached.matches(managed.server_info,
+                                                                       ToolCache.schema_hash(listed)):
+                    self._finish(server, "ready")  # the tools built from the cache stay in use
+                    return
+                self.cache.save(managed.config, managed.server_info, listed)
+                if server.cached is not None:
+                    server.updated = True
+                    server.taken = False  # hand the new tools over again
+            server.tools = self._convert(name, listed)
+            self._finish(server, "ready")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._finish(server, "failed", str(e) or type(e).__name__)
+
+    async def _list_tools(self, name: str) -> List[Tool]:
+        session = self.manager.session(name)
+        tools: List[Tool] = []
+        cursor = None
+        while True:
+            page = await session.list_tools(cursor=cursor)
+            tools.extend(page.tools)
+            if not page.nextCursor:
+                return tools
+            cursor = page.nextCursor
+
+    def _convert(self, name: str, tools: List[Tool]) -> List[Any]:
+        session = self.manager.session(name)
+        return [convert_mcp_tool_to_langchain_tool(session, tool) for tool in tools]
+
+    def _finish(self, server: ServerTools, status: str, error: str | None = None) -> None:
+        server.status = status
+        server.error = error
+        server.late = self._initial_done
+        server.settled.set()
+        if self.manager.started is not None:
+            server.ready_at = time.monotonic() - self.manager.started
+
+
+def _seconds(value: float | None) -> str:
+    return "-" if value is None else f"{value:.2f}s"
@@ -0,0 +1,221 @@
+"""
+Micro-benchmarks for the serialization hot paths of the dbtools tools.
+
+Covers the two shapes the tools return, through the production code in src/common/serialization.py:
+  - OCI model lists (list_all_compartments / list_autonomous_databases): dump_models,
+    i.e. oci.util.to_dict and json.dumps(indent=2)
+  - ORDS REST SQL results (_execute_sql_by_connection_id_impl): dump_ords_response,
+    i.e. resp.json() followed by json.dumps(indent=2) of the whole document
+
+Each strategy runs over synthetic inputs of 10 / 1k / 100k rows and reports best-of-N
+wall time and tracemalloc peak memory. With --compare, the run exits with status 1 if a
+production ("current") case got slower than the baseline by more than --max-regression.
+
+  python -m src.benchmarks.bench_serialization
+  python -m src.benchmarks.bench_serialization --sizes 10 1000 --output serialization.json
+  python -m src.benchmarks.bench_serialization --compare serialization.json --max-regression 0.25
+"""
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List
+
+import requests
+from oci.database.models import AutonomousDatabaseSummary
+from oci.identity.models import Compartment
+from oci.util import to_dict
+
+from src.common.serialization import dump_models, dump_ords_response, json_default
+
+_EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+# ---------- synthetic inputs ----------
+
+def make_compartments(n: int) -> List[Compartment]:
+    return [Compartment(
+        id=f"ocid1.compartment.oc1..bench{i:07d}", compartment_id="ocid1.tenancy.oc1..bench",
+        name=f"compartment-{i}", description=f"Synthetic compartment {i}",
+        time_created=_EPOCH + timedelta(minutes=i), lifecycle_state="ACTIVE", is_accessible=True,
+        freeform_tags={"team": f"t{i % 7}"}, defined_tags={},
+    ) for i in range(n)]
+
+
+def make_autonomous_databases(n: int) -> List[AutonomousDatabaseSummary]:
+    return [AutonomousDatabaseSummary(
+        id=f"ocid1.autonomousdatabase.oc1..bench{i:07d}", compartment_id="ocid1.compartment.oc1..bench",
+        lifecycle_state="AVAILABLE", db_name=f"ADB{i}", display_name=f"adb-{i}", db_version="23ai",
+        db_workload="OLTP", compute_model="ECPU", compute_count=2.0, data_storage_size_in_tbs=1,
+        is_free_tier=False, time_created=_EPOCH + timedelta(minutes=i), freeform_tags={}, defined_tags={},
+    ) for i in range(n)]
+
+
+def make_ords_body(n: int) -> bytes:
+    """Raw ORDS `/_/sql` response body for a query returning n rows (what resp.json() parses)."""
+    doc = {
+        "env": {"defaultTimeZone": "UTC"},
+        "items": [{
+            "statementId": 1, "statementType": "query", "statementText": "select * from synthetic_rows",
+            "resultSet": {
+                "metadata": [{"columnName": c.upper(), "jsonColumnName": c}
+                             for c in ("id", "name", "category", "amount", "created")],
+                "items": [{"id": i, "name": f"row-{i}", "category": f"cat-{i % 17}",
+                           "amount": round(i * 1.25, 2),
+                           "created": (_EPOCH + timedelta(minutes=i)).isoformat()} for i in range(n)],
+                "hasMore": False, "limit": 10000, "offset": 0, "count": n,
+            },
+            "response": [], "result": 0,
+        }],
+    }
+    return json.dumps(doc).encode("utf-8")
+
+
+def make_ords_response(body: bytes) -> requests.Response:
+    """A requests.Response carrying `body`, as _post_with_retry returns it."""
+    resp = requests.Response()
+    resp.status_code = 200
+    resp.encoding = "utf-8"
+    resp._content = body
+    return resp
+
+
+# ---------- strategies ----------
+
+def models_current(models) -> str:
+    """What the tools do: src.common.serialization.dump_models."""
+    return dump_models(models)
+
+
+def models_compact(models) -> str:
+    return json.dumps([to_dict(c) for c in models], separators=(",", ":"), default=json_default)
+
+
+def models_to_dict_only(models) -> list:
+    return [to_dict(c) for c in models]
+
+
+def ords_current(body: bytes) -> str:
+    """What _execute_sql_by_connection_id_impl does: src.common.serialization.dump_ords_response."""
+    return dump_ords_response(make_ords_response(body))
+
+
+def ords_compact(body: bytes) -> str:
+    return json.dumps(json.loads(body), separators=(",", ":"))
+
+
+def ords_passthrough(body: bytes) -> str:
+    """Return ORDS' own JSON unchanged (resp.text) - no parse, no re-dump."""
+    return body.decode("utf-8")
+
+
+def ords_parse_only(body: bytes) -> Any:
+    return json.loads(body)
+
+
+MODEL_STRATEGIES: Dict[str, Callable] = {
+    "current(to_dict+indent2)": models_current,
+    "compact_separators": models_compact,
+    "to_dict_only": models_to_dict_only,
+}
+ORDS_STRATEGIES: Dict[str, Callable] = {
+    "current(parse+indent2)": ords_current,
+    "compact_redump": ords_compact,
+    "passthrough_text": ords_passthrough,
+    "parse_only": ords_parse_only,
+}
+INPUTS: Dict[str, Callable[[int], Any]] = {
+    "compartments": make_compartments,
+    "autonomous_databases": make_autonomous_databases,
+    "ords_result": make_ords_body,
+}
+
+
+# ---------- runner ----------
+
+def measure(fn: Callable, arg: Any, repeat: int) -> Dict[str, Any]:
+    best = float("inf")
+    out = fn(arg)  # warm-up, so first-call costs (imports, caches) do not land in the timing
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn(arg)
+        best = min(best, time.perf_counter() - t0)
+    out_bytes = len(out) if isinstance(out, str) else None
+    del out
+    tracemalloc.start()
+    fn(arg)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"best_ms": best * 1000, "peak_kb": peak / 1024, "output_bytes": out_bytes}
+
+
+def run(sizes: List[int], inputs: List[str], max_repeat: int = 20) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    for kind in inputs:
+        strategies = ORDS_STRATEGIES if kind == "ords_result" else MODEL_STRATEGIES
+        for n in sizes:
+            data = INPUTS[kind](n)
+            repeat = max(1, min(max_repeat, 20000 // max(n, 1)))
+            for name, fn in strategies.items():
+                results[f"{kind}/{n}/{name}"] = measure(fn, data, repeat)
+            del data
+    return results
+
+
+# Differences below this are noise on the small inputs, whatever their ratio
+_MIN_REGRESSION_MS = 1.0
+
+
+def regressions(results: Dict[str, Any], baseline: Dict[str, Any], max_regression: float) -> List[str]:
+    """Production ("current") cases more than `max_regression` (a fraction) slower than the baseline."""
+    slower = []
+    for case, r in results.items():
+        prev = baseline.get(case, {}).get("best_ms")
+        if "/current(" not in case or not prev:
+            continue
+        if r["best_ms"] > prev * (1 + max_regression) and r["best_ms"] - prev > _MIN_REGRESSION_MS:
+            slower.append(f"{case}: {prev:.2f} ms -> {r['best_ms']:.2f} ms")
+    return slower
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 100000])
+    parser.add_argument("--inputs", nargs="+", default=list(INPUTS), choices=list(INPUTS))
+    parser.add_argument("--repeat", type=int, default=20, help="max timed repetitions per case")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="earlier JSON results to diff against")
+    parser.add_argument("--max-regression", type=float, default=0.25,
+                        help="with --compare, fail if a current case is slower by more than this fraction")
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    results = run(args.sizes, args.inputs, args.repeat)
+    for case, r in results.items():
+        line = f"{case:60s} {r['best_ms']:10.2f} ms  peak {r['peak_kb']:10.1f} KiB"
+        if r["output_bytes"] is not None:
+            line += f"  out {r['output_bytes'] / 1024:9.1f} KiB"
+        if case in baseline:
+            prev = baseline[case]["best_ms"]
+            line += f"  ({(r['best_ms'] - prev) / prev:+.0%} vs baseline)" if prev else ""
+        print(line)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    slower = regressions(results, baseline, args.max_regression)
+    if slower:
+        print(f"\nRegressions over {args.max_regression:.0%}:", *slower, sep="\n  ", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""
+Per-request signing overhead of the OCI auth modes used for ORDS calls.
+
+Signs a prepared ORDS `/_/sql` POST (the same shape _execute_sql_by_connection_id_impl sends)
+in a tight loop and reports the per-request cost, so the cheapest auth mode for a given
+throughput can be picked. Nothing is sent over the network.
+
+  python -m src.benchmarks.bench_signing                      # offline: generated keys
+  python -m src.benchmarks.bench_signing --modes api_key instance_principal --requests 2000
+
+Offline, api_key and security_token use a freshly generated RSA key; any other mode (or
+`--live`) is built with src.common.auth.build_signer and needs the matching credentials.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import requests
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from oci.signer import Signer
+
+from src.common.auth import AUTH_TYPES, API_KEY, SECURITY_TOKEN, CachedSessionTokenSigner, build_signer
+
+ORDS_URL = "https://sql.dbtools.us-ashburn-1.oci.oraclecloud.com/ords/ocid1.databasetoolsconnection.oc1..bench/_/sql"
+
+
+def _offline_signer(mode: str, key_size: int, workdir: str):
+    key = rsa.generate_private_key(public_exponent=65537, key_size=key_size)
+    key_file = os.path.join(workdir, f"{mode}.pem")
+    with open(key_file, "wb") as f:
+        f.write(key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.TraditionalOpenSSL,
+            serialization.NoEncryption(),
+        ))
+    if mode == API_KEY:
+        return Signer("ocid1.tenancy.oc1..bench", "ocid1.user.oc1..bench", "00:11:22", key_file)
+    token_file = os.path.join(workdir, "token")
+    with open(token_file, "w") as f:
+        f.write("eyJhbGciOiJSUzI1NiJ9.bench." + "x" * 900)  # session tokens are ~1KB JWTs
+    return CachedSessionTokenSigner(token_file, key)
+
+
+def _prepared_request(statement: str) -> requests.PreparedRequest:
+    return requests.Request(
+        "POST", ORDS_URL, json={"statementText": statement},
+        headers={"Content-Type": "application/json"},
+    ).prepare()
+
+
+def bench_mode(signer, n: int, statement: str) -> dict:
+    samples = []
+    for _ in range(n):
+        # signing mutates headers, so each iteration signs a fresh request like requests.post does
+        req = _prepared_request(statement)
+        t0 = time.perf_counter()
+        signer(req)
+        samples.append(time.perf_counter() - t0)
+    samples.sort()
+    return {
+        "requests": n,
+        "mean_us": statistics.fmean(samples) * 1e6,
+        "p50_us": samples[len(samples) // 2] * 1e6,
+        "p99_us": samples[int(len(samples) * 0.99) - 1] * 1e6,
+        "max_rps_per_core": 1 / statistics.fmean(samples),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", nargs="+", default=[API_KEY, SECURITY_TOKEN], choices=AUTH_TYPES)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--key-size", type=int, default=2048)
+    parser.add_argument("--statement", default="SELECT 1 FROM dual")
+    parser.add_argument("--live", action="store_true", help="build every mode from real credentials")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for mode in args.modes:
+            try:
+                if args.live or mode not in (API_KEY, SECURITY_TOKEN):
+                    _, signer = build_signer(mode)
+                else:
+                    signer = _offline_signer(mode, args.key_size, workdir)
+            except Exception as e:
+                print(f"{mode:20s} skipped: {e}", file=sys.stderr)
+                continue
+            bench_mode(signer, min(50, args.requests), args.statement)  # warm-up
+            results[mode] = bench_mode(signer, args.requests, args.statement)
+            r = results[mode]
+            print(f"{mode:20s} mean {r['mean_us']:8.1f}us  p50 {r['p50_us']:8.1f}us  "
+                  f"p99 {r['p99_us']:8.1f}us  ~{r['max_rps_per_core']:,.0f} signs/s/core")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
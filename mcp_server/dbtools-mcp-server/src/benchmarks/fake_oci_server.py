@@ -0,0 +1,288 @@
+"""
+Local stand-in for the OCI and DB Tools ORDS endpoints used by src/tools.py, for offline
+end-to-end / load testing of the dbtools MCP server (no tenancy, no network).
+
+Serves, on one host:
+  - Identity:        GET  /20160918/compartments, GET /20160918/compartments/{id}
+  - Database:        GET  /20160918/autonomousDatabases
+  - Resource Search: POST /20180409/resources
+  - DB Tools:        GET  /20201005/databaseToolsConnections
+  - ORDS REST SQL:   POST /ords/{connection_id}/_/sql   (one SQLite database per connection)
+
+The tenancy is synthetic and sized from the command line: N compartments, M autonomous
+databases per compartment (each with a DB Tools connection "conn-<n>") and a
+`synthetic_rows` table of R rows in every database.
+
+  python -m src.benchmarks.fake_oci_server --compartments 20 --adbs-per-compartment 5 \\
+      --rows 1000 --port 8900 --write-config /tmp/fake-oci
+
+--write-config generates an OCI config + API key for the fake tenancy and prints the env
+to point the dbtools server at it (OCI_CONFIG_FILE, OCI_SERVICE_ENDPOINT, DBTOOLS_ORDS_ENDPOINT).
+Requests are not authenticated; the signer still runs, so signing cost stays in the picture.
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+TENANCY_ID = "ocid1.tenancy.oc1..faketenancy"
+REGION = "us-ashburn-1"
+_EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def _ts(i: int) -> str:
+    return (_EPOCH + timedelta(minutes=i)).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+class FakeTenancy:
+    """Synthetic tenancy: compartments, ADBs, DB Tools connections and their SQLite databases."""
+
+    def __init__(self, compartments: int = 10, adbs_per_compartment: int = 3, rows: int = 100) -> None:
+        self.rows = rows
+        self.root = {
+            "id": TENANCY_ID, "compartmentId": None, "name": "fake-tenancy",
+            "description": "Fake root compartment", "timeCreated": _ts(0),
+            "lifecycleState": "ACTIVE", "isAccessible": True, "freeformTags": {}, "definedTags": {},
+        }
+        self.compartments: List[Dict[str, Any]] = []
+        self.adbs: List[Dict[str, Any]] = []
+        self.connections: List[Dict[str, Any]] = []
+        for c in range(compartments):
+            comp_id = f"ocid1.compartment.oc1..fake{c:05d}"
+            self.compartments.append({
+                "id": comp_id, "compartmentId": TENANCY_ID, "name": f"compartment-{c}",
+                "description": f"Synthetic compartment {c}", "timeCreated": _ts(c),
+                "lifecycleState": "ACTIVE", "isAccessible": True, "freeformTags": {}, "definedTags": {},
+            })
+            for a in range(adbs_per_compartment):
+                n = c * adbs_per_compartment + a
+                adb_id = f"ocid1.autonomousdatabase.oc1..fake{n:06d}"
+                self.adbs.append({
+                    "id": adb_id, "compartmentId": comp_id, "lifecycleState": "AVAILABLE",
+                    "dbName": f"ADB{n}", "displayName": f"adb-{n}", "dbVersion": "23ai",
+                    "dbWorkload": "OLTP", "computeModel": "ECPU", "computeCount": 2.0,
+                    "dataStorageSizeInTBs": 1, "dataStorageSizeInGBs": 1024, "isFreeTier": False,
+                    "timeCreated": _ts(n), "freeformTags": {"synthetic": "true"}, "definedTags": {},
+                })
+                self.connections.append({
+                    "id": f"ocid1.databasetoolsconnection.oc1..fake{n:06d}", "compartmentId": comp_id,
+                    "displayName": f"conn-{n}", "type": "ORACLE_DATABASE", "lifecycleState": "ACTIVE",
+                    "timeCreated": _ts(n), "connectionString": f"adb{n}_high",
+                    "relatedResource": {"entityType": "AUTONOMOUSDATABASE", "identifier": adb_id},
+                })
+        self._dbs: Dict[str, sqlite3.Connection] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._dbs_lock = threading.Lock()
+
+    # ---------- ORDS / SQLite ----------
+
+    def database(self, connection_id: str):
+        with self._dbs_lock:
+            if connection_id not in self._dbs:
+                db = sqlite3.connect(":memory:", check_same_thread=False)
+                db.execute("CREATE TABLE dual (dummy TEXT)")
+                db.execute("INSERT INTO dual VALUES ('X')")
+                db.execute("CREATE TABLE synthetic_rows (id INTEGER PRIMARY KEY, name TEXT, "
+                           "category TEXT, amount REAL, created TEXT)")
+                db.executemany(
+                    "INSERT INTO synthetic_rows VALUES (?, ?, ?, ?, ?)",
+                    ((i, f"row-{i}", f"cat-{i % 17}", round(i * 1.25, 2), _ts(i)) for i in range(self.rows)),
+                )
+                db.commit()
+                self._dbs[connection_id] = db
+                self._locks[connection_id] = threading.Lock()
+            return self._dbs[connection_id], self._locks[connection_id]
+
+    def execute_sql(self, connection_id: str, statement: str, binds: Optional[List[dict]]) -> Dict[str, Any]:
+        """Run one statement and shape the reply like ORDS REST-enabled SQL."""
+        statement = statement.strip().rstrip(";").strip()
+        params = {b["name"]: b.get("value") for b in (binds or []) if "name" in b}
+        item: Dict[str, Any] = {
+            "statementId": 1,
+            "statementPos": {"startLine": 1, "endLine": statement.count("\n") + 1},
+            "statementText": statement,
+            "response": [],
+            "result": 0,
+        }
+        db, lock = self.database(connection_id)
+        try:
+            with lock:
+                cur = db.execute(statement, params)
+                if cur.description is not None:
+                    columns = [d[0] for d in cur.description]
+                    rows = cur.fetchall()
+                    item["statementType"] = "query"
+                    item["resultSet"] = {
+                        "metadata": [{"columnName": c.upper(), "jsonColumnName": c.lower()} for c in columns],
+                        "items": [dict(zip((c.lower() for c in columns), r)) for r in rows],
+                        "hasMore": False,
+                        "limit": 10000,
+                        "offset": 0,
+                        "count": len(rows),
+                    }
+                else:
+                    db.commit()
+                    item["statementType"] = "dml" if cur.rowcount >= 0 else "ddl"
+                    item["result"] = max(cur.rowcount, 0)
+                    item["response"] = [f"\n{item['result']} row(s) affected.\n\n"]
+        except sqlite3.Error as e:
+            item["statementType"] = "query"
+            item["errorCode"] = 900
+            item["errorLine"] = 1
+            item["errorColumn"] = 1
+            item["errorMessage"] = f"ORA-00900: {e}"
+            item["errorDetails"] = str(e)
+        return {"env": {"defaultTimeZone": "UTC"}, "items": [item]}
+
+    # ---------- Resource search ----------
+
+    def search(self, query: str) -> List[Dict[str, Any]]:
+        q = query.lower()
+        name_match = re.search(r"displayname\s*=~?\s*'([^']*)'", q)
+        wanted = name_match.group(1) if name_match else None
+        results: List[Dict[str, Any]] = []
+        if "databasetoolsconnection" in q:
+            for c in self.connections:
+                if wanted is None or c["displayName"].lower() == wanted:
+                    results.append({
+                        "resourceType": "DatabaseToolsConnection", "identifier": c["id"],
+                        "compartmentId": c["compartmentId"], "timeCreated": c["timeCreated"],
+                        "displayName": c["displayName"], "lifecycleState": c["lifecycleState"],
+                        "freeformTags": {}, "definedTags": {}, "systemTags": {},
+                        "additionalDetails": {"type": c["type"], "connectionString": c["connectionString"]},
+                    })
+        if "autonomousdatabase" in q:
+            for a in self.adbs:
+                if wanted is None or a["displayName"].lower() == wanted:
+                    results.append({
+                        "resourceType": "AutonomousDatabase", "identifier": a["id"],
+                        "compartmentId": a["compartmentId"], "timeCreated": a["timeCreated"],
+                        "displayName": a["displayName"], "lifecycleState": a["lifecycleState"],
+                        "freeformTags": a["freeformTags"], "definedTags": {}, "systemTags": {},
+                    })
+        return results
+
+
+def create_app(tenancy: FakeTenancy, latency_ms: float = 0.0) -> Starlette:
+    """Starlette app serving `tenancy`; `latency_ms` is added to every response."""
+    by_compartment_id = {c["id"]: c for c in [tenancy.root] + tenancy.compartments}
+
+    async def _delay():
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000.0)
+
+    async def list_compartments(request: Request):
+        await _delay()
+        parent = request.query_params.get("compartmentId")
+        subtree = request.query_params.get("compartmentIdInSubtree", "false").lower() == "true"
+        items = [c for c in tenancy.compartments if subtree or c["compartmentId"] == parent]
+        return JSONResponse(items)
+
+    async def get_compartment(request: Request):
+        await _delay()
+        comp = by_compartment_id.get(request.path_params["compartment_id"])
+        if comp is None:
+            return JSONResponse({"code": "NotAuthorizedOrNotFound", "message": "Compartment not found"}, 404)
+        return JSONResponse(comp)
+
+    async def list_autonomous_databases(request: Request):
+        await _delay()
+        comp_id = request.query_params.get("compartmentId")
+        return JSONResponse([a for a in tenancy.adbs if a["compartmentId"] == comp_id])
+
+    async def search_resources(request: Request):
+        await _delay()
+        body = await request.json()
+        return JSONResponse({"items": tenancy.search(body.get("query", ""))})
+
+    async def list_connections(request: Request):
+        await _delay()
+        comp_id = request.query_params.get("compartmentId")
+        return JSONResponse({"items": [c for c in tenancy.connections if c["compartmentId"] == comp_id]})
+
+    async def ords_sql(request: Request):
+        await _delay()
+        body = await request.json()
+        result = tenancy.execute_sql(
+            request.path_params["connection_id"], body.get("statementText", ""), body.get("binds"),
+        )
+        return JSONResponse(result)
+
+    async def health(request: Request):
+        return JSONResponse({"status": "success"})
+
+    return Starlette(routes=[
+        Route("/20160918/compartments", list_compartments, methods=["GET"]),
+        Route("/20160918/compartments/{compartment_id}", get_compartment, methods=["GET"]),
+        Route("/20160918/autonomousDatabases", list_autonomous_databases, methods=["GET"]),
+        Route("/20180409/resources", search_resources, methods=["POST"]),
+        Route("/20201005/databaseToolsConnections", list_connections, methods=["GET"]),
+        Route("/ords/{connection_id}/_/sql", ords_sql, methods=["POST"]),
+        Route("/health", health, methods=["GET"]),
+    ])
+
+
+def write_fake_config(directory: str) -> str:
+    """Write an OCI config + throwaway API key for the fake tenancy; returns the config path."""
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+
+    os.makedirs(directory, exist_ok=True)
+    key_file = os.path.join(directory, "fake_oci_api_key.pem")
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    with open(key_file, "wb") as f:
+        f.write(key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.TraditionalOpenSSL,
+            serialization.NoEncryption(),
+        ))
+    config_file = os.path.join(directory, "config")
+    with open(config_file, "w") as f:
+        f.write("[DEFAULT]\n"
+                "user=ocid1.user.oc1..fakeuser\n"
+                "fingerprint=00:00:00:00:00:00:00:00:00:00:00:00:00:00:00:00\n"
+                f"tenancy={TENANCY_ID}\n"
+                f"region={REGION}\n"
+                f"key_file={key_file}\n")
+    return config_file
+
+
+def main(argv=None) -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--compartments", type=int, default=10)
+    parser.add_argument("--adbs-per-compartment", type=int, default=3)
+    parser.add_argument("--rows", type=int, default=100, help="rows in synthetic_rows per database")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="added to every response")
+    parser.add_argument("--write-config", metavar="DIR", help="write a fake OCI config + key into DIR")
+    args = parser.parse_args(argv)
+
+    base_url = f"http://{args.host}:{args.port}"
+    if args.write_config:
+        config_file = write_fake_config(args.write_config)
+        print("Point the dbtools MCP server at this stand-in with:")
+        print(f"  export OCI_CONFIG_FILE={config_file}")
+        print(f"  export OCI_SERVICE_ENDPOINT={base_url}")
+        print(f"  export DBTOOLS_ORDS_ENDPOINT={base_url}")
+
+    tenancy = FakeTenancy(args.compartments, args.adbs_per_compartment, args.rows)
+    print(f"Fake tenancy: {len(tenancy.compartments)} compartments, {len(tenancy.adbs)} ADBs, "
+          f"{args.rows} rows per database, serving on {base_url}")
+    uvicorn.run(create_app(tenancy, args.latency_ms), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
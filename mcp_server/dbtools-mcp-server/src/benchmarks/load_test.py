@@ -0,0 +1,310 @@
+"""
+Load test for OracleDBToolsMCPServer over streamable HTTP.
+
+Drives N concurrent MCP client sessions against /mcp, each calling a weighted mix of
+tools in a loop, and reports throughput, p50/p95/p99 latency, error rate and server RSS.
+Results are written as JSON (tagged with the git commit) so runs can be compared.
+
+  # against the offline stand-in (see src/benchmarks/fake_oci_server.py):
+  python -m src.benchmarks.load_test --spawn-server --clients 20 --duration 30 --output run.json
+  # against an already running server, sampling its RSS:
+  python -m src.benchmarks.load_test --url http://127.0.0.1:8001/mcp --server-pid 1234
+  # compare with an earlier run:
+  python -m src.benchmarks.load_test --spawn-server --compare baseline.json
+
+Tools in the mix that the server does not expose are reported and skipped.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+from mcp import ClientSession
+from mcp.client.streamable_http import streamablehttp_client
+
+SERVER_ROOT = Path(__file__).resolve().parent.parent.parent
+
+# tool name -> (weight, arguments); names match the @mcp.tool functions in src/tools.py
+DEFAULT_MIX: Dict[str, Tuple[int, Dict[str, Any]]] = {
+    "list_all_compartments": (3, {}),
+    "list_autonomous_databases": (3, {"compartment_name": "compartment-0"}),
+    "execute_sql_tool": (3, {"dbtools_connection_display_name": "conn-0",
+                             "sql_script": "select * from synthetic_rows"}),
+    "find_matching_reports": (1, {"dbtools_connection_display_name": "conn-0",
+                                  "search_text": "monthly revenue by region"}),
+}
+
+
+def parse_mix(spec: Optional[str]) -> Dict[str, Tuple[int, Dict[str, Any]]]:
+    """`name=weight,name=weight` re-weights (or drops, with 0) entries of DEFAULT_MIX."""
+    if not spec:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        args = DEFAULT_MIX.get(name, (1, {}))[1]
+        if int(weight or 1) > 0:
+            mix[name] = (int(weight or 1), args)
+    return mix
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, int(round(pct / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[k]
+
+
+def summarize(samples: List[Tuple[float, bool]], elapsed: float) -> Dict[str, Any]:
+    latencies = sorted(s[0] for s in samples)
+    errors = sum(1 for s in samples if not s[1])
+    return {
+        "calls": len(samples),
+        "errors": errors,
+        "error_rate": errors / len(samples) if samples else 0.0,
+        "throughput_rps": len(samples) / elapsed if elapsed else 0.0,
+        "latency_ms": {
+            "mean": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+            "p50": percentile(latencies, 50) * 1000,
+            "p95": percentile(latencies, 95) * 1000,
+            "p99": percentile(latencies, 99) * 1000,
+            "max": latencies[-1] * 1000 if latencies else 0.0,
+        },
+    }
+
+
+def read_rss_kb(pid: int) -> Optional[int]:
+    """Resident set size of `pid` in KiB (Linux /proc, psutil elsewhere if installed)."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    try:
+        import psutil
+        return psutil.Process(pid).memory_info().rss // 1024
+    except Exception:
+        return None
+
+
+async def sample_rss(pid: int, stop: asyncio.Event, samples: List[int], interval: float = 0.5) -> None:
+    while not stop.is_set():
+        rss = read_rss_kb(pid)
+        if rss is not None:
+            samples.append(rss)
+        try:
+            await asyncio.wait_for(stop.wait(), interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run_client(idx: int, url: str, mix: Dict[str, Tuple[int, Dict[str, Any]]], deadline: float,
+                     results: Dict[str, List[Tuple[float, bool]]], missing: set, seed: int) -> None:
+    rng = random.Random(seed + idx)
+    try:
+        async with streamablehttp_client(url) as (read, write, _):
+            async with ClientSession(read, write) as session:
+                await session.initialize()
+                available = {t.name for t in (await session.list_tools()).tools}
+                missing.update(name for name in mix if name not in available)
+                names = [n for n in mix if n in available]
+                if not names:
+                    return
+                weights = [mix[n][0] for n in names]
+                while time.monotonic() < deadline:
+                    name = rng.choices(names, weights)[0]
+                    t0 = time.perf_counter()
+                    try:
+                        res = await session.call_tool(name, mix[name][1])
+                        ok = not res.isError
+                    except Exception:
+                        ok = False
+                    results[name].append((time.perf_counter() - t0, ok))
+    except Exception as e:
+        results["<session>"].append((0.0, False))
+        print(f"client {idx}: session failed: {e!r}", file=sys.stderr)
+
+
+async def wait_for_server(url: str, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                await client.get(url, timeout=1.0)
+                return
+            except httpx.HTTPError:
+                await asyncio.sleep(0.25)
+    raise TimeoutError(f"MCP server at {url} did not come up within {timeout}s")
+
+
+def wait_for_stand_in(fake: subprocess.Popen, base_url: str, config_file: str, timeout: float = 30.0) -> None:
+    """Block until the stand-in answers /health and its OCI config file exists."""
+    deadline = time.monotonic() + timeout
+    with httpx.Client() as client:
+        while time.monotonic() < deadline:
+            if fake.poll() is not None:
+                raise RuntimeError(f"fake OCI server exited with status {fake.returncode}")
+            try:
+                if client.get(f"{base_url}/health", timeout=1.0).status_code == 200 and os.path.exists(config_file):
+                    return
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.1)
+    raise TimeoutError(f"fake OCI server at {base_url} did not come up within {timeout}s")
+
+
+def spawn_stack(args) -> List[subprocess.Popen]:
+    """Start the fake OCI stand-in and the MCP server (src.main) as subprocesses."""
+    fake_url = f"http://127.0.0.1:{args.fake_port}"
+    config_dir = os.path.join(SERVER_ROOT, ".bench", "fake-oci")
+    config_file = os.path.join(config_dir, "config")
+    if os.path.exists(config_file):
+        os.remove(config_file)  # a stale one from an earlier run must not count as ready
+    fake = subprocess.Popen(
+        [sys.executable, "-m", "src.benchmarks.fake_oci_server", "--port", str(args.fake_port),
+         "--compartments", str(args.compartments), "--adbs-per-compartment", str(args.adbs_per_compartment),
+         "--rows", str(args.rows), "--latency-ms", str(args.fake_latency_ms), "--write-config", config_dir],
+        cwd=SERVER_ROOT, stdout=subprocess.DEVNULL,
+    )
+    env = dict(os.environ,
+               OCI_CONFIG_FILE=config_file,
+               OCI_SERVICE_ENDPOINT=fake_url,
+               DBTOOLS_ORDS_ENDPOINT=fake_url,
+               OCI_AUTH_TYPE="api_key")
+    try:
+        # src.main connects to OCI at import, so the stand-in must be serving first
+        wait_for_stand_in(fake, fake_url, config_file)
+    except Exception:
+        fake.terminate()
+        raise
+    server = subprocess.Popen([sys.executable, "-m", "src.main"], cwd=SERVER_ROOT, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return [fake, server]
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=SERVER_ROOT,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return None
+
+
+def print_report(report: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> None:
+    def line(name, s, base=None):
+        lat = s["latency_ms"]
+        out = (f"{name:28s} {s['calls']:7d} calls {s['throughput_rps']:8.1f}/s  "
+               f"p50 {lat['p50']:7.1f}  p95 {lat['p95']:7.1f}  p99 {lat['p99']:7.1f} ms  "
+               f"err {s['error_rate']:6.2%}")
+        if base:
+            out += (f"   Δrps {s['throughput_rps'] - base['throughput_rps']:+.1f}"
+                    f"  Δp95 {lat['p95'] - base['latency_ms']['p95']:+.1f}ms")
+        print(out)
+
+    base_tools = (baseline or {}).get("tools", {})
+    for name, s in report["tools"].items():
+        line(name, s, base_tools.get(name))
+    line("TOTAL", report["total"], (baseline or {}).get("total"))
+    rss = report.get("server_rss_kb")
+    if rss:
+        print(f"server RSS: start {rss['start'] / 1024:.1f} MiB, peak {rss['peak'] / 1024:.1f} MiB, "
+              f"end {rss['end'] / 1024:.1f} MiB")
+    if report["skipped_tools"]:
+        print(f"skipped (not exposed by server): {', '.join(report['skipped_tools'])}")
+
+
+async def main_async(args) -> Dict[str, Any]:
+    procs: List[subprocess.Popen] = []
+    server_pid = args.server_pid
+    if args.spawn_server:
+        procs = spawn_stack(args)
+        server_pid = procs[-1].pid
+    try:
+        await wait_for_server(args.url)
+        mix = parse_mix(args.mix)
+        results: Dict[str, List[Tuple[float, bool]]] = defaultdict(list)
+        missing: set = set()
+        rss_samples: List[int] = []
+        stop = asyncio.Event()
+        sampler = asyncio.create_task(sample_rss(server_pid, stop, rss_samples)) if server_pid else None
+
+        started = time.monotonic()
+        deadline = started + args.duration
+        await asyncio.gather(*(run_client(i, args.url, mix, deadline, results, missing, args.seed)
+                               for i in range(args.clients)))
+        elapsed = time.monotonic() - started
+        stop.set()
+        if sampler:
+            await sampler
+
+        all_samples = [s for samples in results.values() for s in samples]
+        report = {
+            "commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "config": {"url": args.url, "clients": args.clients, "duration_s": args.duration,
+                       "mix": {n: w for n, (w, _) in mix.items()}},
+            "elapsed_s": elapsed,
+            "tools": {name: summarize(samples, elapsed) for name, samples in sorted(results.items())},
+            "total": summarize(all_samples, elapsed),
+            "skipped_tools": sorted(missing),
+            "server_rss_kb": ({"start": rss_samples[0], "peak": max(rss_samples), "end": rss_samples[-1]}
+                              if rss_samples else None),
+        }
+        return report
+    finally:
+        for p in reversed(procs):
+            p.terminate()
+            try:
+                p.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                p.kill()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8001/mcp")
+    parser.add_argument("--clients", type=int, default=10, help="concurrent MCP sessions")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of load")
+    parser.add_argument("--mix", help="e.g. list_all_compartments=3,execute_sql_tool=1 (default: built-in mix)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--server-pid", type=int, help="sample RSS of an already running server")
+    parser.add_argument("--output", help="write the JSON report to this file")
+    parser.add_argument("--compare", help="earlier JSON report to diff against")
+    spawn = parser.add_argument_group("spawned stack (--spawn-server)")
+    spawn.add_argument("--spawn-server", action="store_true",
+                       help="start fake_oci_server + src.main locally for the run")
+    spawn.add_argument("--fake-port", type=int, default=8900)
+    spawn.add_argument("--fake-latency-ms", type=float, default=0.0)
+    spawn.add_argument("--compartments", type=int, default=10)
+    spawn.add_argument("--adbs-per-compartment", type=int, default=3)
+    spawn.add_argument("--rows", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(main_async(args))
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
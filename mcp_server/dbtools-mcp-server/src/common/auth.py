@@ -0,0 +1,95 @@
+# src/common/auth.py
+"""
+OCI request signers for the DB Tools server. The signer is built once per process and
+reused for every OCI SDK and ORDS call; token-based signers cache their security token
+and only refresh it when it expires (or, for session tokens, when the token file changes).
+
+Env:
+  - OCI_AUTH_TYPE: api_key (default) | security_token | instance_principal | resource_principal
+  - OCI_CONFIG_FILE / OCI_PROFILE (api_key / security_token only, default: ~/.oci/config / DEFAULT)
+"""
+import os
+import threading
+import time
+from typing import Any, Dict, Tuple
+
+import oci
+from oci.auth.signers import SecurityTokenSigner
+from oci.signer import Signer, load_private_key_from_file
+
+API_KEY = "api_key"
+SECURITY_TOKEN = "security_token"
+INSTANCE_PRINCIPAL = "instance_principal"
+RESOURCE_PRINCIPAL = "resource_principal"
+AUTH_TYPES = (API_KEY, SECURITY_TOKEN, INSTANCE_PRINCIPAL, RESOURCE_PRINCIPAL)
+
+
+class CachedSessionTokenSigner(SecurityTokenSigner):
+    """
+    Session-token signer (`oci session authenticate`) that keeps the token in memory and
+    re-reads the token file at most every `check_interval` seconds, and only if it changed,
+    so `oci session refresh` is picked up without touching the disk on every request.
+    """
+
+    def __init__(self, token_file: str, private_key, check_interval: float = 60.0) -> None:
+        self.token_file = os.path.expanduser(token_file)
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._mtime = os.path.getmtime(self.token_file)
+        self._checked_at = time.monotonic()
+        super().__init__(self._read_token(), private_key)
+
+    def _read_token(self) -> str:
+        with open(self.token_file, "r") as f:
+            return f.read().strip()
+
+    def _maybe_reload(self) -> None:
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return
+        with self._lock:
+            if now - self._checked_at < self.check_interval:
+                return
+            self._checked_at = now
+            mtime = os.path.getmtime(self.token_file)
+            if mtime != self._mtime:
+                self._mtime = mtime
+                # SecurityTokenSigner bakes the token into the keyId it signs with
+                super().__init__(self._read_token(), self.private_key)
+
+    def do_request_sign(self, request, enforce_content_headers=True):
+        self._maybe_reload()
+        return super().do_request_sign(request, enforce_content_headers)
+
+
+def build_signer(auth_type: str = None, profile: str = None) -> Tuple[Dict[str, Any], Any]:
+    """Return (config, signer) for the requested auth mode; config always has tenancy and region."""
+    auth_type = (auth_type or os.getenv("OCI_AUTH_TYPE", API_KEY)).lower()
+    if auth_type not in AUTH_TYPES:
+        raise ValueError(f"Unsupported OCI_AUTH_TYPE '{auth_type}', expected one of {', '.join(AUTH_TYPES)}")
+
+    if auth_type == INSTANCE_PRINCIPAL:
+        signer = oci.auth.signers.InstancePrincipalsSecurityTokenSigner()
+        return {"tenancy": signer.tenancy_id, "region": signer.region}, signer
+
+    if auth_type == RESOURCE_PRINCIPAL:
+        signer = oci.auth.signers.get_resource_principals_signer()
+        return {"tenancy": signer.tenancy_id, "region": signer.region}, signer
+
+    config = oci.config.from_file(
+        file_location=os.path.expanduser(os.getenv("OCI_CONFIG_FILE", "~/.oci/config")),
+        profile_name=profile or os.getenv("OCI_PROFILE", "DEFAULT"),
+    )
+
+    if auth_type == SECURITY_TOKEN:
+        private_key = load_private_key_from_file(config["key_file"], config.get("pass_phrase"))
+        return config, CachedSessionTokenSigner(config["security_token_file"], private_key)
+
+    signer = Signer(
+        tenancy=config["tenancy"],
+        user=config["user"],
+        fingerprint=config["fingerprint"],
+        private_key_file_location=config["key_file"],
+        pass_phrase=config.get("pass_phrase"),
+    )
+    return config, signer
@@ -0,0 +1,189 @@
+# src/common/retry.py
+"""
+Retry and circuit-breaker helpers for the OCI / DB Tools calls:
+  - RetryPolicy: exponential backoff with full jitter, honors Retry-After
+  - CircuitBreaker: per-endpoint breaker that fails fast while an endpoint is unhealthy
+  - oci_retry_strategy / oci_circuit_breaker_strategy: same knobs for the OCI SDK clients
+Env (all optional):
+  - DBTOOLS_RETRY_MAX_ATTEMPTS (default: 4)
+  - DBTOOLS_RETRY_BASE_DELAY (seconds, default: 0.5)
+  - DBTOOLS_RETRY_MAX_DELAY (seconds, default: 20)
+  - DBTOOLS_RETRY_TOTAL_TIMEOUT (seconds, default: 60)
+  - DBTOOLS_CB_FAILURE_THRESHOLD (default: 5)
+  - DBTOOLS_CB_RECOVERY_TIMEOUT (seconds, default: 30)
+"""
+import os
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional
+
+import oci
+
+# Statuses that mean "the request was rejected before it did anything" -> safe to retry any call
+REJECTED_STATUSES = frozenset({429, 503})
+# Additional statuses that are only retried for idempotent (read-only) calls
+IDEMPOTENT_RETRY_STATUSES = frozenset({500, 502, 504})
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when a call is short-circuited because its endpoint is marked unhealthy."""
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (delta-seconds or HTTP-date) into seconds."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter: sleep ~ U(0, min(max_delay, base * 2**attempt))."""
+
+    def __init__(self,
+                 max_attempts: int = 4,
+                 base_delay: float = 0.5,
+                 max_delay: float = 20.0,
+                 total_timeout: float = 60.0) -> None:
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.total_timeout = total_timeout
+
+    @classmethod
+    def from_env(cls) -> "RetryPolicy":
+        return cls(
+            max_attempts=int(os.getenv("DBTOOLS_RETRY_MAX_ATTEMPTS", "4")),
+            base_delay=float(os.getenv("DBTOOLS_RETRY_BASE_DELAY", "0.5")),
+            max_delay=float(os.getenv("DBTOOLS_RETRY_MAX_DELAY", "20")),
+            total_timeout=float(os.getenv("DBTOOLS_RETRY_TOTAL_TIMEOUT", "60")),
+        )
+
+    def backoff(self, attempt: int) -> float:
+        """Jittered delay before retry number `attempt` (0-based)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def delay_for(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Server-provided Retry-After wins (capped at max_delay); otherwise jittered backoff."""
+        hinted = parse_retry_after(retry_after)
+        if hinted is not None:
+            return min(hinted, self.max_delay)
+        return self.backoff(attempt)
+
+
+class CircuitBreaker:
+    """
+    Classic closed -> open -> half-open breaker.
+      - closed: calls pass; `failure_threshold` consecutive failures open the circuit
+      - open: calls fail fast with CircuitOpenError until `recovery_timeout` elapses
+      - half-open: a single probe call is let through; success closes, failure re-opens
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_timeout: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.recovery_timeout = recovery_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state_locked()
+
+    def _state_locked(self) -> str:
+        if self._opened_at is None:
+            return self.CLOSED
+        if self._clock() - self._opened_at >= self.recovery_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError if the call must not go out."""
+        with self._lock:
+            state = self._state_locked()
+            if state == self.CLOSED:
+                return
+            if state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return
+            retry_in = max(0.0, self.recovery_timeout - (self._clock() - self._opened_at))
+        raise CircuitOpenError(
+            f"Circuit open for endpoint '{self.name}' after repeated failures; retry in {retry_in:.1f}s"
+        )
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._probe_in_flight or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+            self._probe_in_flight = False
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """Return the process-wide breaker for an endpoint, creating it from env on first use."""
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                name,
+                failure_threshold=int(os.getenv("DBTOOLS_CB_FAILURE_THRESHOLD", "5")),
+                recovery_timeout=float(os.getenv("DBTOOLS_CB_RECOVERY_TIMEOUT", "30")),
+            )
+            _breakers[name] = breaker
+        return breaker
+
+
+def oci_retry_strategy(policy: RetryPolicy):
+    """OCI SDK retry strategy (full-jitter backoff on throttles, 5xx and timeouts) from the same knobs."""
+    return oci.retry.RetryStrategyBuilder(
+        max_attempts_check=True,
+        max_attempts=policy.max_attempts,
+        total_elapsed_time_check=True,
+        total_elapsed_time_seconds=int(policy.total_timeout),
+        service_error_check=True,
+        service_error_retry_on_any_5xx=True,
+        retry_base_sleep_time_seconds=policy.base_delay,
+        retry_max_wait_between_calls_seconds=policy.max_delay,
+        backoff_type=oci.retry.BACKOFF_FULL_JITTER_VALUE,
+    ).get_retry_strategy()
+
+
+def oci_circuit_breaker_strategy(name: str):
+    """OCI SDK circuit breaker; a distinct name gives each service endpoint its own breaker."""
+    return oci.circuit_breaker.CircuitBreakerStrategy(
+        name=name,
+        failure_threshold=int(os.getenv("DBTOOLS_CB_FAILURE_THRESHOLD", "5")),
+        recovery_timeout=int(float(os.getenv("DBTOOLS_CB_RECOVERY_TIMEOUT", "30"))),
+    )
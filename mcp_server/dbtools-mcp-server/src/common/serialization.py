@@ -0,0 +1,33 @@
+# src/common/serialization.py
+"""
+JSON serialization of tool results, shared by the tools and src/benchmarks/bench_serialization.py:
+  - dump_models: OCI model objects -> indented JSON (datetimes as ISO-8601)
+  - dump_ords_response: ORDS REST SQL response -> indented JSON (or status/text if not JSON)
+"""
+import json
+from datetime import date, datetime
+from typing import Any, Iterable
+
+from oci.util import to_dict
+
+
+def json_default(o: Any) -> Any:
+    """json.dumps can't handle datetimes by default; ensure ISO-8601."""
+    if isinstance(o, (datetime, date)):
+        return o.isoformat()
+    return str(o)
+
+
+def dump_model(model: Any) -> str:
+    return json.dumps(to_dict(model), indent=2, default=json_default)
+
+
+def dump_models(models: Iterable[Any]) -> str:
+    return json.dumps([to_dict(m) for m in models], indent=2, default=json_default)
+
+
+def dump_ords_response(resp: Any) -> str:
+    try:
+        return json.dumps(resp.json(), indent=2)
+    except Exception:
+        return json.dumps({"status_code": resp.status_code, "text": resp.text}, indent=2)
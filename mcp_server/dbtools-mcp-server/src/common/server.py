@@ -1,3 +1,6 @@
+import functools
+
+import anyio
 from mcp.server.fastmcp import FastMCP
 from starlette.responses import JSONResponse
 from starlette.requests import Request
@@ -22,6 +25,18 @@ mcp = FastMCP(
 #         stateless=True,
 #     )
 
+def blocking_tool(fn):
+    """Run a synchronous tool (OCI SDK / ORDS calls, with their retry sleeps) in a worker thread.
+
+    FastMCP calls plain `def` tools on the event loop, so one slow or retrying call would
+    stall every session. Apply below @mcp.tool().
+    """
+    @functools.wraps(fn)
+    async def run(*args, **kwargs):
+        return await anyio.to_thread.run_sync(functools.partial(fn, *args, **kwargs))
+    return run
+
+
 def handle_health(request):
         return JSONResponse({"status": "success"})
 
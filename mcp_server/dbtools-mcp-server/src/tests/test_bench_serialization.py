@@ -0,0 +1,58 @@
+import unittest
+from unittest import mock
+import json
+
+from src.benchmarks import bench_serialization as bench
+
+
+class TestBenchSerialization(unittest.TestCase):
+    """Keeps the serialization strategies equivalent, so the benchmark compares like with like."""
+
+    def test_model_strategies_produce_same_document(self):
+        for make in (bench.make_compartments, bench.make_autonomous_databases):
+            models = make(5)
+            expected = json.loads(bench.models_current(models))
+            for name, fn in bench.MODEL_STRATEGIES.items():
+                out = fn(models)
+                doc = json.loads(out) if isinstance(out, str) else json.loads(json.dumps(out, default=str))
+                self.assertEqual(doc, expected, name)
+
+    def test_ords_strategies_produce_same_document(self):
+        body = bench.make_ords_body(5)
+        expected = json.loads(bench.ords_current(body))
+        self.assertEqual(expected['items'][0]['resultSet']['count'], 5)
+        for name, fn in bench.ORDS_STRATEGIES.items():
+            out = fn(body)
+            self.assertEqual(json.loads(out) if isinstance(out, str) else out, expected, name)
+
+    def test_run_reports_time_and_peak_memory(self):
+        results = bench.run([10], ['ords_result'], max_repeat=1)
+        case = results['ords_result/10/current(parse+indent2)']
+        self.assertGreater(case['best_ms'], 0)
+        self.assertGreater(case['peak_kb'], 0)
+
+    def test_current_strategies_call_production_serializers(self):
+        with mock.patch.object(bench, 'dump_models', return_value='models') as models, \
+                mock.patch.object(bench, 'dump_ords_response', return_value='ords') as ords:
+            self.assertEqual(bench.models_current([]), 'models')
+            self.assertEqual(bench.ords_current(b'{}'), 'ords')
+        models.assert_called_once()
+        self.assertEqual(ords.call_args.args[0].json(), {})
+
+    def test_regression_beyond_threshold_fails_compare(self):
+        case = 'ords_result/1000/current(parse+indent2)'
+        baseline = {case: {'best_ms': 10.0}, 'ords_result/1000/parse_only': {'best_ms': 10.0}}
+        results = {case: {'best_ms': 15.0, 'peak_kb': 1.0, 'output_bytes': 10},
+                   'ords_result/1000/parse_only': {'best_ms': 30.0, 'peak_kb': 1.0, 'output_bytes': None}}
+
+        self.assertEqual(len(bench.regressions(results, baseline, 0.25)), 1)
+        self.assertEqual(bench.regressions(results, baseline, 0.6), [])
+
+        with mock.patch.object(bench, 'run', return_value=results), \
+                mock.patch('builtins.open', mock.mock_open(read_data=json.dumps(baseline))), \
+                mock.patch('sys.stdout'), mock.patch('sys.stderr'):
+            self.assertEqual(bench.main(['--compare', 'baseline.json']), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+from unittest import mock
+import os
+import tempfile
+
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from src.common import auth
+from src.common.auth import CachedSessionTokenSigner, build_signer
+
+
+class TestBuildSigner(unittest.TestCase):
+
+    @mock.patch('src.common.auth.Signer')
+    @mock.patch('oci.config.from_file')
+    def test_api_key_is_default(self, mock_from_file, mock_signer):
+        mock_from_file.return_value = {
+            'tenancy': 'test_tenancy',
+            'user': 'test_user',
+            'fingerprint': 'test_fingerprint',
+            'key_file': 'test_key_file',
+        }
+        mock_signer.return_value = 'test_signer'
+
+        with mock.patch.dict(os.environ, {'OCI_PROFILE': 'TEST_PROFILE'}, clear=False):
+            os.environ.pop('OCI_AUTH_TYPE', None)
+            config, signer = build_signer()
+
+        self.assertEqual(config['tenancy'], 'test_tenancy')
+        self.assertEqual(signer, 'test_signer')
+        self.assertEqual(mock_from_file.call_args.kwargs['profile_name'], 'TEST_PROFILE')
+        mock_signer.assert_called_with(
+            tenancy='test_tenancy',
+            user='test_user',
+            fingerprint='test_fingerprint',
+            private_key_file_location='test_key_file',
+            pass_phrase=None,
+        )
+
+    @mock.patch('oci.auth.signers.InstancePrincipalsSecurityTokenSigner')
+    def test_instance_principal_config_from_signer(self, mock_ip_signer):
+        mock_ip_signer.return_value = mock.Mock(tenancy_id='ocid1.tenancy.oc1..ip', region='us-ashburn-1')
+
+        config, signer = build_signer('instance_principal')
+
+        self.assertEqual(config, {'tenancy': 'ocid1.tenancy.oc1..ip', 'region': 'us-ashburn-1'})
+        self.assertIs(signer, mock_ip_signer.return_value)
+
+    def test_unsupported_auth_type(self):
+        with self.assertRaises(ValueError) as context:
+            build_signer('password')
+        self.assertIn("Unsupported OCI_AUTH_TYPE", str(context.exception))
+
+
+class TestCachedSessionTokenSigner(unittest.TestCase):
+
+    def setUp(self):
+        self.key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.token_file = os.path.join(self.tmp.name, 'token')
+        with open(self.token_file, 'w') as f:
+            f.write('token-1\n')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_token_cached_until_file_changes(self):
+        signer = CachedSessionTokenSigner(self.token_file, self.key, check_interval=0)
+        self.assertEqual(signer.api_key, 'ST$token-1')
+
+        with mock.patch.object(auth.os.path, 'getmtime', return_value=signer._mtime), \
+                mock.patch.object(signer, '_read_token') as mock_read:
+            signer._maybe_reload()
+            mock_read.assert_not_called()
+
+        with open(self.token_file, 'w') as f:
+            f.write('token-2\n')
+        os.utime(self.token_file, (signer._mtime + 10, signer._mtime + 10))
+        signer._maybe_reload()
+        self.assertEqual(signer.api_key, 'ST$token-2')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,178 @@
+import asyncio
+import threading
+import unittest
+from unittest import mock
+import json
+
+import requests
+from urllib3.exceptions import NewConnectionError
+
+from src.common import retry
+from src.common.connections import dbtools_connection
+from src.common.retry import CircuitBreaker, CircuitOpenError, RetryPolicy, parse_retry_after
+from src.common.server import blocking_tool
+
+
+def _response(status_code, body=None, headers=None):
+    resp = mock.Mock()
+    resp.status_code = status_code
+    resp.headers = headers or {}
+    resp.json.return_value = body if body is not None else {}
+    resp.text = json.dumps(body)
+    return resp
+
+
+def _connection(max_attempts=3):
+    # Bypass __init__ (no ~/.oci/config needed); only what the ORDS path uses
+    conn = dbtools_connection.__new__(dbtools_connection)
+    conn.ords_endpoint = 'https://test.com'
+    conn.auth_signer = 'test_signer'
+    conn.ords_timeout = (5.0, 120.0)
+    conn.retry_policy = RetryPolicy(max_attempts=max_attempts, base_delay=0.01, max_delay=1, total_timeout=30)
+    return conn
+
+
+class TestRetryPolicy(unittest.TestCase):
+
+    def test_parse_retry_after_seconds(self):
+        self.assertEqual(parse_retry_after('3'), 3.0)
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after('soon'))
+
+    def test_parse_retry_after_http_date_in_past(self):
+        self.assertEqual(parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT'), 0.0)
+
+    def test_delay_honors_retry_after_capped_at_max_delay(self):
+        policy = RetryPolicy(base_delay=1, max_delay=5)
+        self.assertEqual(policy.delay_for(0, '2'), 2.0)
+        self.assertEqual(policy.delay_for(0, '120'), 5.0)
+
+    def test_backoff_is_jittered_and_bounded(self):
+        policy = RetryPolicy(base_delay=1, max_delay=4)
+        for attempt in range(6):
+            delay = policy.backoff(attempt)
+            self.assertGreaterEqual(delay, 0)
+            self.assertLessEqual(delay, min(4, 2 ** attempt))
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 0.0
+        self.breaker = CircuitBreaker('test', failure_threshold=2, recovery_timeout=10, clock=lambda: self.now)
+
+    def test_opens_after_threshold_and_fails_fast(self):
+        self.breaker.record_failure()
+        self.breaker.before_call()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.before_call()
+
+    def test_half_open_probe_closes_on_success(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.now = 11
+        self.assertEqual(self.breaker.state, CircuitBreaker.HALF_OPEN)
+        self.breaker.before_call()
+        # only one probe is allowed through while half-open
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.before_call()
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_half_open_probe_failure_reopens(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.now = 11
+        self.breaker.before_call()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+
+
+class TestExecuteSqlRetry(unittest.TestCase):
+
+    def setUp(self):
+        retry._breakers.clear()
+
+    @mock.patch('time.sleep')
+    @mock.patch('requests.post')
+    def test_retries_throttled_request_honoring_retry_after(self, mock_post, mock_sleep):
+        mock_post.side_effect = [
+            _response(429, headers={'Retry-After': '0.5'}),
+            _response(200, {'items': []}),
+        ]
+
+        result = dbtools_connection.execute_sql_by_connection_id(_connection(), 'test_id', 'INSERT INTO t VALUES (1)')
+
+        self.assertEqual(json.loads(result), {'items': []})
+        self.assertEqual(mock_post.call_count, 2)
+        mock_sleep.assert_called_once_with(0.5)
+        self.assertEqual(mock_post.call_args.kwargs['timeout'], (5.0, 120.0))
+
+    @mock.patch('time.sleep')
+    @mock.patch('requests.post')
+    def test_refused_connection_retried_for_any_statement(self, mock_post, mock_sleep):
+        refused = requests.ConnectionError(NewConnectionError(None, 'Connection refused'))
+        mock_post.side_effect = [refused, _response(200, {'items': []})]
+
+        result = dbtools_connection.execute_sql_by_connection_id(_connection(), 'test_id', 'INSERT INTO t VALUES (1)')
+
+        self.assertEqual(json.loads(result), {'items': []})
+        self.assertEqual(mock_post.call_count, 2)
+
+    @mock.patch('time.sleep')
+    @mock.patch('requests.post')
+    def test_read_timeout_not_retried_for_non_idempotent_statement(self, mock_post, mock_sleep):
+        mock_post.side_effect = requests.ReadTimeout('read timed out')
+
+        result = dbtools_connection.execute_sql_by_connection_id(_connection(), 'test_id', 'DELETE FROM t')
+
+        self.assertEqual(mock_post.call_count, 1)
+        self.assertIn('read timed out', json.loads(result)['error'])
+
+    @mock.patch('time.sleep')
+    @mock.patch('requests.post')
+    def test_non_idempotent_statement_not_retried_on_bad_gateway(self, mock_post, mock_sleep):
+        mock_post.return_value = _response(502, {'message': 'bad gateway'})
+
+        dbtools_connection.execute_sql_by_connection_id(_connection(), 'test_id', 'DELETE FROM t')
+
+        self.assertEqual(mock_post.call_count, 1)
+        mock_sleep.assert_not_called()
+
+    @mock.patch('time.sleep')
+    @mock.patch('requests.post')
+    def test_query_retried_on_bad_gateway_until_max_attempts(self, mock_post, mock_sleep):
+        mock_post.return_value = _response(502, {'message': 'bad gateway'})
+
+        result = dbtools_connection.execute_sql_by_connection_id(_connection(max_attempts=3), 'test_id', 'SELECT 1 FROM dual')
+
+        self.assertEqual(mock_post.call_count, 3)
+        self.assertEqual(json.loads(result), {'message': 'bad gateway'})
+
+    @mock.patch('time.sleep')
+    @mock.patch('requests.post')
+    def test_open_circuit_fails_fast_with_json_error(self, mock_post, mock_sleep):
+        breaker = retry.get_circuit_breaker('https://test.com')  # one breaker per ORDS endpoint
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure()
+
+        result = dbtools_connection.execute_sql_by_connection_id(_connection(), 'test_id', 'SELECT 1 FROM dual')
+
+        mock_post.assert_not_called()
+        self.assertIn('Circuit open', json.loads(result)['error'])
+
+
+class TestBlockingTool(unittest.TestCase):
+
+    def test_runs_in_worker_thread(self):
+        @blocking_tool
+        def tool(name: str) -> str:
+            return f"{name} on {threading.current_thread() is threading.main_thread()}"
+
+        self.assertEqual(asyncio.run(tool('list')), 'list on False')
+
+
+if __name__ == '__main__':
+    unittest.main()
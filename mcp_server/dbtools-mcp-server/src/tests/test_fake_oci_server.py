@@ -0,0 +1,55 @@
+import unittest
+
+from starlette.testclient import TestClient
+
+from src.benchmarks.fake_oci_server import TENANCY_ID, FakeTenancy, create_app
+
+
+class TestFakeOciServer(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tenancy = FakeTenancy(compartments=3, adbs_per_compartment=2, rows=10)
+        cls.client = TestClient(create_app(cls.tenancy))
+
+    def test_list_compartments_of_tenancy(self):
+        resp = self.client.get('/20160918/compartments', params={'compartmentId': TENANCY_ID})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual([c['name'] for c in resp.json()], ['compartment-0', 'compartment-1', 'compartment-2'])
+
+    def test_get_root_compartment(self):
+        resp = self.client.get(f'/20160918/compartments/{TENANCY_ID}')
+        self.assertEqual(resp.json()['name'], 'fake-tenancy')
+
+    def test_list_autonomous_databases_by_compartment(self):
+        comp_id = self.tenancy.compartments[1]['id']
+        resp = self.client.get('/20160918/autonomousDatabases', params={'compartmentId': comp_id})
+        self.assertEqual([a['displayName'] for a in resp.json()], ['adb-2', 'adb-3'])
+
+    def test_search_connection_by_display_name(self):
+        query = ("query databasetoolsconnection resources return allAdditionalFields "
+                 "where displayName =~ 'conn-4'")
+        resp = self.client.post('/20180409/resources', json={'type': 'Structured', 'query': query})
+        items = resp.json()['items']
+        self.assertEqual(len(items), 1)
+        self.assertEqual(items[0]['additionalDetails']['type'], 'ORACLE_DATABASE')
+
+    def test_ords_query_with_binds(self):
+        conn_id = self.tenancy.connections[0]['id']
+        resp = self.client.post(f'/ords/{conn_id}/_/sql', json={
+            'statementText': 'select id, name from synthetic_rows where id < :n',
+            'binds': [{'name': 'n', 'data_type': 'NUMBER', 'value': 3}],
+        })
+        result_set = resp.json()['items'][0]['resultSet']
+        self.assertEqual(result_set['count'], 3)
+        self.assertEqual(result_set['items'][0], {'id': 0, 'name': 'row-0'})
+
+    def test_ords_error_is_reported_in_item(self):
+        conn_id = self.tenancy.connections[0]['id']
+        resp = self.client.post(f'/ords/{conn_id}/_/sql', json={'statementText': 'select * from missing_table'})
+        item = resp.json()['items'][0]
+        self.assertIn('ORA-00900', item['errorMessage'])
+
+
+if __name__ == '__main__':
+    unittest.main()
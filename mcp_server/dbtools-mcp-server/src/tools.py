@@ -8,7 +8,8 @@ import json
 from datetime import date, datetime
 from oci.resource_search.models import StructuredSearchDetails
 from src.common.connections import *
-from src.common.server import mcp
+from src.common.serialization import dump_model, dump_models
+from src.common.server import blocking_tool, mcp
 from oci.util import to_dict  # <-- this is the correct way to serialize OCI models
 
 
@@ -23,23 +24,16 @@ tenancy_id = conn.tenancy_id
 print(f"identity_client: {identity_client}")
 
 @mcp.tool()
+@blocking_tool
 def list_all_compartments() -> str:
     """List all compartments in a tenancy with clear formatting"""
     compartments = identity_client.list_compartments(tenancy_id).data
     compartments.append(identity_client.get_compartment(compartment_id=tenancy_id).data)
     print(f"compartments: {compartments}")
-    # serialize OCI model objects to plain dicts
-    payload = [to_dict(c) for c in compartments]
-
-    # json.dumps can't handle datetimes by default; ensure ISO-8601
-    def _json_default(o):
-        if isinstance(o, (datetime, date)):
-            return o.isoformat()
-        return str(o)
-
-    return json.dumps(payload, indent=2, default=_json_default)
+    return dump_models(compartments)
 
 @mcp.tool()
+@blocking_tool
 def get_compartment_by_name(compartment_name: str):
     """Internal function to get compartment by name with caching"""
     compartments = identity_client.list_compartments(
@@ -58,16 +52,10 @@ def get_compartment_by_name(compartment_name: str):
         None,
     )
 
-    def _json_default(o):
-        if isinstance(o, (datetime, date)):
-            return o.isoformat()
-        return str(o)
-
     if not match:
         return json.dumps({"error": "not_found", "name": compartment_name}, indent=2)
 
-    # Serialize the matched OCI model to dict, then dump as string
-    return json.dumps(to_dict(match), indent=2, default=_json_default)
+    return dump_model(match)
 
 def _get_compartment_by_name(compartment_name: str):
     """Internal function to get compartment by name with caching"""
@@ -96,6 +84,7 @@ def _get_compartment_by_name(compartment_name: str):
 #         return json.dumps({"error": f"Compartment '{name}' not found."})
 
 @mcp.tool()
+@blocking_tool
 def list_autonomous_databases(compartment_name: str) -> str:
     """List all databases in a given compartment name"""
     compartment = _get_compartment_by_name(compartment_name)
@@ -104,19 +93,10 @@ def list_autonomous_databases(compartment_name: str) -> str:
     
     databases = database_client.list_autonomous_databases(compartment_id=compartment.id).data
     print(f"databases: {databases}")
-
-    # serialize OCI model objects to plain dicts
-    payload = [to_dict(c) for c in databases]
-
-    # json.dumps can't handle datetimes by default; ensure ISO-8601
-    def _json_default(o):
-        if isinstance(o, (datetime, date)):
-            return o.isoformat()
-        return str(o)
-
-    return json.dumps(payload, indent=2, default=_json_default)
+    return dump_models(databases)
 
 @mcp.tool()
+@blocking_tool
 def list_all_databases() -> str:
     """List all databases in the tenancy"""
     search_details = StructuredSearchDetails(
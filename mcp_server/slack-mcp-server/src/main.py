@@ -7,16 +7,30 @@ import sys, os
 # Add the src directory to the path to allow imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+import asyncio
+import json
+from contextlib import asynccontextmanager, suppress
 from pathlib import Path
+import uvicorn
 from dotenv import load_dotenv
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import Context, FastMCP
+from starlette.requests import Request
+from starlette.responses import JSONResponse
 
 from src.tools.slack_tools import (
     list_slack_channels,
     send_slack_message,
+    send_slack_messages,
     get_channel_messages,
+    search_slack_messages,
+    wait_for_messages,
 )
-from src.tools.config import logger
+from src.tools.message_batcher import drain_message_batchers
+from src.tools.event_ingest import get_event_ingestor, socket_mode_source, verify_signature
+from src.tools.weather_tools import get_alerts, get_forecast
+from src.tools.config import logger, setup_logging
+from src.utils.utils_mcp import init_http_client, close_http_client, make_slack_request
+from src.utils.rate_limiter import get_rate_limiter
 
 # ────────────────────────────────────────────────────────
 # 1) bootstrap paths + env + llm
@@ -32,40 +46,227 @@ SLACK_BOT_TOKEN = os.environ.get('SLACK_BOT_TOKEN')
 if not SLACK_BOT_TOKEN:
     raise ValueError("SLACK_BOT_TOKEN environment variable is required")
 
-# Initialize FastMCP server
-mcp = FastMCP("mcp_demo")
+# "stdio" (one server per agent process) or "streamable-http" (one server shared by all agents)
+MCP_TRANSPORT = os.getenv('MCP_TRANSPORT', 'stdio')
+MCP_HTTP_HOST = os.getenv('MCP_HTTP_HOST', '127.0.0.1')
+MCP_HTTP_PORT = int(os.getenv('MCP_HTTP_PORT', '8002'))
+# Caches and rate-limit buckets are per process; more than one worker splits them
+MCP_HTTP_WORKERS = int(os.getenv('MCP_HTTP_WORKERS', '1'))
+# Every worker imports this module; give each its own log file
+setup_logging(per_process=MCP_HTTP_WORKERS > 1)
+
+# Pushed message events only reach one process, so ingestion needs a single worker
+EVENTS_ENABLED = MCP_HTTP_WORKERS == 1
+if not EVENTS_ENABLED and (os.getenv('SLACK_APP_TOKEN') or os.getenv('SLACK_SIGNING_SECRET')):
+    logger.warning("Slack event ingestion is disabled with MCP_HTTP_WORKERS > 1")
+
+_open_lifespans = 0
+_event_task: asyncio.Task | None = None
+
+
+@asynccontextmanager
+async def shared_resources():
+    """Keep the shared Slack/NWS HTTP client (and Socket Mode listener) open while anything uses the server.
+
+    FastMCP enters the server lifespan once per client session, so over HTTP the
+    client is opened by the first entrant and closed only when the last one leaves
+    (the HTTP app holds it for its whole lifetime).
+    """
+    global _open_lifespans, _event_task
+    await init_http_client()
+    if _open_lifespans == 0 and EVENTS_ENABLED:
+        source = socket_mode_source(make_slack_request)
+        if source is not None:
+            _event_task = asyncio.create_task(get_event_ingestor().run(source))
+    _open_lifespans += 1
+    try:
+        yield
+    finally:
+        _open_lifespans -= 1
+        if _open_lifespans == 0:
+            if _event_task is not None:
+                _event_task.cancel()
+                with suppress(asyncio.CancelledError):
+                    await _event_task
+                _event_task = None
+            await drain_message_batchers()
+            await close_http_client()
+            throttled = get_rate_limiter().metrics()
+            if throttled:
+                logger.info("Slack rate limiting: %s", throttled)
+
+
+@asynccontextmanager
+async def app_lifespan(server: FastMCP):
+    """Open the shared Slack/NWS HTTP client on startup and close it on shutdown."""
+    async with shared_resources():
+        yield
+
+
+# Initialize FastMCP server; with several workers a session's requests may reach any of
+# them, so sessions must not depend on per-process state
+mcp = FastMCP("mcp_demo", lifespan=app_lifespan, host=MCP_HTTP_HOST, port=MCP_HTTP_PORT,
+              stateless_http=MCP_HTTP_WORKERS > 1)
+
+
+def create_http_app():
+    """Streamable-HTTP ASGI app (/mcp) that keeps caches and connections warm across sessions."""
+    app = mcp.streamable_http_app()
+    run_sessions = app.router.lifespan_context
+
+    @asynccontextmanager
+    async def lifespan(app):
+        async with shared_resources(), run_sessions(app):
+            # The Events API counts as connected once a verified event arrives (see slack_events)
+            events_api = EVENTS_ENABLED and bool(os.getenv('SLACK_SIGNING_SECRET'))
+            try:
+                yield
+            finally:
+                if events_api:
+                    get_event_ingestor().on_disconnect()
+
+    app.router.lifespan_context = lifespan
+    return app
+
+
+@mcp.custom_route("/health", methods=["GET"])
+async def health(request: Request) -> JSONResponse:
+    return JSONResponse({"status": "success", "pid": os.getpid()})
+
+
+@mcp.custom_route("/slack/events", methods=["POST"])
+async def slack_events(request: Request) -> JSONResponse:
+    """Events API request URL: message events are appended to the local message store."""
+    signing_secret = os.getenv('SLACK_SIGNING_SECRET')
+    if not signing_secret or not EVENTS_ENABLED:
+        return JSONResponse({"ok": False, "error": "events_disabled"}, status_code=404)
+    body = await request.body()
+    if not verify_signature(signing_secret, request.headers.get("X-Slack-Request-Timestamp", ""),
+                            body, request.headers.get("X-Slack-Signature", "")):
+        return JSONResponse({"ok": False, "error": "invalid_signature"}, status_code=401)
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        payload = None
+    if not isinstance(payload, dict):
+        logger.warning("Rejected malformed Events API request")
+        return JSONResponse({"ok": False, "error": "invalid_payload"}, status_code=400)
+    if payload.get("type") == "url_verification":
+        return JSONResponse({"challenge": payload.get("challenge")})
+    if payload.get("type") == "event_callback":
+        get_event_ingestor().handle_delivery(payload.get("event") or {})
+    return JSONResponse({"ok": True})
+
+
+def stream_pages(ctx: Context, total: int):
+    """PageCallback that reports progress (counts only) as pages are read.
+
+    The page text itself is not sent; it is part of the tool result, and sending it as
+    notifications as well would deliver the whole output twice.
+    """
+    async def on_page(text: str, count: int) -> None:
+        await ctx.report_progress(count, total, f"{count} of up to {total} read")
+    return on_page
 
 
 @mcp.tool()
-async def slack_list_channels(limit: int = 100) -> str:
+async def slack_list_channels(ctx: Context, limit: int = 100, format: str = "text",
+                              fields: list[str] | None = None, ts_format: str = "iso") -> str:
     """List all channels in the Slack workspace.
 
     Args:
-        limit: Maximum number of channels to return (default 100, max 1000)
+        limit: Maximum number of channels to return (default 100)
+        format: "text", "jsonl" or "table" (compact; a fraction of the tokens of "text")
+        fields: Columns for jsonl/table: id, name, topic, purpose, members, is_private, is_member, created
+        ts_format: "iso" or "epoch" timestamps in jsonl/table
     """
-    return await list_slack_channels(SLACK_BOT_TOKEN, limit)
+    return await list_slack_channels(SLACK_BOT_TOKEN, limit, on_page=stream_pages(ctx, limit),
+                                     output_format=format, fields=fields, ts_format=ts_format)
 
 
 @mcp.tool()
-async def slack_send_message(channel_id: str, text: str) -> str:
+async def slack_send_message(channel_id: str, text: str, batch: bool = False) -> str:
     """Send a message to a Slack channel.
 
     Args:
-        channel_id: The ID of the channel to send the message to
+        channel_id: The ID of the channel to send the message to, or its name (e.g. #general)
         text: The message text to send
+        batch: Set for frequent progress updates; returns at once, and messages to the same
+            channel sent within a short window are combined into one post
+    """
+    return await send_slack_message(SLACK_BOT_TOKEN, channel_id, text, batch=batch)
+
+
+@mcp.tool()
+async def slack_send_messages(messages: list[dict[str, str]], coalesce: bool = True) -> str:
+    """Send several messages at once, to one or many channels.
+
+    Args:
+        messages: List of {"channel": channel ID or name, "text": message text}
+        coalesce: Combine messages to the same channel into as few posts as possible (default true)
     """
-    return await send_slack_message(SLACK_BOT_TOKEN, channel_id, text)
+    return await send_slack_messages(SLACK_BOT_TOKEN, messages, coalesce)
 
 
 @mcp.tool()
-async def slack_get_messages(channel_id: str, limit: int = 50) -> str:
+async def slack_get_messages(ctx: Context, channel_id: str, limit: int = 50,
+                             oldest: str | None = None, latest: str | None = None,
+                             format: str = "text", fields: list[str] | None = None,
+                             ts_format: str = "iso", truncate: int | None = None,
+                             include_threads: bool = False, reply_budget: int = 200) -> str:
     """Get recent messages from a Slack channel.
 
     Args:
-        channel_id: The ID of the channel to get messages from
-        limit: Maximum number of messages to return (default 50, max 1000)
+        channel_id: The ID of the channel to get messages from, or its name (e.g. #general)
+        limit: Maximum number of messages to return (default 50)
+        oldest: Only messages after this Unix timestamp (e.g. "1717171717.000000")
+        latest: Only messages before this Unix timestamp
+        format: "text", "jsonl" or "table" (compact; a fraction of the tokens of "text")
+        fields: Columns for jsonl/table: ts, user, user_id, text, reactions, replies, thread_ts, subtype, is_reply
+        ts_format: "iso" or "epoch" timestamps in jsonl/table
+        truncate: Cut each message's text to this many characters
+        include_threads: Also fetch thread replies and show them under their parent (jsonl/table
+            rows then always carry is_reply)
+        reply_budget: Max replies fetched across all threads (default 200)
+    """
+    return await get_channel_messages(SLACK_BOT_TOKEN, channel_id, limit, oldest=oldest, latest=latest,
+                                      on_page=stream_pages(ctx, limit), output_format=format,
+                                      fields=fields, ts_format=ts_format, truncate=truncate,
+                                      include_threads=include_threads, reply_budget=reply_budget)
+
+
+@mcp.tool()
+async def slack_search(query: str, channels: list[str] | None = None, k: int = 10,
+                       mode: str = "keyword") -> str:
+    """Search Slack message history and return only the most relevant messages.
+
+    Args:
+        query: Words to search for (e.g. "decision on database migration")
+        channels: Channel IDs or names to search (default: all channels the bot is in)
+        k: Number of messages to return (default 10)
+        mode: "keyword", "semantic" or "hybrid" (semantic modes need numpy)
+    """
+    return await search_slack_messages(SLACK_BOT_TOKEN, query, channels, k, mode)
+
+
+@mcp.tool()
+async def slack_wait_for_messages(channel_id: str, since: str | None = None, timeout: float | None = None,
+                                  limit: int = 50, format: str = "text", truncate: int | None = None) -> str:
+    """Wait for new messages in a Slack channel and return them as soon as they arrive.
+
+    Use this instead of calling slack_get_messages repeatedly to watch a channel.
+
+    Args:
+        channel_id: The ID of the channel to watch, or its name (e.g. #general)
+        since: Only messages after this Slack timestamp; omit to wait for the next new message.
+            Pass the "Next since" value from the previous result to continue.
+        timeout: Seconds to wait before returning with no messages (default 60, max 300)
+        limit: Maximum number of messages to return (default 50)
+        format: "text", "jsonl" or "table"
+        truncate: Cut each message's text to this many characters
     """
-    return await get_channel_messages(SLACK_BOT_TOKEN, channel_id, limit)
+    return await wait_for_messages(SLACK_BOT_TOKEN, channel_id, since, timeout, limit,
+                                   output_format=format, truncate=truncate)
 
 
 @mcp.tool()
@@ -91,5 +292,16 @@ async def weather_get_forecast(latitude: float, longitude: float) -> str:
 
 if __name__ == "__main__":
     # Initialize and run the server
-    logger.info("Starting FastMCP server...")
-    mcp.run(transport='stdio')
\ No newline at end of file
+    logger.info("Starting FastMCP server (%s)...", MCP_TRANSPORT)
+    if MCP_TRANSPORT == "stdio":
+        mcp.run(transport='stdio')
+    elif MCP_TRANSPORT == "streamable-http":
+        if MCP_HTTP_WORKERS > 1:
+            # Every worker has its own rate limiter; together they stay within one token's budget
+            os.environ.setdefault("SLACK_RATE_LIMIT_SHARE", str(1 / MCP_HTTP_WORKERS))
+            uvicorn.run("src.main:create_http_app", factory=True, host=MCP_HTTP_HOST,
+                        port=MCP_HTTP_PORT, workers=MCP_HTTP_WORKERS)
+        else:
+            uvicorn.run(create_http_app(), host=MCP_HTTP_HOST, port=MCP_HTTP_PORT)
+    else:
+        raise ValueError(f"Unknown MCP_TRANSPORT: {MCP_TRANSPORT} (use stdio or streamable-http)")
\ No newline at end of file
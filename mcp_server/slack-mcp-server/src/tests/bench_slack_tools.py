@@ -0,0 +1,129 @@
+"""Load benchmark: drive the Slack MCP tools against the fake Slack API over real sockets.
+
+Starts FakeSlack on a local port, points the shared client at it and runs each scenario
+`--iterations` times with `--concurrency` calls in flight. Reports throughput, latency
+percentiles, the Slack API calls each scenario cost, 429s and TCP connections opened.
+
+    python src/tests/bench_slack_tools.py --channels 50 --messages 1000 --latency 0.02 --rate-scale 60
+
+Caches start cold for every scenario; the first calls pay for warming them.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from typing import Awaitable, Callable, Dict, List
+
+# Add the project root to the path to allow `src.` imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.tests.fake_slack import FAKE_TOKEN, FakeSlack, make_workspace, reset_tool_state
+from src.tools.slack_tools import (get_channel_messages, list_slack_channels, search_slack_messages,
+                                   send_slack_message)
+from src.utils import rate_limiter, utils_mcp
+
+Scenario = Callable[[int], Awaitable[str]]
+
+
+def scenarios(args: argparse.Namespace) -> Dict[str, Scenario]:
+    def channel(i: int) -> str:
+        return f"C{i % args.channels:06d}"
+
+    return {
+        "list_channels": lambda i: list_slack_channels(FAKE_TOKEN, limit=args.channels),
+        "get_messages": lambda i: get_channel_messages(FAKE_TOKEN, channel(i), limit=args.limit),
+        "get_messages_jsonl": lambda i: get_channel_messages(FAKE_TOKEN, channel(i), limit=args.limit,
+                                                             output_format="jsonl"),
+        "get_messages_threads": lambda i: get_channel_messages(FAKE_TOKEN, channel(i), limit=args.limit,
+                                                               include_threads=True),
+        "send_message": lambda i: send_slack_message(FAKE_TOKEN, channel(i), f"benchmark message {i}"),
+        "search": lambda i: search_slack_messages(FAKE_TOKEN, "database migration rollback",
+                                                  [channel(i)], k=10),
+    }
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def run_scenario(call: Scenario, iterations: int, concurrency: int) -> tuple[List[float], int, float]:
+    """Latencies (s), failed calls and wall time of `iterations` calls, `concurrency` at a time."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    failures = 0
+
+    async def one(i: int) -> None:
+        nonlocal failures
+        async with semaphore:
+            start = time.perf_counter()
+            result = await call(i)
+            latencies.append(time.perf_counter() - start)
+            if result.startswith(("Failed", "Error", "No channels")):
+                failures += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(iterations)))
+    return latencies, failures, time.perf_counter() - started
+
+
+async def main(args: argparse.Namespace) -> None:
+    workspace = make_workspace(channels=args.channels, users=args.users, messages=args.messages,
+                               thread_ratio=args.thread_ratio, seed=args.seed)
+    fake = FakeSlack(workspace, latency=args.latency, jitter=args.jitter, rate_scale=args.rate_scale,
+                     enforce_rate_limits=not args.no_rate_limits)
+    os.environ["SLACK_API_BASE"] = await fake.start()
+    await utils_mcp.init_http_client()
+    selected = scenarios(args)
+    names = args.scenarios or list(selected)
+
+    header = (f"{'scenario':<22}{'calls':>7}{'failed':>8}{'calls/s':>10}{'p50 ms':>9}{'p95 ms':>9}"
+              f"{'max ms':>9}{'api calls':>11}{'429s':>6}{'conns':>7}{'throttled s':>13}")
+    print(f"workspace: {args.channels} channels, {args.users} users, {args.messages} messages/channel; "
+          f"latency {args.latency * 1000:.0f}ms, rate scale {args.rate_scale}")
+    print(header)
+    print("-" * len(header))
+    try:
+        for name in names:
+            reset_tool_state(rate_share=args.client_share or args.rate_scale)
+            fake.reset_stats()
+            latencies, failures, elapsed = await run_scenario(selected[name], args.iterations, args.concurrency)
+            throttled = sum(m["throttled_seconds"] for m in rate_limiter.get_rate_limiter().metrics().values())
+            print(f"{name:<22}{len(latencies):>7}{failures:>8}{len(latencies) / elapsed:>10.1f}"
+                  f"{percentile(latencies, 50) * 1000:>9.1f}{percentile(latencies, 95) * 1000:>9.1f}"
+                  f"{max(latencies) * 1000:>9.1f}{sum(fake.calls.values()):>11}"
+                  f"{sum(fake.rate_limited.values()):>6}{len(fake.connections):>7}{throttled:>13.2f}")
+    finally:
+        await utils_mcp.close_http_client()
+        await fake.stop()
+
+
+def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--channels", type=int, default=20)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--messages", type=int, default=500, help="messages per channel")
+    parser.add_argument("--thread-ratio", type=float, default=0.1, help="fraction of messages with threads")
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds added to every fake API call")
+    parser.add_argument("--jitter", type=float, default=0.01)
+    parser.add_argument("--rate-scale", type=float, default=60.0,
+                        help="multiplier on Slack's tier rates (60: per-minute limits become per-second)")
+    parser.add_argument("--client-share", type=float, default=None,
+                        help="client rate limiter share (default: match --rate-scale)")
+    parser.add_argument("--no-rate-limits", action="store_true", help="never answer 429")
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--limit", type=int, default=100, help="messages per get_messages call")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("scenarios", nargs="*", help="scenarios to run (default: all)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    unknown = set(args.scenarios) - set(scenarios(args))
+    if unknown:
+        sys.exit(f"Unknown scenarios: {sorted(unknown)}")
+    asyncio.run(main(args))
@@ -0,0 +1,222 @@
+"""Tests for pushed Slack event ingestion and the slack_wait_for_messages long poll."""
+import pytest, sys, os
+
+# Add the src directory to the path to allow imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import hashlib
+import hmac
+import json
+
+import httpx
+import pytest_asyncio
+from src.utils import utils_mcp
+from src.tools.event_ingest import (EventIngestor, LocalEventSource, SocketModeSource, get_event_ingestor,
+                                   verify_signature)
+from src.tools.message_store import MessageStore, get_session_store
+from src.tools.slack_tools import wait_for_messages
+from src.tests.fake_slack import FAKE_TOKEN, FakeSlack, make_workspace, reset_tool_state
+
+
+@pytest_asyncio.fixture
+async def fake_slack(monkeypatch):
+    """Fake workspace whose posts are also pushed through a LocalEventSource."""
+    monkeypatch.setenv("SLACK_API_BASE", "http://fake-slack/api")
+    monkeypatch.setenv("SLACK_WAIT_POLL_INTERVAL", "0.05")
+    reset_tool_state(rate_share=1000)
+    fake = FakeSlack(make_workspace(channels=2, users=3, messages=20, replies=0),
+                     enforce_rate_limits=False, events=LocalEventSource())
+    await utils_mcp.init_http_client(transport=httpx.ASGITransport(app=fake.app()))
+    yield fake
+    await utils_mcp.close_http_client()
+    reset_tool_state()
+
+
+def test_handle_applies_message_events():
+    store = MessageStore(":memory:")
+    ingestor = EventIngestor(store)
+    store.add("C1", [{"ts": "100.000001", "text": "parent", "user": "U1"}])
+
+    ingestor.handle({"type": "message", "channel": "C1", "ts": "200.000001", "text": "new",
+                     "event_ts": "200.000001", "channel_type": "channel"})
+    ingestor.handle({"type": "message", "channel": "C1", "ts": "150.000001", "thread_ts": "100.000001",
+                     "text": "reply"})
+    ingestor.handle({"type": "message", "subtype": "message_changed", "channel": "C1",
+                     "message": {"ts": "200.000001", "text": "edited"}})
+    ingestor.handle({"type": "message", "subtype": "message_deleted", "channel": "C1",
+                     "deleted_ts": "100.000001", "hidden": True})
+    ingestor.handle({"type": "reaction_added", "channel": "C1", "ts": "300.000001"})
+
+    assert store.read("C1", 10) == [{"ts": "200.000001", "text": "edited"}]
+    assert ingestor.received == 4
+
+
+def test_reply_bumps_parent_thread_state():
+    store = MessageStore(":memory:")
+    store.add("C1", [{"ts": "100.000001", "text": "parent", "reply_count": 1, "latest_reply": "110.000001"}])
+
+    EventIngestor(store).handle({"type": "message", "channel": "C1", "ts": "150.000001",
+                                 "thread_ts": "100.000001", "text": "reply"})
+
+    parent = store.get("C1", "100.000001")
+    assert (parent["reply_count"], parent["latest_reply"]) == (2, "150.000001")
+
+
+def test_redelivered_reply_counted_once():
+    store = MessageStore(":memory:")
+    store.add("C1", [{"ts": "100.000001", "text": "parent", "reply_count": 1, "latest_reply": "110.000001"}])
+    ingestor = EventIngestor(store)
+    reply = {"type": "message", "channel": "C1", "ts": "150.000001", "thread_ts": "100.000001", "text": "reply"}
+
+    ingestor.handle(reply)
+    ingestor.handle(dict(reply))  # Events API retry
+    ingestor.handle(dict(reply, ts="110.000001"))  # already in the synced count
+
+    assert store.get("C1", "100.000001")["reply_count"] == 2
+
+
+def test_events_api_connected_after_first_delivery():
+    store = MessageStore(":memory:")
+    ingestor = EventIngestor(store)
+    store.add("C1", [{"ts": "100.000001", "text": "old"}])
+    store.set_coverage("C1", "0", "100.000001")
+    assert not ingestor.connected
+
+    ingestor.handle_delivery({"type": "message", "channel": "C1", "ts": "200.000001", "text": "pushed"})
+    ingestor.mark_live("C1")
+
+    assert ingestor.connected and ingestor.is_live(store, "C1")
+    assert store.count("C1") == 2
+
+
+def test_verify_signature():
+    body = b'{"type":"event_callback"}'
+    signature = "v0=" + hmac.new(b"secret", b"v0:1000:" + body, hashlib.sha256).hexdigest()
+
+    assert verify_signature("secret", "1000", body, signature, now=1010)
+    assert not verify_signature("secret", "1000", body + b" ", signature, now=1010)
+    assert not verify_signature("secret", "1000", body, signature, now=2000)  # replayed
+    assert not verify_signature("secret", "soon", body, signature, now=1010)
+
+
+@pytest.mark.asyncio
+async def test_wait_wakes_on_pushed_event_without_polling(fake_slack):
+    ingestor = get_event_ingestor()
+    listener = asyncio.create_task(ingestor.run(fake_slack.events))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(wait_for_messages(FAKE_TOKEN, "C000001", timeout=5, output_format="jsonl",
+                                                   fields=["text"]))
+    await asyncio.sleep(0.1)
+    assert not waiter.done()
+
+    fake_slack.add_message("C000001", "deploy finished")
+    result = await asyncio.wait_for(waiter, 1)
+    fake_slack.events.close()
+    await listener
+
+    text, next_since = result.split("\n\nNext since: ")
+    assert text == '{"text":"deploy finished"}'
+    assert next_since == fake_slack.workspace.history["C000001"][-1]["ts"]
+    assert fake_slack.calls["conversations.history"] == 1  # the initial sync only
+    store = get_session_store()
+    assert store.coverage("C000001")[1] == next_since  # watermark moved with the event
+
+
+@pytest.mark.asyncio
+async def test_wait_continues_from_since(fake_slack):
+    history = fake_slack.workspace.history["C000000"]
+
+    result = await wait_for_messages(FAKE_TOKEN, "#channel-0", since=history[-3]["ts"], limit=1,
+                                     output_format="jsonl", fields=["ts"], ts_format="epoch")
+
+    assert result == f'{{"ts":"{history[-2]["ts"]}"}}\n\nNext since: {history[-2]["ts"]}'
+
+
+@pytest.mark.asyncio
+async def test_wait_polls_without_event_stream(fake_slack):
+    waiter = asyncio.create_task(wait_for_messages(FAKE_TOKEN, "C000000", timeout=5, output_format="jsonl",
+                                                   fields=["text"]))
+    await asyncio.sleep(0.12)
+    fake_slack.add_message("C000000", "polled")
+
+    result = await asyncio.wait_for(waiter, 2)
+
+    assert result.startswith('{"text":"polled"}')
+    assert fake_slack.calls["conversations.history"] >= 2
+
+
+@pytest.mark.asyncio
+async def test_wait_times_out(fake_slack):
+    newest = fake_slack.workspace.history["C000000"][-1]["ts"]
+
+    result = await wait_for_messages(FAKE_TOKEN, "C000000", timeout=0.1)
+
+    assert result == f"No new messages after waiting 0s\nNext since: {newest}"
+
+
+@pytest.mark.asyncio
+async def test_socket_mode_acks_and_yields_events():
+    websockets = pytest.importorskip("websockets")
+
+    acks = []
+
+    async def slack_socket(socket):
+        await socket.send("{not json")
+        await socket.send(json.dumps({"type": "hello"}))
+        await socket.send(json.dumps({"type": "events_api", "envelope_id": "e1",
+                                      "payload": {"event": {"type": "message", "channel": "C1", "ts": "1.0"}}}))
+        acks.append(json.loads(await socket.recv()))
+        await socket.wait_closed()
+
+    async with websockets.serve(slack_socket, "127.0.0.1", 0) as server:
+        port = server.sockets[0].getsockname()[1]
+
+        async def request(endpoint, token, **kwargs):
+            assert (endpoint, token, kwargs["method"]) == ("apps.connections.open", "xapp-test", "POST")
+            return {"ok": True, "url": f"ws://127.0.0.1:{port}"}
+
+        events = SocketModeSource("xapp-test", request).events()
+        received = [await events.__anext__(), await events.__anext__()]
+        await events.aclose()
+
+    assert received == [{"type": "hello"}, {"type": "message", "channel": "C1", "ts": "1.0"}]
+    assert acks == [{"envelope_id": "e1"}]
+
+
+@pytest.mark.asyncio
+async def test_socket_mode_reports_dropped_connection():
+    websockets = pytest.importorskip("websockets")
+
+    async def slack_socket(socket):
+        await socket.send(json.dumps({"type": "hello"}))  # then the handler returns, closing the socket
+
+    async with websockets.serve(slack_socket, "127.0.0.1", 0) as server:
+        port = server.sockets[0].getsockname()[1]
+
+        async def request(endpoint, token, **kwargs):
+            return {"ok": True, "url": f"ws://127.0.0.1:{port}"}
+
+        events = SocketModeSource("xapp-test", request).events()
+        received = [await events.__anext__() for _ in range(3)]
+        await events.aclose()
+
+    assert received == [{"type": "hello"}, {"type": "disconnect"}, {"type": "hello"}]
+
+
+@pytest.mark.asyncio
+async def test_run_goes_offline_on_disconnect_event():
+    ingestor = EventIngestor(MessageStore(":memory:"))
+    source = LocalEventSource()
+    listener = asyncio.create_task(ingestor.run(source))
+    await asyncio.sleep(0)
+    ingestor.mark_live("C1")
+    assert ingestor.is_live(ingestor.store, "C1")
+
+    source.put({"type": "disconnect"})
+    await asyncio.sleep(0)
+    assert not ingestor.connected and not ingestor.is_live(ingestor.store, "C1")
+
+    source.put({"type": "hello"})
+    source.close()
+    await listener
@@ -0,0 +1,84 @@
+"""End-to-end tests of the Slack tools against the in-process fake Slack API."""
+import pytest, sys, os
+
+# Add the src directory to the path to allow imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+
+import httpx
+import pytest_asyncio
+from src.utils import utils_mcp
+from src.tools.slack_tools import get_channel_messages, list_slack_channels, send_slack_message
+from src.tools.user_directory import get_user_directory
+from src.tests.fake_slack import FAKE_TOKEN, FakeSlack, make_workspace, reset_tool_state
+
+
+@pytest_asyncio.fixture
+async def serve(monkeypatch):
+    """Serve a fake workspace through the shared client via ASGITransport, with cold tool caches."""
+    monkeypatch.setenv("SLACK_API_BASE", "http://fake-slack/api")
+
+    async def start(**workspace) -> FakeSlack:
+        fake = FakeSlack(make_workspace(**workspace), enforce_rate_limits=False)
+        reset_tool_state(rate_share=1000)
+        await utils_mcp.init_http_client(transport=httpx.ASGITransport(app=fake.app()))
+        return fake
+
+    yield start
+    await utils_mcp.close_http_client()
+    reset_tool_state()
+
+
+@pytest_asyncio.fixture
+async def fake_slack(serve):
+    return await serve(channels=5, users=30, messages=250, thread_ratio=0.2)
+
+
+@pytest.mark.asyncio
+async def test_list_channels_follows_cursors(serve):
+    fake = await serve(channels=1100, users=1, messages=0)
+
+    result = await list_slack_channels(FAKE_TOKEN, limit=1050, output_format="table", fields=["id"])
+
+    assert result.splitlines()[1:] == [f"C{i:06d}" for i in range(1050)]
+    assert fake.calls["conversations.list"] == 2
+
+
+@pytest.mark.asyncio
+async def test_history_with_threads_matches_workspace(fake_slack):
+    workspace = fake_slack.workspace
+    history = workspace.history["C000003"]
+    parents = [m for m in history[-120:] if m.get("reply_count")]
+
+    result = await get_channel_messages(FAKE_TOKEN, "#channel-3", limit=120, output_format="jsonl",
+                                        fields=["ts", "thread_ts"], ts_format="epoch", include_threads=True)
+
+    lines = result.splitlines()
+    expected_replies = sum(len(workspace.replies[("C000003", m["ts"])]) for m in parents)
+    assert len(lines) == 120 + expected_replies
+    assert json.loads(lines[0])["ts"] == history[-1]["ts"]  # newest first
+    assert fake_slack.calls["conversations.replies"] == len(parents)
+    await get_user_directory(FAKE_TOKEN).warming
+    assert fake_slack.calls["users.list"] == 1  # 30 unknown users warm the directory in one page
+
+
+@pytest.mark.asyncio
+async def test_post_appends_to_history(fake_slack):
+    result = await send_slack_message(FAKE_TOKEN, "C000001", "hello from the fake")
+
+    assert result == "Message sent successfully"
+    assert fake_slack.workspace.history["C000001"][-1]["text"] == "hello from the fake"
+
+
+@pytest.mark.asyncio
+async def test_fake_answers_429_past_the_tier_rate():
+    fake = FakeSlack(make_workspace(channels=1, users=1, messages=1))
+    headers = {"Authorization": f"Bearer {FAKE_TOKEN}"}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=fake.app()), base_url="http://fake") as client:
+        codes = [(await client.get("/api/conversations.list", headers=headers)).status_code for _ in range(21)]
+        denied = await client.get("/api/auth.test")
+
+    assert codes == [200] * 20 + [429]  # tier 2: 20 per minute
+    assert fake.rate_limited["conversations.list"] == 1
+    assert denied.json() == {"ok": False, "error": "invalid_auth"}
@@ -0,0 +1,80 @@
+"""Tests for the queue-based logging pipeline."""
+import pytest, sys, os
+
+# Add the src directory to the path to allow imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import logging
+import logging.handlers
+from tools import config
+
+
+@pytest.fixture
+def log_file(tmp_path, monkeypatch):
+    path = tmp_path / "server.log"
+    monkeypatch.setenv("SLACK_LOG_FILE", str(path))
+    root = logging.getLogger()
+    level = root.level
+    yield path
+    config.stop_logging()
+    for handler in list(root.handlers):
+        if isinstance(handler, config.DeferredQueueHandler):
+            root.removeHandler(handler)
+    root.setLevel(level)
+
+
+def test_json_records_written_by_listener_thread(log_file, monkeypatch):
+    monkeypatch.setenv("SLACK_LOG_FORMAT", "json")
+    config.setup_logging()
+
+    logging.getLogger("tools.slack_tools").info("Returning %s messages", 3, extra={"channel": "C1"})
+    config.stop_logging()  # flushes what is still queued
+
+    entry = json.loads(log_file.read_text().strip())
+    assert entry["message"] == "Returning 3 messages"
+    assert entry["logger"] == "tools.slack_tools"
+    assert entry["channel"] == "C1"
+
+
+def test_caller_only_enqueues_unformatted_record(log_file):
+    config.setup_logging()
+    handler = next(h for h in logging.getLogger().handlers if isinstance(h, config.DeferredQueueHandler))
+    record = logging.LogRecord("x", logging.INFO, __file__, 1, "value %s", ("lazy",), None)
+
+    assert handler.prepare(record).msg == "value %s"
+
+
+def test_mutable_args_logged_as_they_were_at_the_call(log_file):
+    config.setup_logging()
+    pending = ["C1"]
+
+    logging.getLogger("snapshot").warning("pending: %s", pending)
+    pending.append("C2")
+    config.stop_logging()
+
+    assert "pending: ['C1']" in log_file.read_text()
+
+
+def test_file_rotates_at_max_bytes(log_file, monkeypatch):
+    monkeypatch.setenv("SLACK_LOG_MAX_BYTES", "200")
+    monkeypatch.setenv("SLACK_LOG_BACKUPS", "2")
+    config.setup_logging()
+
+    for i in range(20):
+        logging.getLogger("rotation").warning("line %s %s", i, "x" * 40)
+    config.stop_logging()
+
+    assert os.path.exists(f"{log_file}.1")
+    assert not os.path.exists(f"{log_file}.3")
+
+
+def test_per_process_file_has_pid_suffix(log_file):
+    config.setup_logging(per_process=True)
+
+    logging.getLogger("workers").warning("from worker")
+    config.stop_logging()
+
+    own_file = log_file.with_name(f"server.{os.getpid()}.log")
+    assert "from worker" in own_file.read_text()
+    assert not log_file.exists()
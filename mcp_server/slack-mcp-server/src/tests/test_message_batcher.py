@@ -0,0 +1,104 @@
+"""Tests for coalesced and fanned-out Slack message sending."""
+import pytest, sys, os
+
+# Add the src directory to the path to allow imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+from src.tools.message_batcher import MessageBatcher, group_texts
+from tools.slack_tools import send_slack_message, send_slack_messages
+
+
+def recording_post():
+    posts = []
+
+    async def post(channel, text, thread_ts):
+        posts.append((channel, text, thread_ts))
+        return {"ok": True, "ts": f"17000000{len(posts):02d}.000100"}
+
+    return post, posts
+
+
+def test_group_texts_respects_max_chars():
+    assert group_texts(["aaa", "bbb", "ccc"], max_chars=7) == [["aaa", "bbb"], ["ccc"]]
+    assert group_texts(["a" * 10, "b"], max_chars=5) == [["a" * 10], ["b"]]
+
+
+@pytest.mark.asyncio
+async def test_burst_to_one_channel_becomes_one_post():
+    post, posts = recording_post()
+    batcher = MessageBatcher(window=0.01, max_chars=1000, mode="post")
+
+    results = await asyncio.gather(*(batcher.submit("C1", f"step {i}", post) for i in range(5)),
+                                   batcher.submit("C2", "other channel", post))
+
+    assert sorted(posts) == [("C1", "step 0\nstep 1\nstep 2\nstep 3\nstep 4", None), ("C2", "other channel", None)]
+    assert [count for _, count in results] == [5, 5, 5, 5, 5, 1]
+
+
+@pytest.mark.asyncio
+async def test_full_batch_is_flushed_early():
+    post, posts = recording_post()
+    batcher = MessageBatcher(window=10, max_chars=12, mode="post")
+
+    first = asyncio.ensure_future(batcher.submit("C1", "12345", post))
+    second = asyncio.ensure_future(batcher.submit("C1", "67890", post))
+    await asyncio.sleep(0)
+    third = asyncio.ensure_future(batcher.submit("C1", "overflow", post))
+    await asyncio.wait_for(asyncio.gather(first, second), timeout=1)
+
+    assert posts == [("C1", "12345\n67890", None)]
+    third.cancel()
+
+
+@pytest.mark.asyncio
+async def test_thread_mode_replies_under_first_post():
+    post, posts = recording_post()
+    batcher = MessageBatcher(window=0.01, mode="thread")
+
+    await batcher.submit("C1", "deploy started", post)
+    await batcher.submit("C1", "deploy 50%", post)
+
+    assert posts[0] == ("C1", "deploy started", None)
+    assert posts[1] == ("C1", "deploy 50%", "1700000001.000100")
+
+
+@pytest.mark.asyncio
+async def test_sequential_batched_sends_share_one_post(mock_slack_bot_token):
+    batcher = MessageBatcher(window=0.05, max_chars=1000, mode="post")
+
+    with patch('tools.slack_tools.get_message_batcher', return_value=batcher), \
+            patch('tools.slack_tools.make_slack_request', new_callable=AsyncMock) as mock_request:
+        mock_request.return_value = {"ok": False, "error": "not_in_channel"}
+        first = await send_slack_message(mock_slack_bot_token, "C1", "build started", batch=True)
+        second = await send_slack_message(mock_slack_bot_token, "C1", "tests running", batch=True)
+        assert mock_request.await_count == 0  # neither call waited for the post
+        await batcher.drain()
+        third = await send_slack_message(mock_slack_bot_token, "C1", "done", batch=True)
+        await batcher.drain()
+
+    assert first == second == "Message queued; it will be posted within 0.05s"
+    assert third.endswith("(an earlier batched post to this channel failed: not_in_channel)")
+    posts = [c.kwargs["json_data"]["text"] for c in mock_request.await_args_list]
+    assert posts == ["build started\ntests running", "done"]
+
+
+@pytest.mark.asyncio
+async def test_send_messages_fans_out_per_channel(mock_slack_bot_token):
+    messages = [{"channel": "C1", "text": "a"}, {"channel": "C2", "text": "b"},
+                {"channel": "C1", "text": "c"}, {"channel": "C3", "text": "d"}]
+
+    async def api(endpoint, bot_token, json_data=None, **kwargs):
+        if json_data["channel"] == "C3":
+            return {"ok": False, "error": "not_in_channel"}
+        return {"ok": True}
+
+    with patch('tools.slack_tools.make_slack_request', new_callable=AsyncMock) as mock_request:
+        mock_request.side_effect = api
+        result = await send_slack_messages(mock_slack_bot_token, messages)
+
+    posted = sorted(c.kwargs["json_data"]["text"] for c in mock_request.await_args_list)
+    assert posted == ["a\nc", "b", "d"]
+    assert "Sent 3/4 messages to 3 channels" in result
+    assert "C3: not_in_channel" in result
@@ -0,0 +1,145 @@
+"""Tests for the local Slack message store and incremental sync."""
+import pytest, sys, os
+
+# Add the src directory to the path to allow imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from unittest.mock import AsyncMock, patch
+from src.tools.message_store import HISTORY_START, MessageStore
+from tools.slack_tools import SlackAPIError, get_channel_messages, sync_message_store
+
+
+class FakeHistory:
+    """conversations.history over an in-memory channel, honouring oldest/latest/inclusive/cursor."""
+
+    def __init__(self, count):
+        self.messages = [{"ts": f"{1700000000 + i}.000100", "text": f"msg-{i}"} for i in range(count)]
+
+    def post(self, i):
+        self.messages.append({"ts": f"{1700000000 + i}.000100", "text": f"msg-{i}"})
+
+    async def __call__(self, endpoint, bot_token, params=None, **kwargs):
+        assert endpoint == "conversations.history"
+        inclusive = params.get("inclusive")
+        hits = [m for m in reversed(self.messages)
+                if (not params.get("oldest") or (m["ts"] >= params["oldest"] if inclusive else m["ts"] > params["oldest"]))
+                and (not params.get("latest") or (m["ts"] <= params["latest"] if inclusive else m["ts"] < params["latest"]))]
+        start = int(params.get("cursor") or 0)
+        end = start + params["limit"]
+        return {"ok": True, "messages": hits[start:end],
+                "response_metadata": {"next_cursor": str(end) if end < len(hits) else ""}}
+
+
+@pytest.fixture
+def store():
+    store = MessageStore(":memory:")
+    yield store
+    store.close()
+
+
+@pytest.mark.asyncio
+async def test_repeated_reads_fetch_only_new_messages(store, mock_slack_bot_token):
+    history = FakeHistory(300)
+    request = AsyncMock(side_effect=history.__call__)
+
+    with patch('tools.slack_tools.make_slack_request', request), \
+            patch('tools.slack_tools.get_message_store', return_value=store):
+        first = await get_channel_messages(mock_slack_bot_token, "C1", limit=50)
+        assert "msg-299" in first and "msg-250" in first and "msg-249" not in first
+        calls_after_first = request.await_count
+
+        history.post(300)
+        second = await get_channel_messages(mock_slack_bot_token, "C1", limit=50)
+
+    assert "msg-300" in second and "msg-251" in second and "msg-250" not in second
+    sync_calls = request.await_args_list[calls_after_first:]
+    assert len(sync_calls) == 1
+    assert sync_calls[0].kwargs["params"]["oldest"] == "1700000299.000100"
+    assert store.coverage("C1")[1] == "1700000300.000100"
+
+
+@pytest.mark.asyncio
+async def test_older_history_is_backfilled_once(store, mock_slack_bot_token):
+    history = FakeHistory(1000)
+    request = AsyncMock(side_effect=history.__call__)
+
+    with patch('tools.slack_tools.make_slack_request', request):
+        await sync_message_store(store, mock_slack_bot_token, "C1", limit=200)
+        await sync_message_store(store, mock_slack_bot_token, "C1", limit=500)
+        backfill = request.await_args_list[-1].kwargs["params"]
+        assert backfill["latest"] == "1700000800.000100"
+
+        count = request.await_count
+        await sync_message_store(store, mock_slack_bot_token, "C1", limit=400)
+
+    assert request.await_count == count + 1  # just the watermark check
+    assert store.count("C1") == 500
+    assert store.coverage("C1") == ("1700000500.000100", "1700000999.000100")
+
+
+@pytest.mark.asyncio
+async def test_whole_history_marks_coverage_complete(store, mock_slack_bot_token):
+    history = FakeHistory(30)
+    request = AsyncMock(side_effect=history.__call__)
+
+    with patch('tools.slack_tools.make_slack_request', request):
+        await sync_message_store(store, mock_slack_bot_token, "C1", limit=100)
+        count = request.await_count
+        await sync_message_store(store, mock_slack_bot_token, "C1", limit=1000)
+
+    assert store.coverage("C1")[0] == HISTORY_START
+    assert request.await_count == count + 1
+
+
+@pytest.mark.asyncio
+async def test_truncated_sync_drops_non_contiguous_history(store, mock_slack_bot_token, monkeypatch):
+    monkeypatch.setenv("SLACK_MESSAGE_STORE_SYNC_MAX", "20")
+    history = FakeHistory(50)
+    request = AsyncMock(side_effect=history.__call__)
+
+    with patch('tools.slack_tools.make_slack_request', request):
+        await sync_message_store(store, mock_slack_bot_token, "C1", limit=10)
+        for i in range(50, 100):
+            history.post(i)
+        await sync_message_store(store, mock_slack_bot_token, "C1", limit=10)
+
+    assert store.coverage("C1") == ("1700000080.000100", "1700000099.000100")
+    assert store.count("C1") == 20
+
+
+@pytest.mark.asyncio
+async def test_backfill_toward_old_window_is_capped(store, mock_slack_bot_token, monkeypatch):
+    monkeypatch.setenv("SLACK_MESSAGE_STORE_SYNC_MAX", "300")
+    history = FakeHistory(1000)
+    request = AsyncMock(side_effect=history.__call__)
+
+    with patch('tools.slack_tools.make_slack_request', request), \
+            patch('tools.slack_tools.get_message_store', return_value=store):
+        await sync_message_store(store, mock_slack_bot_token, "C1", limit=10)
+        result = await get_channel_messages(mock_slack_bot_token, "C1", limit=3, latest="1700000005.000100",
+                                            output_format="jsonl", fields=["text"])
+
+    assert result.splitlines() == ['{"text":"msg-5"}', '{"text":"msg-4"}', '{"text":"msg-3"}']
+    assert store.count("C1") <= 200 + 300  # first sync + one capped backfill
+    assert request.await_args_list[-1].kwargs["params"]["latest"] == "1700000005.000100"  # read directly
+
+
+@pytest.mark.asyncio
+async def test_failed_sync_page_stores_nothing(store, mock_slack_bot_token):
+    history = FakeHistory(50)
+
+    async def request(endpoint, bot_token, params=None, **kwargs):
+        if params.get("cursor"):
+            return {"ok": False, "error": "ratelimited"}
+        return await history(endpoint, bot_token, params, **kwargs)
+
+    with patch('tools.slack_tools.make_slack_request', AsyncMock(side_effect=request)):
+        await sync_message_store(store, mock_slack_bot_token, "C1", limit=10)
+        coverage = store.coverage("C1")
+        for i in range(50, 1200):
+            history.post(i)
+        with pytest.raises(SlackAPIError):
+            await sync_message_store(store, mock_slack_bot_token, "C1", limit=10)
+
+    assert store.coverage("C1") == coverage
+    assert store.count("C1") == 50  # none of the first page's newest messages sit beyond the coverage
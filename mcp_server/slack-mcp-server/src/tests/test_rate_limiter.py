@@ -0,0 +1,112 @@
+"""Tests for the Slack rate-limit scheduler."""
+import pytest, sys, os
+
+# Add the src directory to the path to allow imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+import pytest_asyncio
+from utils import utils_mcp
+from src.utils import rate_limiter
+from src.utils.rate_limiter import RateLimiter, RateLimitTimeout, TokenBucket
+
+
+class FakeClock:
+    """Clock whose sleep() just advances time."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_bucket_spreads_burst_at_tier_rate():
+    """After the burst allowance, reservations are spaced at 1/rate in arrival order."""
+    clock = FakeClock()
+    bucket = TokenBucket(per_minute=60, burst=2, clock=clock)
+
+    waits = [bucket.reserve() for _ in range(4)]
+
+    assert waits == [0.0, 0.0, 1.0, 2.0]
+    with pytest.raises(RateLimitTimeout):
+        bucket.reserve(max_wait=2.5)
+
+
+def test_block_pauses_bucket_until_retry_after():
+    clock = FakeClock()
+    bucket = TokenBucket(per_minute=60, burst=5, clock=clock)
+
+    bucket.block(10)
+
+    assert bucket.reserve() == 10.0
+    assert bucket.reserve() == 11.0
+
+
+def test_share_scales_bucket_rates():
+    """Each of N processes sharing a token gets 1/N of the tier rate."""
+    clock = FakeClock()
+    limiter = RateLimiter(clock=clock, share=0.5)
+
+    bucket = limiter.bucket("conversations.list")
+
+    assert bucket.rate == pytest.approx(10 / 60)
+    assert limiter.bucket("chat.postMessage:C1").rate == pytest.approx(0.5)
+
+
+@pytest.mark.asyncio
+async def test_limiter_records_throttled_time():
+    """Throttled calls sleep and show up in the metrics, per method and per channel for posts."""
+    clock = FakeClock()
+    limiter = RateLimiter(clock=clock, sleep=clock.sleep)
+    key = limiter.bucket_key("chat.postMessage", "C1")
+
+    for _ in range(5):
+        await limiter.acquire(key)
+
+    assert key == "chat.postMessage:C1"
+    assert limiter.bucket_key("users.info", "C1") == "users.info"
+    assert limiter.metrics()[key] == {"throttled_calls": 2, "throttled_seconds": 2.0,
+                                      "rate_limited": 0, "timeouts": 0}
+
+
+@pytest_asyncio.fixture
+async def slack_429_then_ok(monkeypatch):
+    """Shared client whose first conversations.history call gets a 429."""
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if len(calls) == 1:
+            return httpx.Response(429, headers={"Retry-After": "2"})
+        return httpx.Response(200, json={"ok": True, "messages": []})
+
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter, "_rate_limiter", RateLimiter(clock=clock, sleep=clock.sleep))
+    await utils_mcp.init_http_client(transport=httpx.MockTransport(handler))
+    yield calls
+    await utils_mcp.close_http_client()
+
+
+@pytest.mark.asyncio
+async def test_429_is_retried_after_retry_after(slack_429_then_ok):
+    data = await utils_mcp.make_slack_request("conversations.history", "xoxb-test", params={"channel": "C1"})
+
+    assert data == {"ok": True, "messages": []}
+    assert len(slack_429_then_ok) == 2
+    metrics = rate_limiter.get_rate_limiter().metrics()["conversations.history"]
+    assert metrics["rate_limited"] == 1
+    assert metrics["throttled_seconds"] == 2.0
+
+
+@pytest.mark.asyncio
+async def test_429_past_deadline_reports_ratelimited(slack_429_then_ok, monkeypatch):
+    monkeypatch.setenv("SLACK_RATE_LIMIT_MAX_WAIT", "1")
+
+    data = await utils_mcp.make_slack_request("conversations.history", "xoxb-test", params={"channel": "C1"})
+
+    assert data == {"ok": False, "error": "ratelimited"}
+    assert len(slack_429_then_ok) == 1
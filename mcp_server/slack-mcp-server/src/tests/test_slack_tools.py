@@ -1,5 +1,6 @@
 
 """Tests for Slack tools."""
+import json
 import pytest, sys, os
 
 #print(sys.path)
@@ -52,7 +53,8 @@ async def test_list_slack_channels_success(mock_slack_bot_token):
         mock_request.assert_called_once_with(
             "conversations.list",
             mock_slack_bot_token,
-            params={"limit": 100, "exclude_archived": True}
+            params={"limit": 100, "exclude_archived": True,
+                    "types": "public_channel,private_channel"}
         )
 
 
@@ -170,6 +172,140 @@ async def test_get_channel_messages_no_messages(mock_slack_bot_token):
         assert "No messages found in the channel" in result
 
 
+
+@pytest.mark.asyncio
+async def test_list_slack_channels_follows_cursor(mock_slack_bot_token):
+    """Pages are requested until the cursor runs out or the limit is reached."""
+    pages = {
+        None: {"ok": True, "channels": [{"id": f"C{i}", "name": f"chan-{i}"} for i in range(1000)],
+               "response_metadata": {"next_cursor": "next-page"}},
+        "next-page": {"ok": True, "channels": [{"id": f"C{i}", "name": f"chan-{i}"} for i in range(1000, 1400)],
+                      "response_metadata": {"next_cursor": "more"}},
+    }
+
+    with patch('tools.slack_tools.make_slack_request', new_callable=AsyncMock) as mock_request:
+        mock_request.side_effect = lambda *args, **kwargs: pages[kwargs["params"].get("cursor")]
+        result = await list_slack_channels(mock_slack_bot_token, limit=1200)
+
+        assert "chan-1199" in result
+        assert "chan-1200" not in result
+        assert [c[1]["params"] for c in mock_request.call_args_list] == [
+            {"limit": 1000, "exclude_archived": True, "types": "public_channel,private_channel"},
+            {"limit": 200, "exclude_archived": True, "types": "public_channel,private_channel",
+             "cursor": "next-page"},
+        ]
+
+
+@pytest.mark.asyncio
+async def test_get_channel_messages_time_window_and_pages(mock_slack_bot_token):
+    """oldest/latest are passed through and each page is emitted as it is formatted."""
+    pages = {
+        None: {"ok": True, "messages": [{"text": "first", "ts": "1700000002.0"}],
+               "response_metadata": {"next_cursor": "c2"}},
+        "c2": {"ok": True, "messages": [{"text": "second", "ts": "1700000001.0"}],
+               "response_metadata": {"next_cursor": ""}},
+    }
+    emitted = []
+
+    async def on_page(text, count):
+        emitted.append((count, text))
+
+    with patch('tools.slack_tools.make_slack_request', new_callable=AsyncMock) as mock_request:
+        mock_request.side_effect = lambda *args, **kwargs: pages[kwargs["params"].get("cursor")]
+        result = await get_channel_messages(mock_slack_bot_token, "C1234", limit=10,
+                                            oldest="1700000000.0", latest="1700000100.0", on_page=on_page)
+
+        assert "first" in result and "second" in result
+        assert [count for count, _ in emitted] == [1, 2]
+        assert "second" in emitted[1][1]
+        first_params = mock_request.call_args_list[0][1]["params"]
+        assert first_params["oldest"] == "1700000000.0"
+        assert first_params["latest"] == "1700000100.0"
+        assert mock_request.call_args_list[1][1]["params"]["cursor"] == "c2"
+
+
+@pytest.mark.asyncio
+async def test_get_channel_messages_keeps_pages_read_before_error(mock_slack_bot_token):
+    """A failure on a later page returns what was read, with a note."""
+    pages = {
+        None: {"ok": True, "messages": [{"text": "kept", "ts": "1700000002.0"}],
+               "response_metadata": {"next_cursor": "c2"}},
+        "c2": {"ok": False, "error": "ratelimited"},
+    }
+
+    with patch('tools.slack_tools.make_slack_request', new_callable=AsyncMock) as mock_request:
+        mock_request.side_effect = lambda *args, **kwargs: pages[kwargs["params"].get("cursor")]
+        result = await get_channel_messages(mock_slack_bot_token, "C1234", limit=10)
+
+        assert "kept" in result
+        assert "stopped after 1 messages: ratelimited" in result
+
+
+@pytest.mark.asyncio
+async def test_get_channel_messages_jsonl_partial_failure(mock_slack_bot_token):
+    """In jsonl a failure on a later page ends the output with a parseable error record."""
+    pages = {
+        None: {"ok": True, "messages": [{"text": "kept", "ts": "1700000002.0"}],
+               "response_metadata": {"next_cursor": "c2"}},
+        "c2": {"ok": False, "error": "ratelimited"},
+    }
+
+    with patch('tools.slack_tools.make_slack_request', new_callable=AsyncMock) as mock_request:
+        mock_request.side_effect = lambda *args, **kwargs: pages[kwargs["params"].get("cursor")]
+        result = await get_channel_messages(mock_slack_bot_token, "C1234", limit=10, output_format="jsonl",
+                                            fields=["ts", "text"], ts_format="epoch")
+
+    records = [json.loads(line) for line in result.splitlines()]
+    assert records == [{"ts": "1700000002.0", "text": "kept"},
+                       {"error": "ratelimited", "partial": True, "count": 1}]
+
+
+@pytest.mark.asyncio
+async def test_get_channel_messages_jsonl_format(mock_slack_bot_token):
+    """jsonl emits one compact object per message with the chosen fields."""
+    history = {"ok": True, "messages": [
+        {"user": "U9", "text": "a fairly long status update", "ts": "1700000000.000100",
+         "reactions": [{"name": "tada", "count": 2}]},
+    ]}
+
+    with patch('tools.slack_tools.make_slack_request', new_callable=AsyncMock) as mock_request:
+        mock_request.side_effect = lambda endpoint, *args, **kwargs: (
+            history if endpoint == "conversations.history" else {"ok": True, "user": {"real_name": "Jo"}})
+        result = await get_channel_messages(mock_slack_bot_token, "C1234", output_format="jsonl",
+                                            fields=["ts", "user", "text", "reactions"], truncate=8)
+
+    assert result == '{"ts":"2023-11-14T22:13:20Z","user":"Jo","text":"a fairly…","reactions":":tada:2"}'
+
+
+@pytest.mark.asyncio
+async def test_list_slack_channels_table_format(mock_slack_bot_token):
+    """table emits a header row and tab-separated columns; epoch leaves timestamps as-is."""
+    channels = {"ok": True, "channels": [
+        {"id": "C1", "name": "general", "num_members": 5, "created": 1600000000,
+         "topic": {"value": "line one\nline two"}},
+        {"id": "C2", "name": "random", "num_members": 3, "created": 1600000001, "topic": {"value": ""}},
+    ]}
+
+    with patch('tools.slack_tools.make_slack_request', new_callable=AsyncMock) as mock_request:
+        mock_request.return_value = channels
+        table = await list_slack_channels(mock_slack_bot_token, output_format="table",
+                                          fields=["id", "name", "created", "topic"], ts_format="epoch")
+        text = await list_slack_channels(mock_slack_bot_token)
+
+    assert table.splitlines() == ["id\tname\tcreated\ttopic",
+                                  "C1\tgeneral\t1600000000\tline one\\nline two",
+                                  "C2\trandom\t1600000001\t"]
+    assert len(table) < len(text) / 2
+
+
+@pytest.mark.asyncio
+async def test_unknown_output_field_is_reported(mock_slack_bot_token):
+    with patch('tools.slack_tools.make_slack_request', new_callable=AsyncMock) as mock_request:
+        result = await list_slack_channels(mock_slack_bot_token, output_format="jsonl", fields=["owner"])
+
+    assert "Unknown fields ['owner']" in result
+    mock_request.assert_not_called()
+
 import asyncio
 
 async def main():
@@ -0,0 +1,99 @@
+"""Tests for inline thread expansion in get_channel_messages."""
+import pytest, sys, os
+
+# Add the src directory to the path to allow imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+from src.tools.thread_cache import ThreadCache, get_thread_cache
+from tools.slack_tools import get_channel_messages
+
+
+def parent(i, replies, latest_reply="1"):
+    ts = f"1700000{i:03d}.000100"
+    return {"ts": ts, "thread_ts": ts, "reply_count": replies, "latest_reply": latest_reply,
+            "user": "U1", "text": f"parent {i}"}
+
+
+class FakeSlack:
+    """conversations.history with thread parents; conversations.replies tracks concurrency."""
+
+    def __init__(self, parents):
+        self.parents = parents
+        self.active = 0
+        self.peak = 0
+
+    async def __call__(self, endpoint, bot_token, params=None, **kwargs):
+        if endpoint == "conversations.history":
+            return {"ok": True, "messages": self.parents}
+        if endpoint == "users.info":
+            return {"ok": True, "user": {"real_name": params["user"]}}
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        p = next(p for p in self.parents if p["ts"] == params["ts"])
+        replies = [{"ts": f"{p['ts'][:-1]}{n + 1}", "user": "U2", "text": f"reply {n} to {p['text']}"}
+                   for n in range(p["reply_count"])]
+        return {"ok": True, "messages": ([p] + replies)[:params["limit"]]}
+
+
+@pytest.fixture(autouse=True)
+def fresh_thread_cache():
+    get_thread_cache().clear()
+    yield
+    get_thread_cache().clear()
+
+
+@pytest.mark.asyncio
+async def test_threads_expanded_concurrently_and_cached(mock_slack_bot_token, monkeypatch):
+    monkeypatch.setenv("SLACK_THREAD_CONCURRENCY", "2")
+    slack = FakeSlack([parent(i, 2) for i in range(5)])
+
+    with patch('tools.slack_tools.make_slack_request', new_callable=AsyncMock) as mock_request:
+        mock_request.side_effect = slack.__call__
+        result = await get_channel_messages(mock_slack_bot_token, "C1234", include_threads=True)
+        replies_calls = [c for c in mock_request.await_args_list if c.args[0] == "conversations.replies"]
+        await get_channel_messages(mock_slack_bot_token, "C1234", include_threads=True)
+        replies_calls_again = [c for c in mock_request.await_args_list if c.args[0] == "conversations.replies"]
+
+    assert "↳" in result and "reply 1 to parent 4" in result
+    assert len(replies_calls) == 5
+    assert slack.peak == 2
+    assert len(replies_calls_again) == 5  # second read served from the thread cache
+
+
+@pytest.mark.asyncio
+async def test_reply_budget_limits_fetched_replies(mock_slack_bot_token):
+    slack = FakeSlack([parent(1, 4), parent(2, 4), parent(3, 4)])
+
+    with patch('tools.slack_tools.make_slack_request', new_callable=AsyncMock) as mock_request:
+        mock_request.side_effect = slack.__call__
+        result = await get_channel_messages(mock_slack_bot_token, "C1234", include_threads=True, reply_budget=6)
+
+    replies_calls = [c for c in mock_request.await_args_list if c.args[0] == "conversations.replies"]
+    assert [c.kwargs["params"]["limit"] for c in replies_calls] == [5, 3]
+    assert "… 2 more replies" in result
+    assert "reply 0 to parent 3" not in result
+
+
+@pytest.mark.asyncio
+async def test_compact_reply_rows_are_marked(mock_slack_bot_token):
+    slack = FakeSlack([parent(1, 2)])
+
+    with patch('tools.slack_tools.make_slack_request', new_callable=AsyncMock) as mock_request:
+        mock_request.side_effect = slack.__call__
+        result = await get_channel_messages(mock_slack_bot_token, "C1234", output_format="table",
+                                            fields=["text"], include_threads=True)
+
+    assert result.splitlines() == ["text\tis_reply", "parent 1\tFalse",
+                                   "reply 0 to parent 1\tTrue", "reply 1 to parent 1\tTrue"]
+
+
+def test_cache_invalidated_by_new_reply():
+    cache = ThreadCache()
+    cache.put("C1", "1.0", "5.0", [{"ts": "2.0"}], complete=True)
+
+    assert cache.get("C1", "1.0", "5.0", wanted=10) == [{"ts": "2.0"}]
+    assert cache.get("C1", "1.0", "6.0", wanted=10) is None
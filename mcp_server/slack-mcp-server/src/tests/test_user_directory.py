@@ -0,0 +1,112 @@
+"""Tests for the cached Slack user directory."""
+import pytest, sys, os
+
+# Add the src directory to the path to allow imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+from unittest.mock import AsyncMock
+from tools.user_directory import UserDirectory
+
+
+def users_info_mock(delay: float = 0.01):
+    """users.info stub that records the peak number of concurrent calls."""
+    state = {"active": 0, "peak": 0}
+
+    async def call(endpoint, bot_token, params=None, **kwargs):
+        state["active"] += 1
+        state["peak"] = max(state["peak"], state["active"])
+        await asyncio.sleep(delay)
+        state["active"] -= 1
+        return {"ok": True, "user": {"real_name": f"Name {params['user']}", "name": params["user"]}}
+
+    return AsyncMock(side_effect=call), state
+
+
+@pytest.mark.asyncio
+async def test_misses_fetched_concurrently_and_cached(mock_slack_bot_token):
+    """Misses go out in parallel (bounded), and a second lookup makes no requests."""
+    request, state = users_info_mock()
+    directory = UserDirectory(concurrency=4, warmup_threshold=1000)
+    user_ids = [f"U{i}" for i in range(10)]
+
+    names = await directory.resolve(mock_slack_bot_token, user_ids, request)
+
+    assert names["U3"] == "Name U3"
+    assert len(names) == 10
+    assert request.await_count == 10
+    assert state["peak"] == 4
+
+    again = await directory.resolve(mock_slack_bot_token, user_ids, request)
+    assert again == names
+    assert request.await_count == 10
+
+
+@pytest.mark.asyncio
+async def test_entries_expire_after_ttl(mock_slack_bot_token):
+    """Names older than the TTL are fetched again."""
+    now = [0.0]
+    request, _ = users_info_mock(delay=0)
+    directory = UserDirectory(ttl=60, warmup_threshold=1000, clock=lambda: now[0])
+
+    await directory.resolve(mock_slack_bot_token, ["U1"], request)
+    now[0] = 30
+    await directory.resolve(mock_slack_bot_token, ["U1"], request)
+    assert request.await_count == 1
+
+    now[0] = 61
+    await directory.resolve(mock_slack_bot_token, ["U1"], request)
+    assert request.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_many_misses_warm_up_with_users_list(mock_slack_bot_token):
+    """Past the threshold the directory is loaded page by page from users.list, in the background."""
+    pages = {
+        None: {"ok": True, "members": [{"id": "U1", "real_name": "Ada"}, {"id": "U2", "name": "bob"}],
+               "response_metadata": {"next_cursor": "page2"}},
+        "page2": {"ok": True, "members": [{"id": "U3", "real_name": "Cy"}],
+                  "response_metadata": {"next_cursor": ""}},
+    }
+
+    async def call(endpoint, bot_token, params=None, **kwargs):
+        if endpoint == "users.list":
+            return pages[params.get("cursor")]
+        if params["user"] == "U4":
+            return {"ok": True, "user": {"real_name": "Late Joiner"}}
+        return {"ok": False, "error": "user_not_visible"}
+
+    request = AsyncMock(side_effect=call)
+    directory = UserDirectory(warmup_threshold=3)
+
+    names = await directory.resolve(mock_slack_bot_token, ["U1", "U2", "U3", "U4"], request)
+    await directory.warming
+
+    assert names["U4"] == "Late Joiner"  # users.info answers the lookup; the warm-up may or may not be done
+    list_calls = [c for c in request.await_args_list if c.args[0] == "users.list"]
+    assert [c.kwargs["params"] for c in list_calls] == [{"limit": 200}, {"limit": 200, "cursor": "page2"}]
+
+    request.reset_mock()
+    names = await directory.resolve(mock_slack_bot_token, ["U1", "U2", "U3", "U4"], request)
+    assert names == {"U1": "Ada", "U2": "bob", "U3": "Cy", "U4": "Late Joiner"}
+    request.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_warm_up_does_not_delay_the_lookup(mock_slack_bot_token):
+    listed = asyncio.Event()
+
+    async def call(endpoint, bot_token, params=None, **kwargs):
+        if endpoint == "users.list":
+            await listed.wait()  # a slow, rate-limited users.list
+            return {"ok": True, "members": []}
+        return {"ok": True, "user": {"real_name": params["user"]}}
+
+    directory = UserDirectory(warmup_threshold=2)
+
+    names = await asyncio.wait_for(directory.resolve(mock_slack_bot_token, ["U1", "U2"], AsyncMock(side_effect=call)), 1)
+
+    assert names == {"U1": "U1", "U2": "U2"}
+    assert not directory.warming.done()
+    listed.set()
+    await directory.warming
@@ -0,0 +1,98 @@
+"""Tests for the shared HTTP client in utils_mcp."""
+import pytest, sys, os
+
+# Add the src directory to the path to allow imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+import pytest_asyncio
+from utils import utils_mcp
+
+
+@pytest_asyncio.fixture
+async def mock_transport():
+    """Shared client backed by a mock transport that records every request."""
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        return httpx.Response(200, json={"ok": True, "path": request.url.path})
+
+    await utils_mcp.init_http_client(transport=httpx.MockTransport(handler))
+    yield seen
+    await utils_mcp.close_http_client()
+
+
+@pytest.mark.asyncio
+async def test_requests_share_one_client(mock_transport, mock_slack_bot_token):
+    """Every Slack call goes through the same long-lived client."""
+    client = utils_mcp.get_http_client()
+
+    first = await utils_mcp.make_slack_request("conversations.list", "xoxb-test", params={"limit": 1})
+    second = await utils_mcp.make_slack_request(
+        "chat.postMessage", "xoxb-test", json_data={"channel": "C1", "text": "hi"}, method="POST"
+    )
+
+    assert first == {"ok": True, "path": "/api/conversations.list"}
+    assert second["path"] == "/api/chat.postMessage"
+    assert utils_mcp.get_http_client() is client
+    assert [r.headers["Authorization"] for r in mock_transport] == ["Bearer xoxb-test"] * 2
+
+
+@pytest.mark.asyncio
+async def test_close_releases_client(mock_transport):
+    """Shutdown closes the pool; a later call transparently gets a fresh client."""
+    client = utils_mcp.get_http_client()
+    await utils_mcp.close_http_client()
+
+    assert client.is_closed
+    assert utils_mcp._http_client is None
+    fresh = utils_mcp.get_http_client()
+    assert fresh is not client and not fresh.is_closed
+
+
+def test_create_http_client_limits_from_env(monkeypatch):
+    """Pool limits, keep-alive expiry and timeout come from the environment."""
+    monkeypatch.setenv("SLACK_HTTP_MAX_CONNECTIONS", "7")
+    monkeypatch.setenv("SLACK_HTTP_MAX_KEEPALIVE", "3")
+    monkeypatch.setenv("SLACK_HTTP_KEEPALIVE_EXPIRY", "12.5")
+    monkeypatch.setenv("SLACK_HTTP_TIMEOUT", "4")
+    monkeypatch.setenv("SLACK_HTTP2", "true")
+
+    client = utils_mcp.create_http_client()
+    pool = client._transport._pool
+
+    assert pool._max_connections == 7
+    assert pool._max_keepalive_connections == 3
+    assert pool._keepalive_expiry == 12.5
+    assert client.timeout.read == 4
+
+
+@pytest.mark.asyncio
+async def test_nws_conditional_request_serves_cached_body_on_304(monkeypatch):
+    """The second GET sends the stored validators; a 304 returns the first body without a download."""
+    from collections import OrderedDict
+
+    monkeypatch.setattr(utils_mcp, "_nws_validators", OrderedDict())
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(dict(request.headers))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304, headers={"Cache-Control": "max-age=60"})
+        return httpx.Response(200, json={"properties": {"periods": [1, 2]}},
+                              headers={"ETag": '"v1"', "Last-Modified": "Mon, 19 Oct 2026 12:00:00 GMT"})
+
+    await utils_mcp.init_http_client(transport=httpx.MockTransport(handler))
+    try:
+        url = f"{utils_mcp.NWS_API_BASE}/gridpoints/TOP/31,80/forecast"
+        first = await utils_mcp.make_nws_request(url)
+        second, headers = await utils_mcp.fetch_nws(url)
+    finally:
+        await utils_mcp.close_http_client()
+
+    assert second is first
+    assert headers["Cache-Control"] == "max-age=60"
+    assert "if-none-match" not in seen[0]
+    assert seen[1]["if-none-match"] == '"v1"'
+    assert seen[1]["if-modified-since"] == "Mon, 19 Oct 2026 12:00:00 GMT"
@@ -0,0 +1,108 @@
+"""Tests for the NWS weather tools and their response cache."""
+import pytest, sys, os
+
+# Add the src directory to the path to allow imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from collections import OrderedDict
+
+import httpx
+import pytest_asyncio
+from src.utils import utils_mcp
+from src.tools import nws_cache
+from src.tools.nws_cache import NWSCache, cache_ttl
+from src.tools.weather_tools import get_alerts, get_forecast
+
+FORECAST_URL = "https://api.weather.gov/gridpoints/TOP/31,80/forecast"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest_asyncio.fixture
+async def nws(monkeypatch):
+    """Shared client backed by a fake NWS; yields the request paths seen and a clock for the cache."""
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.url.path)
+        if request.url.path.startswith("/points/"):
+            return httpx.Response(200, json={"properties": {"forecast": FORECAST_URL}},
+                                  headers={"Cache-Control": "public, max-age=86400"})
+        if request.url.path.startswith("/gridpoints/"):
+            if request.headers.get("If-None-Match") == '"f1"':
+                return httpx.Response(304, headers={"Cache-Control": "public, max-age=600"})
+            periods = [{"name": f"Period {i}", "temperature": 60 + i, "temperatureUnit": "F",
+                        "windSpeed": "5 mph", "windDirection": "N", "detailedForecast": "Sunny"}
+                       for i in range(8)]
+            return httpx.Response(200, json={"properties": {"periods": periods}},
+                                  headers={"Cache-Control": "public, max-age=600", "Age": "100",
+                                           "ETag": '"f1"'})
+        if request.url.path == "/alerts/active/area/CA":
+            alert = {"properties": {"event": "Heat Advisory", "areaDesc": "Fresno", "severity": "Moderate"}}
+            return httpx.Response(200, json={"features": [alert]},
+                                  headers={"Cache-Control": "public, max-age=30"})
+        return httpx.Response(404, json={"detail": "not found"})
+
+    clock = FakeClock()
+    monkeypatch.setattr(nws_cache, "_nws_cache", NWSCache(clock=clock))
+    monkeypatch.setattr(utils_mcp, "_nws_validators", OrderedDict())
+    await utils_mcp.init_http_client(transport=httpx.MockTransport(handler))
+    yield seen, clock
+    await utils_mcp.close_http_client()
+
+
+def test_cache_ttl_from_headers():
+    assert cache_ttl(httpx.Headers({"Cache-Control": "public, max-age=300"}), 60) == 300
+    assert cache_ttl(httpx.Headers({"Cache-Control": "max-age=300, s-maxage=120", "Age": "20"}), 60) == 100
+    assert cache_ttl(httpx.Headers({"Cache-Control": "no-cache"}), 60) == 0
+    assert cache_ttl(httpx.Headers({"Date": "Mon, 19 Oct 2026 12:00:00 GMT",
+                                    "Expires": "Mon, 19 Oct 2026 12:05:00 GMT"}), 60) == 300
+    assert cache_ttl(httpx.Headers({"Expires": "0"}), 60) == 0
+    assert cache_ttl(httpx.Headers({}), 60) == 60
+
+
+@pytest.mark.asyncio
+async def test_forecast_caches_gridpoint_for_good_and_forecast_until_stale(nws):
+    seen, clock = nws
+
+    first = await get_forecast(39.74561, -97.08923)
+    clock.now = 400
+    await get_forecast(39.7456, -97.0892)
+    clock.now = 10 ** 6
+    await get_forecast(39.7456, -97.0892)
+
+    assert "Period 0:" in first and "Period 4:" in first and "Period 5:" not in first
+    assert await get_forecast(39.7456, -97.0892) == first
+    # points fetched once (canonical 4-decimal URL); forecast revalidated (304) once its 500s freshness ran out
+    assert seen == ["/points/39.7456,-97.0892", "/gridpoints/TOP/31,80/forecast",
+                    "/gridpoints/TOP/31,80/forecast"]
+
+
+@pytest.mark.asyncio
+async def test_alerts_cached_per_state(nws):
+    seen, clock = nws
+
+    text = await get_alerts("ca")
+    await get_alerts("CA")
+    clock.now = 31
+    await get_alerts("CA")
+
+    assert "Event: Heat Advisory" in text
+    assert seen == ["/alerts/active/area/CA"] * 2
+    assert await get_alerts("California") == "Invalid state code: 'CALIFORNIA' (use two letters, e.g. CA)"
+
+
+@pytest.mark.asyncio
+async def test_failed_lookup_is_not_cached(nws):
+    seen, _ = nws
+
+    assert await get_alerts("ZZ") == "Unable to fetch alerts or no alerts found."
+    await get_alerts("ZZ")
+
+    assert seen == ["/alerts/active/area/ZZ"] * 2
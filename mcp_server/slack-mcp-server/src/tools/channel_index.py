@@ -0,0 +1,156 @@
+"""Server-side Slack channel index (name <-> id)."""
+import asyncio
+import logging
+import os
+import re
+import time
+from typing import Any, Callable, Dict, Iterable
+
+from src.tools.user_directory import SlackRequest
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+# Public/private channel, multi-person DM and DM ids: C…, G…, D…. Real ids always contain
+# digits, so an all-letter word such as "DEVOPS" or "CICD" is treated as a name.
+CHANNEL_ID_RE = re.compile(r"^[CGD][A-Z0-9]*[0-9][A-Z0-9]*$")
+# conversations.list only returns public channels unless asked for more
+CHANNEL_TYPES = "public_channel,private_channel"
+
+
+def normalize_name(name: str) -> str:
+    return name.strip().lstrip("#").lower()
+
+
+def is_channel_id(channel: str) -> bool:
+    return not channel.startswith("#") and bool(CHANNEL_ID_RE.match(channel))
+
+
+class ChannelIndex:
+    """Maps channel names to ids and back for one workspace.
+
+    The index is filled from paginated `conversations.list` calls and from any channel
+    listing the tools already fetched. A name that is not in the index triggers a refresh
+    that pages through conversations.list, merging each page as it arrives and stopping as
+    soon as the name turns up. Refreshes for misses are spaced by `miss_interval`, and the
+    whole index is considered stale after `ttl`.
+
+    Env:
+        SLACK_CHANNEL_INDEX_TTL: Seconds before the index is rebuilt on the next miss (default 600)
+        SLACK_CHANNEL_INDEX_MISS_INTERVAL: Minimum seconds between miss-driven refreshes (default 30)
+    """
+
+    def __init__(self, ttl: float | None = None, miss_interval: float | None = None,
+                 page_size: int = 1000, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl if ttl is not None else float(os.environ.get("SLACK_CHANNEL_INDEX_TTL", "600"))
+        self.miss_interval = miss_interval if miss_interval is not None else float(
+            os.environ.get("SLACK_CHANNEL_INDEX_MISS_INTERVAL", "30"))
+        self.page_size = page_size
+        self._clock = clock
+        self._by_name: Dict[str, str] = {}
+        self._by_id: Dict[str, str] = {}
+        self._members: set[str] = set()
+        self._complete_at: float | None = None
+        self._refresh_started_at: float | None = None
+        self._lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def add(self, channels: Iterable[Dict[str, Any]]) -> None:
+        """Merge channel objects (conversations.list / conversations.info shape)."""
+        for channel in channels:
+            channel_id, name = channel.get("id"), channel.get("name")
+            if not channel_id or not name:
+                continue
+            old_name = self._by_id.get(channel_id)
+            if old_name and old_name != name and self._by_name.get(normalize_name(old_name)) == channel_id:
+                del self._by_name[normalize_name(old_name)]  # renamed
+            self._by_id[channel_id] = name
+            self._by_name[normalize_name(name)] = channel_id
+            if channel.get("is_member"):
+                self._members.add(channel_id)
+            elif "is_member" in channel:
+                self._members.discard(channel_id)
+
+    def id_for(self, name: str) -> str | None:
+        return self._by_name.get(normalize_name(name))
+
+    def name_for(self, channel_id: str) -> str | None:
+        return self._by_id.get(channel_id)
+
+    def member_channels(self) -> list[str]:
+        """IDs of indexed channels the bot is a member of (i.e. can read)."""
+        return sorted(self._members)
+
+    def clear(self) -> None:
+        self._by_name.clear()
+        self._by_id.clear()
+        self._members.clear()
+        self._complete_at = None
+        self._refresh_started_at = None
+
+    def _stale(self) -> bool:
+        return self._complete_at is None or self._clock() - self._complete_at > self.ttl
+
+    async def resolve(self, bot_token: str, channel: str, request: SlackRequest) -> str | None:
+        """Channel id for `channel` (an id, `name` or `#name`), or None if it does not exist."""
+        if is_channel_id(channel):
+            # An id-shaped name (e.g. "C2024"): prefer a channel indexed under that name
+            if channel not in self._by_id and self.id_for(channel) is not None:
+                return self.id_for(channel)
+            return channel
+        channel_id = self.id_for(channel)
+        if channel_id is None:
+            await self.refresh(bot_token, request, until=channel)
+            channel_id = self.id_for(channel)
+        return channel_id
+
+    async def ensure_fresh(self, bot_token: str, request: SlackRequest) -> None:
+        """Rebuild the whole index if it was never completed or is older than the TTL."""
+        if self._stale():
+            await self.refresh(bot_token, request)
+
+    async def refresh(self, bot_token: str, request: SlackRequest, until: str | None = None) -> bool:
+        """Page through conversations.list into the index; stops early once `until` is found.
+
+        Returns False if the refresh was skipped or failed.
+        """
+        async with self._lock:
+            if until is not None:
+                if self.id_for(until) is not None:
+                    return True  # another caller's refresh found it
+                recently = (self._refresh_started_at is not None
+                            and self._clock() - self._refresh_started_at < self.miss_interval)
+                if recently and not self._stale():
+                    return False
+            self._refresh_started_at = self._clock()
+            cursor = None
+            while True:
+                params = {"limit": self.page_size, "exclude_archived": True, "types": CHANNEL_TYPES}
+                if cursor:
+                    params["cursor"] = cursor
+                data = await request("conversations.list", bot_token, params=params)
+                if not data or not data.get("ok"):
+                    error = data.get("error", "unknown error") if data else "unknown error"
+                    logger.warning("Failed to refresh channel index: %s", error)
+                    return False
+                self.add(data.get("channels", []))
+                cursor = (data.get("response_metadata") or {}).get("next_cursor")
+                if not cursor:
+                    self._complete_at = self._clock()
+                    logger.info("Channel index holds %s channels", len(self))
+                    return True
+                if until is not None and self.id_for(until) is not None:
+                    return True
+
+
+# One index per bot token (i.e. per workspace)
+_indexes: Dict[str, ChannelIndex] = {}
+
+
+def get_channel_index(bot_token: str) -> ChannelIndex:
+    index = _indexes.get(bot_token)
+    if index is None:
+        index = _indexes[bot_token] = ChannelIndex()
+    return index
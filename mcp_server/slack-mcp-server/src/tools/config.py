@@ -1,20 +1,131 @@
 """Configuration module for MCP tools."""
+import atexit
+import json
 import logging
+import logging.handlers
+import os
+import queue
+import sys
+from datetime import datetime, timezone
 from typing import Any
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('logs.txt'),
-        logging.StreamHandler()
-    ]
-)
+# Attributes every LogRecord has; anything else was passed via `extra=` and is kept in JSON output
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: ts, level, logger, message, plus any `extra=` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+# Argument types that cannot change between the log call and the listener formatting them
+_IMMUTABLE_ARGS = (str, int, float, bool, bytes, type(None))
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves the %-interpolation to the listener thread where it is safe.
+
+    The stock prepare() runs the interpolation on the calling thread (the event loop);
+    the queue is in-process, so the listener thread can do it instead. A record whose args
+    include anything mutable (a dict, list or object the caller may change right after the
+    call) is interpolated here, so the log shows the values at the time of the call.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        args = record.args
+        values = args.values() if isinstance(args, dict) else args or ()
+        if not all(isinstance(value, _IMMUTABLE_ARGS) for value in values):
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+
+_listener: logging.handlers.QueueListener | None = None
+
+
+def setup_logging(per_process: bool = False) -> logging.handlers.QueueListener:
+    """Route all logging through a queue drained by a background thread.
+
+    The root logger only gets a QueueHandler, so a log call on the event loop costs an
+    enqueue; formatting and file/console I/O happen on the QueueListener's thread. Calling
+    it again (e.g. after loading .env) replaces the previous pipeline.
+
+    Args:
+        per_process: Several processes log at once (uvicorn workers); each writes its own
+            file with the pid before the extension (logs.1234.txt), since rotating one
+            shared file from several processes loses and interleaves records
+
+    Env:
+        SLACK_LOG_LEVEL: Root log level (default INFO)
+        SLACK_LOG_FORMAT: "text" or "json" (default text)
+        SLACK_LOG_FILE: Log file path (default logs.txt); empty disables the file
+        SLACK_LOG_MAX_BYTES: Rotate the file at this size (default 10 MiB)
+        SLACK_LOG_BACKUPS: Rotated files kept (default 5)
+    """
+    global _listener
+    stop_logging()
+
+    formatter = (JsonFormatter() if os.environ.get("SLACK_LOG_FORMAT", "text").lower() == "json"
+                 else logging.Formatter(TEXT_FORMAT))
+    # stderr: with the stdio transport, stdout carries the MCP protocol
+    handlers: list[logging.Handler] = [logging.StreamHandler(sys.stderr)]
+    log_file = os.environ.get("SLACK_LOG_FILE", "logs.txt")
+    if log_file:
+        if per_process:
+            root, ext = os.path.splitext(log_file)
+            log_file = f"{root}.{os.getpid()}{ext}"
+        handlers.append(logging.handlers.RotatingFileHandler(
+            log_file,
+            maxBytes=int(os.environ.get("SLACK_LOG_MAX_BYTES", str(10 * 1024 * 1024))),
+            backupCount=int(os.environ.get("SLACK_LOG_BACKUPS", "5")),
+            encoding="utf-8",
+        ))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, logging.handlers.QueueHandler):
+            root.removeHandler(handler)
+    root.addHandler(DeferredQueueHandler(log_queue))
+    root.setLevel(os.environ.get("SLACK_LOG_LEVEL", "INFO").upper())
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def stop_logging() -> None:
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+atexit.register(stop_logging)
 
 logger = logging.getLogger('mcp_tools')
 
 # API Constants
 NWS_API_BASE = "https://api.weather.gov"
 SLACK_API_BASE = "https://slack.com/api"
-USER_AGENT = "weather-app/1.0"
\ No newline at end of file
+USER_AGENT = "weather-app/1.0"
@@ -0,0 +1,268 @@
+"""Push ingestion of Slack message events (Socket Mode / Events API) into the message store."""
+import asyncio
+import hashlib
+import hmac
+import importlib.util
+import json
+import logging
+import os
+import time
+from typing import Any, AsyncIterator, Dict, Protocol
+
+from src.tools.message_store import MessageStore, get_session_store
+from src.tools.user_directory import SlackRequest
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+HAS_WEBSOCKETS = importlib.util.find_spec("websockets") is not None
+
+# Fields the Events API adds to a message that conversations.history rows do not have
+_EVENT_ONLY_FIELDS = ("channel", "channel_type", "event_ts")
+
+
+class EventSource(Protocol):
+    """Yields Events API `event` objects.
+
+    `{"type": "hello"}` marks every (re)connection and `{"type": "disconnect"}` a lost one.
+    """
+
+    def events(self) -> AsyncIterator[Dict[str, Any]]: ...
+
+
+class LocalEventSource:
+    """In-process event source: events `put()` here are delivered like Socket Mode ones."""
+
+    def __init__(self):
+        self._queue: asyncio.Queue = asyncio.Queue()
+
+    def put(self, event: Dict[str, Any]) -> None:
+        self._queue.put_nowait(event)
+
+    def close(self) -> None:
+        self._queue.put_nowait(None)
+
+    async def events(self) -> AsyncIterator[Dict[str, Any]]:
+        yield {"type": "hello"}
+        while True:
+            event = await self._queue.get()
+            if event is None:
+                return
+            yield event
+
+
+class SocketModeSource:
+    """Slack Socket Mode client: opens a WebSocket with an app-level token (xapp-...).
+
+    Every envelope is acknowledged as soon as it arrives; the connection is reopened after
+    a `disconnect` request or a dropped socket, with exponential backoff on failures.
+    """
+
+    def __init__(self, app_token: str, request: SlackRequest, max_backoff: float = 60.0):
+        if not HAS_WEBSOCKETS:
+            raise RuntimeError("Socket Mode needs the 'websockets' package (pip install websockets)")
+        self.app_token = app_token
+        self.request = request
+        self.max_backoff = max_backoff
+
+    async def events(self) -> AsyncIterator[Dict[str, Any]]:
+        import websockets
+
+        backoff = 1.0
+        while True:
+            data = await self.request("apps.connections.open", self.app_token, method="POST")
+            if not data or not data.get("ok"):
+                error = data.get("error", "unknown error") if data else "unknown error"
+                if error in ("invalid_auth", "not_authed", "not_allowed_token_type"):
+                    raise RuntimeError(f"Socket Mode connection refused: {error}")
+                logger.warning("Could not open Socket Mode connection (%s); retrying in %.0fs", error, backoff)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+                continue
+            lost = None
+            try:
+                async with websockets.connect(data["url"]) as socket:
+                    async for raw in socket:
+                        try:
+                            envelope = json.loads(raw)
+                        except ValueError:
+                            envelope = None
+                        if not isinstance(envelope, dict):
+                            logger.warning("Skipping malformed Socket Mode frame: %.200r", raw)
+                            continue
+                        if envelope.get("envelope_id"):
+                            await socket.send(json.dumps({"envelope_id": envelope["envelope_id"]}))
+                        kind = envelope.get("type")
+                        if kind == "hello":
+                            backoff = 1.0
+                            yield {"type": "hello"}
+                        elif kind == "disconnect":
+                            logger.info("Socket Mode asked to reconnect (%s)", envelope.get("reason"))
+                            break
+                        elif kind == "events_api":
+                            event = (envelope.get("payload") or {}).get("event")
+                            if event:
+                                yield event
+            except (OSError, websockets.WebSocketException) as e:
+                lost = e
+            # Events sent until the next hello are missed
+            yield {"type": "disconnect"}
+            if lost is not None:
+                logger.warning("Socket Mode connection lost: %s; reconnecting in %.0fs", lost, backoff)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+
+
+def verify_signature(signing_secret: str, timestamp: str, body: bytes, signature: str,
+                     max_age: float = 300, now: float | None = None) -> bool:
+    """Check an Events API request's X-Slack-Signature (v0 HMAC-SHA256 of "v0:ts:body")."""
+    try:
+        if abs((now if now is not None else time.time()) - int(timestamp)) > max_age:
+            return False
+    except (TypeError, ValueError):
+        return False
+    base = b"v0:" + timestamp.encode() + b":" + body
+    expected = "v0=" + hmac.new(signing_secret.encode(), base, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature or "")
+
+
+class EventIngestor:
+    """Appends pushed message events to the message store and wakes long-polling readers.
+
+    While a source is connected, a channel whose history was synced after the connection
+    opened is "live". Every later message reaches the store through events, so incremental
+    history syncs of that channel can be skipped and its coverage watermark moves with
+    each event. A reconnect clears live channels (events may have been missed in between).
+    """
+
+    def __init__(self, store: MessageStore | None = None):
+        self._store = store
+        self.connected = False
+        self._live: set[str] = set()
+        self._signals: Dict[str, asyncio.Event] = {}
+        self.received = 0
+
+    @property
+    def store(self) -> MessageStore:
+        return self._store if self._store is not None else get_session_store()
+
+    def is_live(self, store: MessageStore, channel: str) -> bool:
+        return self.connected and store is self.store and channel in self._live
+
+    def mark_live(self, channel: str) -> None:
+        """`channel` was just synced while connected; from here on events keep it current."""
+        if self.connected:
+            self._live.add(channel)
+
+    def on_connect(self) -> None:
+        self._live.clear()
+        self.connected = True
+        logger.info("Slack event stream connected")
+
+    def on_disconnect(self) -> None:
+        self.connected = False
+        self._live.clear()
+        for signal in self._signals.values():
+            signal.set()  # let waiters fall back to polling
+        self._signals.clear()
+
+    def handle_delivery(self, event: Dict[str, Any]) -> bool:
+        """Apply an event from a verified Events API request.
+
+        The Events API has no connection to open; the stream counts as connected from the
+        first verified delivery on, so channels are only treated as live once events arrive.
+        """
+        if not self.connected:
+            self.on_connect()
+        return self.handle(event)
+
+    async def run(self, source: EventSource) -> None:
+        """Consume `source` until it ends; events are handled as they arrive."""
+        try:
+            async for event in source.events():
+                if event.get("type") == "hello":
+                    self.on_connect()
+                elif event.get("type") == "disconnect":
+                    self.on_disconnect()
+                else:
+                    self.handle(event)
+        finally:
+            self.on_disconnect()
+            logger.info("Slack event stream closed after %s events", self.received)
+
+    def handle(self, event: Dict[str, Any]) -> bool:
+        """Apply one `message` event to the store; returns True if the channel's history changed."""
+        if event.get("type") != "message" or not event.get("channel"):
+            return False
+        self.received += 1
+        channel = event["channel"]
+        subtype = event.get("subtype")
+        store = self.store
+
+        if subtype == "message_deleted":
+            store.delete(channel, event.get("deleted_ts", ""))
+        elif subtype == "message_changed":
+            message = event.get("message") or {}
+            if not self._is_reply(message):
+                store.add(channel, [self._row(message)])
+        elif event.get("hidden"):
+            return False
+        elif self._is_reply(event):
+            # Replies are not channel history; bump the parent so cached threads are refetched.
+            # A reply not newer than latest_reply is already counted (e.g. a redelivered event)
+            parent = store.get(channel, event["thread_ts"])
+            if parent is not None and event["ts"] > (parent.get("latest_reply") or ""):
+                parent["reply_count"] = parent.get("reply_count", 0) + 1
+                parent["latest_reply"] = event["ts"]
+                store.add(channel, [parent])
+            return False
+        else:
+            store.add(channel, [self._row(event)])
+            coverage = store.coverage(channel)
+            if channel in self._live and coverage is not None and event["ts"] > coverage[1]:
+                store.set_coverage(channel, coverage[0], event["ts"])
+
+        signal = self._signals.pop(channel, None)
+        if signal is not None:
+            signal.set()
+        return True
+
+    async def wait(self, channel: str, timeout: float) -> bool:
+        """Sleep until `channel` gets a new event (True) or `timeout` passes (False)."""
+        signal = self._signals.setdefault(channel, asyncio.Event())
+        try:
+            await asyncio.wait_for(signal.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    @staticmethod
+    def _is_reply(message: Dict[str, Any]) -> bool:
+        thread_ts = message.get("thread_ts")
+        return bool(thread_ts) and thread_ts != message.get("ts") and message.get("subtype") != "thread_broadcast"
+
+    @staticmethod
+    def _row(message: Dict[str, Any]) -> Dict[str, Any]:
+        return {k: v for k, v in message.items() if k not in _EVENT_ONLY_FIELDS}
+
+
+_ingestor: EventIngestor | None = None
+
+
+def get_event_ingestor() -> EventIngestor:
+    global _ingestor
+    if _ingestor is None:
+        _ingestor = EventIngestor()
+    return _ingestor
+
+
+def socket_mode_source(request: SlackRequest) -> SocketModeSource | None:
+    """Socket Mode source when SLACK_APP_TOKEN is set, else None."""
+    app_token = os.environ.get("SLACK_APP_TOKEN")
+    if not app_token:
+        return None
+    if not HAS_WEBSOCKETS:
+        logger.warning("SLACK_APP_TOKEN is set but the 'websockets' package is not installed; "
+                       "Socket Mode ingestion is disabled")
+        return None
+    return SocketModeSource(app_token, request)
@@ -0,0 +1,116 @@
+"""Compact output formats (JSON lines / column table) for Slack tool results."""
+import json
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List
+
+FORMATS = ("text", "jsonl", "table")
+
+# field name -> extractor(channel)
+CHANNEL_FIELDS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    "id": lambda c: c.get("id"),
+    "name": lambda c: c.get("name"),
+    "topic": lambda c: (c.get("topic") or {}).get("value", ""),
+    "purpose": lambda c: (c.get("purpose") or {}).get("value", ""),
+    "members": lambda c: c.get("num_members", 0),
+    "is_private": lambda c: c.get("is_private", False),
+    "is_member": lambda c: c.get("is_member", False),
+    "created": lambda c: c.get("created"),
+}
+DEFAULT_CHANNEL_FIELDS = ["id", "name", "members", "topic"]
+
+# field name -> extractor(message, user_names)
+MESSAGE_FIELDS: Dict[str, Callable[[Dict[str, Any], Dict[str, str]], Any]] = {
+    "ts": lambda m, u: m.get("ts"),
+    "user": lambda m, u: u.get(m.get("user"), m.get("user") or m.get("username") or "unknown"),
+    "user_id": lambda m, u: m.get("user"),
+    "text": lambda m, u: m.get("text", ""),
+    "reactions": lambda m, u: " ".join(f":{r['name']}:{r['count']}" for r in m.get("reactions", [])),
+    "replies": lambda m, u: m.get("reply_count", 0),
+    "thread_ts": lambda m, u: m.get("thread_ts"),
+    "subtype": lambda m, u: m.get("subtype"),
+    "is_reply": lambda m, u: m.get("thread_ts") not in (None, m.get("ts")),
+}
+DEFAULT_MESSAGE_FIELDS = ["ts", "user", "text", "reactions", "replies"]
+
+# Fields holding Slack timestamps, rendered according to ts_format
+_TS_FIELDS = {"ts", "thread_ts", "created"}
+
+
+def format_ts(value: Any, ts_format: str) -> Any:
+    """Slack ts ("1717171717.123456") or epoch seconds -> ISO 8601 UTC, or left as epoch."""
+    if value in (None, "") or ts_format == "epoch":
+        return value
+    dt = datetime.fromtimestamp(float(value), tz=timezone.utc)
+    return dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def truncate_text(text: str, limit: int | None) -> str:
+    if limit and len(text) > limit:
+        return text[:limit] + "…"
+    return text
+
+
+class RecordFormatter:
+    """Renders channel or message records as JSON lines or a tab-separated table.
+
+    Args:
+        fmt: "jsonl" or "table"
+        fields: Columns to emit, in order (a subset of the kind's field names)
+        ts_format: "iso" (UTC ISO 8601) or "epoch" (Slack ts unchanged)
+        truncate: Cut message text to this many characters
+    """
+
+    def __init__(self, kind: str, fmt: str, fields: List[str] | None = None, ts_format: str = "iso",
+                 truncate: int | None = None):
+        extractors = CHANNEL_FIELDS if kind == "channel" else MESSAGE_FIELDS
+        fields = fields or (DEFAULT_CHANNEL_FIELDS if kind == "channel" else DEFAULT_MESSAGE_FIELDS)
+        unknown = [f for f in fields if f not in extractors]
+        if unknown:
+            raise ValueError(f"Unknown fields {unknown}; choose from {sorted(extractors)}")
+        if fmt not in ("jsonl", "table"):
+            raise ValueError(f"Unknown format: {fmt}")
+        if ts_format not in ("iso", "epoch"):
+            raise ValueError(f"Unknown ts_format: {ts_format}")
+        self.kind = kind
+        self.fmt = fmt
+        self.fields = fields
+        self.ts_format = ts_format
+        self.truncate = truncate
+        self._extractors = extractors
+
+    def header(self) -> str | None:
+        return "\t".join(self.fields) if self.fmt == "table" else None
+
+    def record(self, item: Dict[str, Any], user_names: Dict[str, str] | None = None) -> Dict[str, Any]:
+        record = {}
+        for name in self.fields:
+            extract = self._extractors[name]
+            value = extract(item) if self.kind == "channel" else extract(item, user_names or {})
+            if name in _TS_FIELDS:
+                value = format_ts(value, self.ts_format)
+            elif name == "text":
+                value = truncate_text(value, self.truncate)
+            record[name] = value
+        return record
+
+    def line(self, item: Dict[str, Any], user_names: Dict[str, str] | None = None) -> str:
+        record = self.record(item, user_names)
+        if self.fmt == "jsonl":
+            return json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+        return "\t".join(_cell(v) for v in record.values())
+
+    def trailer(self, error: str, count: int) -> str:
+        """Last line of a result cut short by an error after `count` records.
+
+        jsonl: {"error": ..., "partial": true, "count": N}; table: "#error<TAB>count<TAB>error".
+        """
+        if self.fmt == "jsonl":
+            return json.dumps({"error": error, "partial": True, "count": count},
+                              ensure_ascii=False, separators=(",", ":"))
+        return f"#error\t{count}\t{_cell(error)}"
+
+
+def _cell(value: Any) -> str:
+    if value is None:
+        return ""
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n")
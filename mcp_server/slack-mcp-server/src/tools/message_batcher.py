@@ -0,0 +1,154 @@
+"""Coalescing of bursts of chat.postMessage calls to the same channel."""
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+# send(channel_id, text, thread_ts) -> chat.postMessage response (or None)
+PostFn = Callable[[str, str, str | None], Awaitable[Dict[str, Any] | None]]
+
+
+def group_texts(texts: List[str], max_chars: int) -> List[List[str]]:
+    """Split texts, in order, into as few groups as possible whose newline-joined size fits `max_chars`."""
+    groups: List[List[str]] = []
+    size = 0
+    for text in texts:
+        if groups and size + 1 + len(text) <= max_chars:
+            groups[-1].append(text)
+            size += 1 + len(text)
+        else:
+            groups.append([text])
+            size = len(text)
+    return groups
+
+
+@dataclass
+class _Batch:
+    texts: List[str] = field(default_factory=list)
+    waiters: List[asyncio.Future] = field(default_factory=list)
+    size: int = 0
+    timer: asyncio.TimerHandle | None = None
+    post: PostFn | None = None
+
+
+class MessageBatcher:
+    """Collects messages per channel for `window` seconds and posts them as one message.
+
+    `enqueue` returns at once, so callers that send one message at a time still get
+    coalesced; a failed post is kept per channel and reported by `take_error` (and logged).
+    `submit` also queues, but waits for the post that carries the message.
+
+    In "thread" mode the first post of a burst becomes the parent, and later batches to the
+    same channel within `thread_window` seconds are posted as replies in its thread.
+
+    Env:
+        SLACK_SEND_COALESCE_WINDOW: Seconds to wait for more messages to the same channel (default 1.0)
+        SLACK_SEND_MAX_CHARS: Max characters per coalesced post (default 4000)
+        SLACK_SEND_COALESCE_MODE: "post" (one combined message) or "thread" (default "post")
+        SLACK_SEND_THREAD_WINDOW: Seconds later batches keep replying to the same thread (default 300)
+    """
+
+    def __init__(self, window: float | None = None, max_chars: int | None = None, mode: str | None = None,
+                 thread_window: float | None = None, clock: Callable[[], float] = time.monotonic):
+        self.window = window if window is not None else float(os.environ.get("SLACK_SEND_COALESCE_WINDOW", "1.0"))
+        self.max_chars = max_chars if max_chars is not None else int(os.environ.get("SLACK_SEND_MAX_CHARS", "4000"))
+        self.mode = mode or os.environ.get("SLACK_SEND_COALESCE_MODE", "post")
+        self.thread_window = thread_window if thread_window is not None else float(
+            os.environ.get("SLACK_SEND_THREAD_WINDOW", "300"))
+        self._clock = clock
+        self._batches: Dict[str, _Batch] = {}
+        self._threads: Dict[str, tuple[str, float]] = {}  # channel -> (parent ts, last post time)
+        self._sending: set[asyncio.Task] = set()
+        self._errors: Dict[str, str] = {}  # channel -> error of its last failed post
+
+    def enqueue(self, channel_id: str, text: str, post: PostFn) -> _Batch:
+        """Queue `text` without waiting; it is posted when the channel's window closes."""
+        batch = self._batches.get(channel_id)
+        if batch is not None and batch.size + 1 + len(text) > self.max_chars:
+            self._flush(channel_id, post)
+            batch = None
+        if batch is None:
+            batch = self._batches[channel_id] = _Batch(post=post)
+            batch.timer = asyncio.get_running_loop().call_later(self.window, self._flush, channel_id, post)
+        batch.texts.append(text)
+        batch.size += len(text) + 1
+        return batch
+
+    async def submit(self, channel_id: str, text: str, post: PostFn) -> tuple[Dict[str, Any] | None, int]:
+        """Queue `text`; returns the response of the post that carried it and how many messages it held."""
+        waiter = asyncio.get_running_loop().create_future()
+        self.enqueue(channel_id, text, post).waiters.append(waiter)
+        return await waiter
+
+    def take_error(self, channel_id: str) -> str | None:
+        """Error of the channel's last failed post since the previous call, if any."""
+        return self._errors.pop(channel_id, None)
+
+    async def drain(self) -> None:
+        """Post every queued batch now and wait for all posts to finish."""
+        for channel_id, batch in list(self._batches.items()):
+            self._flush(channel_id, batch.post)
+        if self._sending:
+            await asyncio.gather(*self._sending, return_exceptions=True)
+
+    def _flush(self, channel_id: str, post: PostFn) -> None:
+        batch = self._batches.pop(channel_id, None)
+        if batch is None:
+            return
+        if batch.timer is not None:
+            batch.timer.cancel()
+        task = asyncio.ensure_future(self._send(channel_id, batch, post))
+        self._sending.add(task)
+        task.add_done_callback(self._sending.discard)
+
+    async def _send(self, channel_id: str, batch: _Batch, post: PostFn) -> None:
+        thread_ts = None
+        if self.mode == "thread":
+            parent = self._threads.get(channel_id)
+            if parent and self._clock() - parent[1] <= self.thread_window:
+                thread_ts = parent[0]
+        # Messages queued with enqueue() have no waiter to report a failure to
+        unreported = len(batch.waiters) < len(batch.texts)
+        try:
+            result = await post(channel_id, "\n".join(batch.texts), thread_ts)
+        except Exception as e:
+            error = str(e) or type(e).__name__
+            logger.warning("Failed to post %s coalesced messages to channel %s: %s", len(batch.texts), channel_id, error)
+            if unreported:
+                self._errors[channel_id] = error
+            for waiter in batch.waiters:
+                if not waiter.done():
+                    waiter.set_exception(e)
+            return
+        if not result or not result.get("ok"):
+            error = result.get("error", "unknown error") if result else "unknown error"
+            logger.warning("Failed to post %s coalesced messages to channel %s: %s", len(batch.texts), channel_id, error)
+            if unreported:
+                self._errors[channel_id] = error
+        else:
+            if self.mode == "thread":
+                self._threads[channel_id] = (thread_ts or result.get("ts"), self._clock())
+            logger.info("Posted %s coalesced messages to channel: %s", len(batch.texts), channel_id)
+        for waiter in batch.waiters:
+            if not waiter.done():
+                waiter.set_result((result, len(batch.texts)))
+
+
+_batchers: Dict[str, MessageBatcher] = {}
+
+
+def get_message_batcher(bot_token: str) -> MessageBatcher:
+    batcher = _batchers.get(bot_token)
+    if batcher is None:
+        batcher = _batchers[bot_token] = MessageBatcher()
+    return batcher
+
+
+async def drain_message_batchers() -> None:
+    """Post everything still queued (on shutdown)."""
+    await asyncio.gather(*(batcher.drain() for batcher in _batchers.values()))
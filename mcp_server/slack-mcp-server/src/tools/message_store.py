@@ -0,0 +1,181 @@
+"""Local SQLite store of Slack channel history."""
+import json
+import logging
+import os
+import sqlite3
+import time
+from typing import Any, Dict, Iterable, List
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    channel TEXT NOT NULL,
+    ts      TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (channel, ts)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS sync_state (
+    channel   TEXT PRIMARY KEY,
+    newest_ts TEXT NOT NULL,
+    oldest_ts TEXT NOT NULL,
+    synced_at REAL NOT NULL
+);
+"""
+
+# oldest_ts once the channel's history has been read back to its first message
+HISTORY_START = "0"
+
+
+class MessageStore:
+    """Per-channel message history with a coverage window.
+
+    For every channel the store records the range [oldest_ts, newest_ts] for which it
+    holds *all* messages. newest_ts is the watermark for incremental syncs (only messages
+    after it are fetched, via `oldest=`), and oldest_ts is where backfills of older
+    history resume (via `latest=`). Slack timestamps ("1717171717.123456") have a fixed
+    width, so they are compared as text.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._generations: Dict[str, int] = {}
+
+    def generation(self, channel: str) -> int:
+        """Counter bumped by every write to `channel`'s messages (by this process)."""
+        return self._generations.get(channel, 0)
+
+    def _changed(self, channel: str) -> None:
+        self._generations[channel] = self._generations.get(channel, 0) + 1
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def coverage(self, channel: str) -> tuple[str, str] | None:
+        """(oldest_ts, newest_ts) known to be complete for `channel`, or None if never synced."""
+        row = self._conn.execute(
+            "SELECT oldest_ts, newest_ts FROM sync_state WHERE channel = ?", (channel,)).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def set_coverage(self, channel: str, oldest_ts: str, newest_ts: str) -> None:
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sync_state (channel, newest_ts, oldest_ts, synced_at) VALUES (?, ?, ?, ?)",
+                (channel, newest_ts, oldest_ts, time.time()))
+
+    def add(self, channel: str, messages: Iterable[Dict[str, Any]]) -> int:
+        rows = [(channel, m["ts"], json.dumps(m)) for m in messages if m.get("ts")]
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO messages (channel, ts, payload) VALUES (?, ?, ?)", rows)
+        self._changed(channel)
+        return len(rows)
+
+    def save_sync(self, channel: str, messages: Iterable[Dict[str, Any]], oldest_ts: str, newest_ts: str,
+                  drop_before: str | None = None) -> int:
+        """Store the messages of a completed sync and its new coverage in one transaction.
+
+        Messages older than `drop_before` are forgotten in the same transaction.
+        """
+        rows = [(channel, m["ts"], json.dumps(m)) for m in messages if m.get("ts")]
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO messages (channel, ts, payload) VALUES (?, ?, ?)", rows)
+            if drop_before is not None:
+                self._conn.execute("DELETE FROM messages WHERE channel = ? AND ts < ?", (channel, drop_before))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sync_state (channel, newest_ts, oldest_ts, synced_at) VALUES (?, ?, ?, ?)",
+                (channel, newest_ts, oldest_ts, time.time()))
+        self._changed(channel)
+        return len(rows)
+
+    def delete(self, channel: str, ts: str) -> None:
+        with self._conn:
+            self._conn.execute("DELETE FROM messages WHERE channel = ? AND ts = ?", (channel, ts))
+        self._changed(channel)
+
+    def drop_before(self, channel: str, ts: str) -> None:
+        """Forget messages older than `ts` (they are no longer contiguous with the watermark)."""
+        with self._conn:
+            self._conn.execute("DELETE FROM messages WHERE channel = ? AND ts < ?", (channel, ts))
+        self._changed(channel)
+
+    def count(self, channel: str, oldest: str | None = None, latest: str | None = None) -> int:
+        where, args = self._window(channel, oldest, latest)
+        return self._conn.execute(f"SELECT COUNT(*) FROM messages WHERE {where}", args).fetchone()[0]
+
+    def read(self, channel: str, limit: int, oldest: str | None = None, latest: str | None = None,
+             before: str | None = None) -> List[Dict[str, Any]]:
+        """Newest-first messages of `channel` inside [oldest, latest] and older than `before`."""
+        where, args = self._window(channel, oldest, latest)
+        if before:
+            where += " AND ts < ?"
+            args += (before,)
+        rows = self._conn.execute(
+            f"SELECT payload FROM messages WHERE {where} ORDER BY ts DESC LIMIT ?", (*args, limit))
+        return [json.loads(payload) for (payload,) in rows]
+
+    def read_after(self, channel: str, since: str, limit: int) -> List[Dict[str, Any]]:
+        """Oldest-first messages of `channel` newer than `since`."""
+        rows = self._conn.execute(
+            "SELECT payload FROM messages WHERE channel = ? AND ts > ? ORDER BY ts LIMIT ?", (channel, since, limit))
+        return [json.loads(payload) for (payload,) in rows]
+
+    def get(self, channel: str, ts: str) -> Dict[str, Any] | None:
+        row = self._conn.execute(
+            "SELECT payload FROM messages WHERE channel = ? AND ts = ?", (channel, ts)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def channels(self) -> List[str]:
+        """Channels that have been synced into the store."""
+        return [row[0] for row in self._conn.execute("SELECT channel FROM sync_state ORDER BY channel")]
+
+    def iter_messages(self, channel: str) -> Iterable[Dict[str, Any]]:
+        """All stored messages of `channel`, oldest first."""
+        for (payload,) in self._conn.execute(
+                "SELECT payload FROM messages WHERE channel = ? ORDER BY ts", (channel,)):
+            yield json.loads(payload)
+
+    @staticmethod
+    def _window(channel: str, oldest: str | None, latest: str | None) -> tuple[str, tuple]:
+        where, args = "channel = ?", [channel]
+        if oldest:
+            where += " AND ts >= ?"
+            args.append(oldest)
+        if latest:
+            where += " AND ts <= ?"
+            args.append(latest)
+        return where, tuple(args)
+
+
+_store: MessageStore | None = None
+_session_store: MessageStore | None = None
+
+
+def get_message_store() -> MessageStore | None:
+    """The store configured by SLACK_MESSAGE_STORE (a SQLite path), or None when disabled."""
+    global _store
+    path = os.environ.get("SLACK_MESSAGE_STORE")
+    if not path:
+        return None
+    path = os.path.expanduser(path)
+    if _store is None or _store.path != path:
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        _store = MessageStore(path)
+        logger.info("Using local message store at %s", path)
+    return _store
+
+
+def get_session_store() -> MessageStore:
+    """The configured store, or an in-memory one that lives as long as the server process."""
+    global _session_store
+    store = get_message_store()
+    if store is not None:
+        return store
+    if _session_store is None:
+        _session_store = MessageStore(":memory:")
+    return _session_store
@@ -0,0 +1,142 @@
+"""Cache of NWS API responses, kept as long as the API's caching headers allow."""
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Mapping, Optional, Tuple
+
+import httpx
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+# Signature of utils_mcp.fetch_nws (-> (parsed JSON, response headers) or None); passed in by the caller
+NWSFetch = Callable[[str], Awaitable[Optional[Tuple[Any, httpx.Headers]]]]
+
+
+def cache_ttl(headers: Mapping[str, str], default: float) -> float:
+    """Seconds a response stays fresh, from Cache-Control (s-maxage/max-age minus Age) or Expires.
+
+    `headers` must look up names case-insensitively (httpx.Headers does).
+    """
+    directives: Dict[str, str] = {}
+    for part in (headers.get("cache-control") or "").split(","):
+        name, _, value = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = value.strip('"')
+    if "no-store" in directives or "no-cache" in directives:
+        return 0.0
+    try:
+        age = float(headers.get("age") or 0)
+    except ValueError:
+        age = 0.0
+    for name in ("s-maxage", "max-age"):
+        if name in directives:
+            try:
+                return max(0.0, float(directives[name]) - age)
+            except ValueError:
+                pass
+    expires = headers.get("expires")
+    if expires:
+        try:
+            expires_at = parsedate_to_datetime(expires)
+            sent_at = parsedate_to_datetime(headers["date"]) if headers.get("date") else None
+        except (TypeError, ValueError, IndexError):
+            return 0.0
+        if sent_at is None:
+            return max(0.0, expires_at.timestamp() - time.time())
+        return max(0.0, (expires_at - sent_at).total_seconds())
+    return default
+
+
+class NWSCache:
+    """LRU of url -> parsed JSON; each entry expires when NWS says it goes stale.
+
+    Alerts and forecasts get their lifetime from the response's Cache-Control/Expires
+    headers. `permanent` entries (lat/lon -> gridpoint lookups, which never change) never
+    expire. Concurrent fetches of one URL share a single request. A stale entry is
+    refetched through `request`, which revalidates it with a conditional GET (see
+    utils_mcp.fetch_nws).
+
+    Env:
+        NWS_CACHE_DEFAULT_TTL: Seconds to keep a response that has no caching headers (default 60)
+        NWS_CACHE_SIZE: Max responses kept (default 512)
+    """
+
+    def __init__(self, default_ttl: float | None = None, max_entries: int | None = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.default_ttl = default_ttl if default_ttl is not None else float(
+            os.environ.get("NWS_CACHE_DEFAULT_TTL", "60"))
+        self.max_entries = max_entries if max_entries is not None else int(
+            os.environ.get("NWS_CACHE_SIZE", "512"))
+        self._clock = clock
+        # url -> (data, expires_at or None for never)
+        self._entries: "OrderedDict[str, tuple[Any, float | None]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, url: str) -> Any | None:
+        """Cached JSON for `url`, or None if absent or stale."""
+        entry = self._entries.get(url)
+        if entry is None:
+            return None
+        data, expires_at = entry
+        if expires_at is not None and self._clock() >= expires_at:
+            del self._entries[url]
+            return None
+        self._entries.move_to_end(url)
+        return data
+
+    def put(self, url: str, data: Any, ttl: float | None) -> None:
+        """Store `data` for `ttl` seconds (None: forever; 0: not at all)."""
+        if ttl is not None and ttl <= 0:
+            self._entries.pop(url, None)
+            return
+        self._entries[url] = (data, None if ttl is None else self._clock() + ttl)
+        self._entries.move_to_end(url)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    async def fetch(self, url: str, request: NWSFetch, permanent: bool = False) -> Any | None:
+        """JSON for `url` from the cache, or from NWS (then cached); None if the request failed."""
+        data = self.get(url)
+        if data is not None:
+            self.hits += 1
+            return data
+        pending = self._inflight.get(url)
+        if pending is not None:
+            return await pending
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[url] = future
+        data = None
+        try:
+            result = await request(url)
+            if result is not None:
+                data, headers = result
+                ttl = None if permanent else cache_ttl(headers, self.default_ttl)
+                self.put(url, data, ttl)
+                logger.debug("Cached %s for %s", url, "ever" if ttl is None else f"{ttl:.0f}s")
+        finally:
+            del self._inflight[url]
+            future.set_result(data)
+        return data
+
+
+_nws_cache: NWSCache | None = None
+
+
+def get_nws_cache() -> NWSCache:
+    global _nws_cache
+    if _nws_cache is None:
+        _nws_cache = NWSCache()
+    return _nws_cache
@@ -0,0 +1,219 @@
+"""Keyword (BM25) and optional semantic search over locally stored Slack history."""
+import hashlib
+import importlib.util
+import logging
+import math
+import re
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Sequence
+
+from src.tools.message_store import MessageStore
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+
+# <@U123>, <#C123|name>, <https://x|label>, <!here> -> keep only the readable label
+_MARKUP_RE = re.compile(r"<([^>|]*)(?:\|([^>]*))?>")
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9_'\-]*")
+_STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have i if in is it its of on or so that the this "
+    "to was we were what when where which who will with you".split())
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+
+def plain_text(text: str) -> str:
+    return _MARKUP_RE.sub(lambda m: m.group(2) or "", text or "")
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN_RE.findall(plain_text(text).lower()) if t not in _STOPWORDS]
+
+
+def hashed_embedding(texts: Sequence[str], dim: int = 512):
+    """Model-free embedding: L2-normalised hashed unigrams + bigrams (needs numpy).
+
+    A stand-in for a real sentence-embedding model; pass any `embed(texts) -> ndarray`
+    to SearchIndex to use one instead.
+    """
+    import numpy as np
+
+    matrix = np.zeros((len(texts), dim), dtype=np.float32)
+    for row, text in enumerate(texts):
+        tokens = tokenize(text)
+        for feature in tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]:
+            digest = hashlib.blake2b(feature.encode(), digest_size=8).digest()
+            h = int.from_bytes(digest, "little")
+            matrix[row, h % dim] += 1.0 if (h >> 63) else -1.0
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1.0, norms)
+
+
+@dataclass
+class SearchHit:
+    channel: str
+    ts: str
+    score: float
+    message: Dict[str, Any]
+
+
+class SearchIndex:
+    """Inverted index over the messages of a MessageStore, refreshed incrementally.
+
+    Every message becomes a document; postings map term -> {doc: term frequency} and
+    queries are ranked with BM25. A channel is rescanned when its store generation (or
+    message count) changed since the last refresh: new messages are added, and messages
+    that were edited or dropped from the store are removed from the postings, so they
+    neither match nor skew IDF. When numpy is installed, documents are also embedded
+    (hashed bag-of-words by default) so `mode="semantic"` ranks by cosine similarity and
+    `mode="hybrid"` blends both scores.
+    """
+
+    def __init__(self, store: MessageStore, embed: Callable[[Sequence[str]], Any] | None = None):
+        self.store = store
+        self.embed = embed if embed is not None else (hashed_embedding if HAS_NUMPY else None)
+        self._docs: List[tuple[str, str]] = []          # doc id -> (channel, ts)
+        self._doc_ids: Dict[tuple[str, str], int] = {}
+        self._removed: set[int] = set()                 # ids of docs no longer in the store
+        self._lengths: List[int] = []
+        self._postings: Dict[str, Dict[int, int]] = defaultdict(dict)
+        self._indexed_state: Dict[str, tuple[int, int]] = {}  # channel -> (store generation, count)
+        self._texts: List[str] = []
+        self._vectors = None
+        self._vectors_for = 0
+
+    def __len__(self) -> int:
+        return len(self._docs) - len(self._removed)
+
+    def refresh(self, channels: Sequence[str] | None = None) -> int:
+        """Bring the index in line with the store; returns how many messages were (re)indexed."""
+        added = removed = 0
+        for channel in channels or self.store.channels():
+            state = (self.store.generation(channel), self.store.count(channel))
+            if self._indexed_state.get(channel) == state:
+                continue
+            indexed = {ts: doc for (doc_channel, ts), doc in self._doc_ids.items() if doc_channel == channel}
+            for message in self.store.iter_messages(channel):
+                key = (channel, message["ts"])
+                doc = indexed.pop(message["ts"], None)
+                text = message.get("text", "")
+                if doc is not None and self._texts[doc] == plain_text(text):
+                    continue
+                if doc is not None:
+                    self._remove(doc)  # edited
+                self._add(key, text)
+                added += 1
+            for doc in indexed.values():  # dropped from the store
+                self._remove(doc)
+                removed += 1
+            self._indexed_state[channel] = state
+        if added or removed:
+            logger.info("Indexed %s messages, removed %s (%s total)", added, removed, len(self))
+        return added
+
+    def _add(self, key: tuple[str, str], text: str) -> None:
+        doc = len(self._docs)
+        self._docs.append(key)
+        self._doc_ids[key] = doc
+        tokens = tokenize(text)
+        self._lengths.append(len(tokens))
+        for term, tf in Counter(tokens).items():
+            self._postings[term][doc] = tf
+        self._texts.append(plain_text(text))
+
+    def _remove(self, doc: int) -> None:
+        """Drop `doc` from the postings; its id stays allocated so vector rows keep their positions."""
+        del self._doc_ids[self._docs[doc]]
+        for term in set(tokenize(self._texts[doc])):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(doc, None)
+                if not postings:
+                    del self._postings[term]
+        self._lengths[doc] = 0
+        self._removed.add(doc)
+
+    def _bm25(self, query: str, allowed: set[int] | None) -> Dict[int, float]:
+        n = len(self)
+        avg_len = (sum(self._lengths) / n) if n else 0.0
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc, tf in postings.items():
+                if allowed is not None and doc not in allowed:
+                    continue
+                norm = K1 * (1 - B + B * self._lengths[doc] / (avg_len or 1))
+                scores[doc] += idf * tf * (K1 + 1) / (tf + norm)
+        return scores
+
+    def _cosine(self, query: str, allowed: set[int] | None, k: int) -> Dict[int, float]:
+        import numpy as np
+
+        new = self._texts[self._vectors_for:]
+        if new:
+            vectors = self.embed(new)
+            self._vectors = vectors if self._vectors is None else np.vstack([self._vectors, vectors])
+            self._vectors_for = len(self._texts)
+        if self._vectors is None:
+            return {}
+        sims = self._vectors @ self.embed([query])[0]
+        if allowed is None and self._removed:
+            allowed = set(range(len(self._docs))) - self._removed
+        if allowed is not None:
+            mask = np.full(len(sims), -np.inf, dtype=sims.dtype)
+            idx = np.fromiter(allowed, dtype=np.int64)
+            mask[idx] = sims[idx]
+            sims = mask
+        top = np.argpartition(-sims, min(k, len(sims) - 1))[:k]
+        return {int(doc): float(sims[doc]) for doc in top if sims[doc] > 0}
+
+    def search(self, query: str, k: int = 10, channels: Sequence[str] | None = None,
+               mode: str = "keyword") -> List[SearchHit]:
+        """Top-k messages for `query`; mode is "keyword", "semantic" or "hybrid"."""
+        if mode not in ("keyword", "semantic", "hybrid"):
+            raise ValueError(f"Unknown search mode: {mode}")
+        if mode != "keyword" and self.embed is None:
+            raise ValueError("Semantic search needs numpy (pip install numpy)")
+        allowed = None
+        if channels:
+            wanted = set(channels)
+            allowed = {doc for doc, (channel, _) in enumerate(self._docs)
+                       if channel in wanted and doc not in self._removed}
+
+        if mode == "keyword":
+            scores = self._bm25(query, allowed)
+        elif mode == "semantic":
+            scores = self._cosine(query, allowed, k)
+        else:
+            keyword = self._bm25(query, allowed)
+            semantic = self._cosine(query, allowed, max(k * 5, 50))
+            top_keyword = max(keyword.values(), default=0.0) or 1.0
+            scores = {doc: 0.5 * keyword.get(doc, 0.0) / top_keyword + 0.5 * semantic.get(doc, 0.0)
+                      for doc in set(keyword) | set(semantic)}
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:k]
+        hits = []
+        for doc, score in ranked:
+            channel, ts = self._docs[doc]
+            message = self.store.get(channel, ts)
+            if message is not None:
+                hits.append(SearchHit(channel, ts, score, message))
+        return hits
+
+
+_indexes: Dict[int, SearchIndex] = {}
+
+
+def get_search_index(store: MessageStore) -> SearchIndex:
+    index = _indexes.get(id(store))
+    if index is None or index.store is not store:
+        index = _indexes[id(store)] = SearchIndex(store)
+    return index
@@ -1,7 +1,8 @@
 """Slack-related MCP tools."""
-from typing import Any
+from typing import Any, AsyncIterator, Awaitable, Callable
 from datetime import datetime
 
+import asyncio
 import logging
 import sys
 import os
@@ -9,151 +10,733 @@ import sys
 
 
 from src.utils.utils_mcp import make_slack_request
+from src.tools.user_directory import get_user_directory
+from src.tools.channel_index import CHANNEL_TYPES, get_channel_index
+from src.tools.message_store import HISTORY_START, MessageStore, get_message_store, get_session_store
+from src.tools.search_index import SearchHit, get_search_index
+from src.tools.message_batcher import get_message_batcher, group_texts
+from src.tools.formatting import DEFAULT_MESSAGE_FIELDS, FORMATS, RecordFormatter, truncate_text
+from src.tools.thread_cache import get_thread_cache
+from src.tools.event_ingest import get_event_ingestor
 
 # Set up logger
 logger = logging.getLogger(__name__)
 
 
-async def list_slack_channels(bot_token: str, limit: int = 100) -> str:
+# Slack caps the page size of cursor-paginated methods at 1000 items
+MAX_PAGE_SIZE = 1000
+
+# Page size used when serving history from the local message store
+STORE_PAGE_SIZE = 200
+
+# Called with each formatted page and the running item count, so callers can stream output
+PageCallback = Callable[[str, int], Awaitable[None]]
+
+
+class SlackAPIError(Exception):
+    """A Slack Web API call failed (transport error or `ok: false`)."""
+
+    def __init__(self, error: str):
+        super().__init__(error)
+        self.error = error
+
+
+async def paginate(method: str, bot_token: str, params: dict, items_key: str,
+                   limit: int) -> AsyncIterator[list[dict[str, Any]]]:
+    """Yield pages of `items_key` from a cursor-paginated Slack method until `limit` items.
+
+    The request for the next page is issued before the current page is yielded, so
+    formatting one page overlaps with fetching the next.
+    """
+    def fetch(cursor: str | None, remaining: int) -> asyncio.Future:
+        page_params = dict(params, limit=min(remaining, MAX_PAGE_SIZE))
+        if cursor:
+            page_params["cursor"] = cursor
+        return asyncio.ensure_future(make_slack_request(method, bot_token, params=page_params))
+
+    remaining = limit
+    pending = fetch(None, remaining)
+    try:
+        while pending is not None:
+            data = await pending
+            pending = None
+            if not data or not data.get("ok"):
+                raise SlackAPIError(data.get("error", "unknown error") if data else "unknown error")
+            items = data.get(items_key, [])[:remaining]
+            remaining -= len(items)
+            cursor = (data.get("response_metadata") or {}).get("next_cursor")
+            if cursor and remaining > 0:
+                pending = fetch(cursor, remaining)
+            yield items
+    finally:
+        if pending is not None:
+            pending.cancel()
+
+
+def format_channel(channel: dict[str, Any]) -> str:
+    return f"""
+        Name: #{channel.get('name', 'unknown')}
+        ID: {channel.get('id', 'unknown')}
+        Topic: {channel.get('topic', {}).get('value', 'No topic set')}
+        Members: {channel.get('num_members', 0)}
+        """
+
+
+def format_message(msg: dict[str, Any], user_names: dict[str, str]) -> str:
+    # Convert timestamp to readable format
+    ts = float(msg.get("ts", "0"))
+    dt = datetime.fromtimestamp(ts)
+    time_str = dt.strftime("%Y-%m-%d %H:%M:%S")
+
+    # Get user name
+    user_id = msg.get("user", "Unknown")
+    user_name = user_names.get(user_id, "Unknown User")
+
+    # Format message with reactions if any
+    reactions = msg.get("reactions", [])
+    reaction_str = ""
+    if reactions:
+        reaction_list = [f":{r['name']}: ({r['count']})" for r in reactions]
+        reaction_str = f"\nReactions: {' '.join(reaction_list)}"
+
+    # Format thread info if any
+    thread_str = ""
+    if msg.get("thread_ts") and msg.get("reply_count"):
+        thread_str = f"\nThread: {msg.get('reply_count')} replies"
+
+    return f"""
+Time: {time_str}
+From: {user_name}
+Message: {msg.get('text', '')}{"" if not reaction_str else reaction_str}{"" if not thread_str else thread_str}
+        """
+
+
+def make_formatter(kind: str, output_format: str, fields: list[str] | None, ts_format: str,
+                   truncate: int | None) -> RecordFormatter | None:
+    """RecordFormatter for the compact formats; None for the default text blocks."""
+    if output_format not in FORMATS:
+        raise ValueError(f"Unknown format: {output_format}; choose from {list(FORMATS)}")
+    if output_format == "text":
+        return None
+    return RecordFormatter(kind, output_format, fields, ts_format, truncate)
+
+
+def join_output(lines: list[str], formatter: RecordFormatter | None) -> str:
+    if formatter is None:
+        return "\n---\n".join(lines)
+    header = formatter.header()
+    return "\n".join([header, *lines] if header else lines)
+
+
+async def resolve_channel(bot_token: str, channel: str) -> str | None:
+    """Channel ID for an ID, `name` or `#name`, looked up in the server-side channel index."""
+    channel_id = await get_channel_index(bot_token).resolve(bot_token, channel, make_slack_request)
+    if channel_id is None:
+        logger.warning("Channel not found: %s", channel)
+    return channel_id
+
+
+async def list_slack_channels(bot_token: str, limit: int = 100, on_page: PageCallback | None = None,
+                              output_format: str = "text", fields: list[str] | None = None,
+                              ts_format: str = "iso") -> str:
     """List all channels in the Slack workspace.
 
+    Follows `response_metadata.next_cursor` until `limit` channels have been read.
+
     Args:
         bot_token: Slack bot token
-        limit: Maximum number of channels to return (default 100, max 1000)
+        limit: Maximum number of channels to return (default 100)
+        on_page: Optional callback receiving each formatted page as it arrives
+        output_format: "text" (readable blocks), "jsonl" (one JSON object per channel) or
+            "table" (tab-separated columns with a header row)
+        fields: Columns for jsonl/table (default: id, name, members, topic)
+        ts_format: "iso" or "epoch" for timestamp fields in jsonl/table
 
     Returns:
         Formatted string containing channel information
     """
-    logger.info(f"Listing Slack channels with limit: {limit}")
-    params = {
-        "limit": min(limit, 1000),  # Enforce maximum limit
-        "exclude_archived": True
-    }
-    
-    data = await make_slack_request("conversations.list", bot_token, params=params)
-    
-    if not data or not data.get("ok"):
-        error = data.get("error", "unknown error") if data else "unknown error"
-        logger.warning(f"Failed to list channels: {error}")
-        return f"Failed to list channels: {error}"
-    
-    channels = data.get("channels", [])
-    if not channels:
+    logger.info("Listing Slack channels with limit: %s", limit)
+    try:
+        formatter = make_formatter("channel", output_format, fields, ts_format, None)
+    except ValueError as e:
+        return f"Failed to list channels: {e}"
+    params = {"exclude_archived": True, "types": CHANNEL_TYPES}
+
+    formatted_channels = []
+    try:
+        async for channels in paginate("conversations.list", bot_token, params, "channels", limit):
+            get_channel_index(bot_token).add(channels)
+            if formatter is None:
+                page = [format_channel(channel) for channel in channels]
+            else:
+                page = [formatter.line(channel) for channel in channels]
+            formatted_channels.extend(page)
+            if on_page and page:
+                await on_page(join_output(page, formatter), len(formatted_channels))
+    except SlackAPIError as e:
+        logger.warning("Failed to list channels: %s", e.error)
+        if not formatted_channels:
+            return f"Failed to list channels: {e.error}"
+        if formatter is None:
+            formatted_channels.append(f"\n(stopped after {len(formatted_channels)} channels: {e.error})\n")
+        else:
+            formatted_channels.append(formatter.trailer(e.error, len(formatted_channels)))
+
+    if not formatted_channels:
         logger.info("No channels found")
         return "No channels found in the workspace"
-    
-    formatted_channels = []
-    for channel in channels:
-        channel_info = f"""
-        Name: #{channel.get('name', 'unknown')}
-        ID: {channel.get('id', 'unknown')}
-        Topic: {channel.get('topic', {}).get('value', 'No topic set')}
-        Members: {channel.get('num_members', 0)}
-        """
-        formatted_channels.append(channel_info)
-    
-    logger.info(f"Returning {len(channels)} channels")
-    return "\n---\n".join(formatted_channels)
+
+    logger.info("Returning %s channels", len(formatted_channels))
+    return join_output(formatted_channels, formatter)
+
+
+async def post_message(bot_token: str, channel_id: str, text: str,
+                       thread_ts: str | None = None) -> dict[str, Any] | None:
+    """chat.postMessage to an already resolved channel ID."""
+    json_data = {
+        "channel": channel_id,
+        "text": text
+    }
+    if thread_ts:
+        json_data["thread_ts"] = thread_ts
+    return await make_slack_request("chat.postMessage", bot_token, json_data=json_data, method="POST")
 
 
-async def send_slack_message(bot_token: str, channel_id: str, text: str) -> str:
+async def send_slack_message(bot_token: str, channel_id: str, text: str, batch: bool = False) -> str:
     """Send a message to a Slack channel.
 
     Args:
         bot_token: Slack bot token
-        channel_id: The ID of the channel to send the message to
+        channel_id: The ID of the channel to send the message to, or its name (`#general`)
         text: The message text to send
+        batch: Queue the message and return at once; messages to the same channel within
+            SLACK_SEND_COALESCE_WINDOW seconds are posted together as one post (or thread).
+            A failed batched post is reported by the next batched send to that channel.
 
     Returns:
         Status message indicating success or failure
     """
-    logger.info(f"Sending message to channel: {channel_id}")
-    json_data = {
-        "channel": channel_id,
-        "text": text
-    }
-    
-    data = await make_slack_request("chat.postMessage", bot_token, json_data=json_data, method="POST")
-    
+    logger.info("Sending message to channel: %s", channel_id)
+    channel_id = await resolve_channel(bot_token, channel_id)
+    if channel_id is None:
+        return "Failed to send message: channel_not_found"
+
+    if batch:
+        batcher = get_message_batcher(bot_token)
+        batcher.enqueue(channel_id, text,
+                        lambda channel, body, thread_ts: post_message(bot_token, channel, body, thread_ts))
+        status = f"Message queued; it will be posted within {batcher.window:g}s"
+        error = batcher.take_error(channel_id)
+        if error:
+            status += f" (an earlier batched post to this channel failed: {error})"
+        return status
+
+    data = await post_message(bot_token, channel_id, text)
+
     if not data or not data.get("ok"):
         error = data.get("error", "unknown error") if data else "unknown error"
-        logger.warning(f"Failed to send message: {error}")
+        logger.warning("Failed to send message: %s", error)
         return f"Failed to send message: {error}"
     
-    logger.info(f"Successfully sent message to channel: {channel_id}")
+    logger.info("Successfully sent message to channel: %s", channel_id)
     return "Message sent successfully"
 
 
-async def get_channel_messages(bot_token: str, channel_id: str, limit: int = 50) -> str:
+async def send_slack_messages(bot_token: str, messages: list[dict[str, str]], coalesce: bool = True) -> str:
+    """Send many messages, fanning out to channels concurrently.
+
+    Parallelism across channels is bounded by SLACK_SEND_CONCURRENCY; posts to one channel
+    stay in order and are paced by the rate limiter.
+
+    Args:
+        bot_token: Slack bot token
+        messages: List of {"channel": ID or name, "text": message text}
+        coalesce: Join messages to the same channel into as few posts as possible
+
+    Returns:
+        Summary of how many messages were sent and which failed
+    """
+    logger.info("Sending %s messages", len(messages))
+    names = list(dict.fromkeys(m.get("channel", "") for m in messages))
+    resolved = dict(zip(names, await asyncio.gather(*(resolve_channel(bot_token, n) for n in names))))
+
+    failures = []
+    per_channel: dict[str, list[str]] = {}
+    for m in messages:
+        channel_id = resolved.get(m.get("channel", ""))
+        if channel_id is None:
+            failures.append(f"{m.get('channel')}: channel_not_found")
+            continue
+        per_channel.setdefault(channel_id, []).append(m.get("text", ""))
+
+    max_chars = get_message_batcher(bot_token).max_chars
+    semaphore = asyncio.Semaphore(int(os.environ.get("SLACK_SEND_CONCURRENCY", "8")))
+
+    async def send_channel(channel_id: str, texts: list[str]) -> int:
+        sent = 0
+        groups = group_texts(texts, max_chars) if coalesce else [[text] for text in texts]
+        async with semaphore:
+            for group in groups:
+                data = await post_message(bot_token, channel_id, "\n".join(group))
+                if not data or not data.get("ok"):
+                    error = data.get("error", "unknown error") if data else "unknown error"
+                    failures.append(f"{channel_id}: {error}")
+                    continue
+                sent += len(group)
+        return sent
+
+    counts = await asyncio.gather(*(send_channel(c, texts) for c, texts in per_channel.items()))
+    sent = sum(counts)
+    summary = f"Sent {sent}/{len(messages)} messages to {len(per_channel)} channels"
+    if failures:
+        logger.warning("Failed sends: %s", failures)
+        summary += "\nFailed: " + "; ".join(failures)
+    logger.info(summary)
+    return summary
+
+
+# Serializes store syncs per channel so concurrent reads don't race on the watermark
+_sync_locks: dict[str, asyncio.Lock] = {}
+
+
+async def sync_message_store(store: MessageStore, bot_token: str, channel_id: str, limit: int,
+                             oldest: str | None = None, latest: str | None = None) -> bool:
+    """Bring the local store of `channel_id` up to date for a read of `limit` messages.
+
+    First fetches only messages newer than the channel's watermark (`oldest=` the newest
+    stored ts). Then, if the requested window still holds fewer than `limit` stored
+    messages, backfills older history from where the store's coverage ends. Channels kept
+    current by the event stream (see event_ingest) skip the first step.
+
+    Each step's pages are collected and saved together with the new coverage only once the
+    step's pagination succeeded, so a failed page never leaves stored messages outside the
+    coverage window (which reads would serve with a silent gap).
+
+    The backfill stops after SLACK_MESSAGE_STORE_SYNC_MAX messages; a `latest` far older
+    than the stored history would otherwise download everything in between.
+
+    Returns:
+        True if the store now holds the requested window, False if the backfill stopped
+        short and the caller should read that window from Slack directly
+    """
+    max_sync = int(os.environ.get("SLACK_MESSAGE_STORE_SYNC_MAX", "5000"))
+    base = {"channel": channel_id, "inclusive": False, "include_all_metadata": True}
+    async with _sync_locks.setdefault(channel_id, asyncio.Lock()):
+        coverage = store.coverage(channel_id)
+        if coverage is not None and not get_event_ingestor().is_live(store, channel_id):
+            oldest_ts, newest_ts = coverage
+            synced = []
+            async for messages in paginate("conversations.history", bot_token,
+                                           dict(base, oldest=newest_ts), "messages", max_sync):
+                synced.extend(messages)
+            fetched = [m["ts"] for m in synced if m.get("ts")]
+            if fetched:
+                newest_ts = max(newest_ts, max(fetched))
+                drop_before = None
+                if len(fetched) >= max_sync:
+                    # Messages right after the old watermark may be missing; keep only the contiguous part
+                    oldest_ts = drop_before = min(fetched)
+                store.save_sync(channel_id, synced, oldest_ts, newest_ts, drop_before)
+            logger.info("Synced %s new messages for channel: %s", len(fetched), channel_id)
+
+        backfilled = 0
+        while True:
+            coverage = store.coverage(channel_id)
+            if coverage is not None:
+                oldest_ts, newest_ts = coverage
+                have = store.count(channel_id, oldest, latest)
+                if oldest_ts <= (oldest or HISTORY_START) or have >= limit:
+                    return True
+                params = dict(base, latest=oldest_ts)
+            else:
+                oldest_ts, newest_ts, have = None, HISTORY_START, 0
+                params = dict(base)
+            if backfilled >= max_sync:
+                logger.info("Stopped backfilling %s after %s messages", channel_id, backfilled)
+                return False
+            if oldest:
+                params["oldest"] = oldest
+            wanted = min(max(limit - have, STORE_PAGE_SIZE), max_sync - backfilled)
+            synced = []
+            async for messages in paginate("conversations.history", bot_token, params, "messages", wanted):
+                synced.extend(messages)
+            fetched = [m["ts"] for m in synced if m.get("ts")]
+            if len(fetched) < wanted:
+                oldest_ts = oldest or HISTORY_START  # reached the start of the window
+            else:
+                oldest_ts = min(fetched)
+            store.save_sync(channel_id, synced, oldest_ts, max([newest_ts, *fetched]))
+            backfilled += len(fetched)
+            logger.info("Backfilled %s messages for channel: %s", len(fetched), channel_id)
+
+
+async def stored_pages(store: MessageStore, channel_id: str, limit: int, oldest: str | None = None,
+                       latest: str | None = None) -> AsyncIterator[list[dict[str, Any]]]:
+    """Yield newest-first pages of stored messages, mirroring `paginate`."""
+    before = None
+    while limit > 0:
+        messages = store.read(channel_id, min(limit, STORE_PAGE_SIZE), oldest, latest, before)
+        if not messages:
+            return
+        limit -= len(messages)
+        before = messages[-1]["ts"]
+        yield messages
+
+
+async def fetch_thread_replies(bot_token: str, channel_id: str, parent: dict[str, Any],
+                               wanted: int) -> list[dict[str, Any]]:
+    """Up to `wanted` replies of the thread started by `parent`, oldest first (cached by thread_ts)."""
+    thread_ts = parent["ts"]
+    cache = get_thread_cache()
+    cached = cache.get(channel_id, thread_ts, parent.get("latest_reply"), wanted)
+    if cached is not None:
+        return cached
+    replies = []
+    params = {"channel": channel_id, "ts": thread_ts}
+    # conversations.replies returns the parent first, so ask for one extra message
+    async for messages in paginate("conversations.replies", bot_token, params, "messages", wanted + 1):
+        replies.extend(m for m in messages if m.get("ts") != thread_ts)
+    replies = replies[:wanted]
+    cache.put(channel_id, thread_ts, parent.get("latest_reply"), replies,
+              complete=len(replies) >= parent.get("reply_count", 0))
+    return replies
+
+
+async def expand_threads(bot_token: str, channel_id: str, messages: list[dict[str, Any]],
+                         budget: int) -> tuple[dict[str, list[dict[str, Any]]], int]:
+    """Fetch replies for the thread parents in `messages`, concurrently, within a reply budget.
+
+    Threads are taken in page order, each capped at SLACK_THREAD_MAX_REPLIES, until
+    `budget` replies are allocated; fetches run SLACK_THREAD_CONCURRENCY at a time.
+
+    Returns:
+        ({parent ts: replies}, replies allocated from the budget)
+    """
+    per_thread = int(os.environ.get("SLACK_THREAD_MAX_REPLIES", "20"))
+    plan = []
+    remaining = budget
+    for msg in messages:
+        if remaining <= 0:
+            break
+        if msg.get("reply_count") and msg.get("thread_ts") == msg.get("ts"):
+            wanted = min(msg["reply_count"], per_thread, remaining)
+            plan.append((msg, wanted))
+            remaining -= wanted
+    if not plan:
+        return {}, 0
+
+    semaphore = asyncio.Semaphore(int(os.environ.get("SLACK_THREAD_CONCURRENCY", "4")))
+
+    async def fetch(parent: dict[str, Any], wanted: int) -> list[dict[str, Any]]:
+        async with semaphore:
+            return await fetch_thread_replies(bot_token, channel_id, parent, wanted)
+
+    results = await asyncio.gather(*(fetch(msg, wanted) for msg, wanted in plan), return_exceptions=True)
+    threads = {}
+    for (msg, _), result in zip(plan, results):
+        if isinstance(result, SlackAPIError):
+            logger.warning("Failed to get replies for thread %s: %s", msg['ts'], result.error)
+        elif isinstance(result, BaseException):
+            raise result
+        else:
+            threads[msg["ts"]] = result
+    return threads, budget - remaining
+
+
+def format_replies(parent: dict[str, Any], replies: list[dict[str, Any]], user_names: dict[str, str],
+                   truncate: int | None) -> str:
+    lines = []
+    for reply in replies:
+        time_str = datetime.fromtimestamp(float(reply.get("ts", "0"))).strftime("%Y-%m-%d %H:%M:%S")
+        who = user_names.get(reply.get("user"), "Unknown User")
+        lines.append(f"    ↳ {time_str} {who}: {truncate_text(reply.get('text', ''), truncate)}")
+    more = parent.get("reply_count", 0) - len(replies)
+    if more > 0:
+        lines.append(f"    … {more} more replies")
+    return "\n".join(lines)
+
+
+async def get_channel_messages(bot_token: str, channel_id: str, limit: int = 50,
+                               oldest: str | None = None, latest: str | None = None,
+                               on_page: PageCallback | None = None, output_format: str = "text",
+                               fields: list[str] | None = None, ts_format: str = "iso",
+                               truncate: int | None = None, include_threads: bool = False,
+                               reply_budget: int = 200) -> str:
     """Get recent messages from a Slack channel.
 
+    Follows `response_metadata.next_cursor` until `limit` messages have been read. Each
+    page is formatted as it arrives and its raw messages are dropped. With a local
+    message store configured (SLACK_MESSAGE_STORE), only messages newer than the stored
+    watermark are downloaded and the rest is served from disk.
+
     Args:
         bot_token: Slack bot token
-        channel_id: The ID of the channel to get messages from
-        limit: Maximum number of messages to return (default 50, max 1000)
+        channel_id: The ID of the channel to get messages from, or its name (`#general`)
+        limit: Maximum number of messages to return (default 50)
+        oldest: Only messages after this Unix timestamp (e.g. "1717171717.000000")
+        latest: Only messages before this Unix timestamp
+        on_page: Optional callback receiving each formatted page as it arrives
+        output_format: "text" (readable blocks), "jsonl" (one JSON object per message) or
+            "table" (tab-separated columns with a header row)
+        fields: Columns for jsonl/table (default: ts, user, text, reactions, replies)
+        ts_format: "iso" or "epoch" for timestamp fields in jsonl/table
+        truncate: Cut message text to this many characters
+        include_threads: Fetch thread replies and show them under their parent message
+            (jsonl/table rows then always include is_reply)
+        reply_budget: Max replies fetched across all threads when include_threads is set
 
     Returns:
         Formatted string containing message history
     """
-    logger.info(f"Getting messages from channel: {channel_id}")
-    params = {
-        "channel": channel_id,
-        "limit": min(limit, 1000),  # Enforce maximum limit
-        "inclusive": True,
-        "include_all_metadata": True
-    }
-    
-    data = await make_slack_request("conversations.history", bot_token, params=params)
-    
-    if not data or not data.get("ok"):
-        error = data.get("error", "unknown error") if data else "unknown error"
-        logger.warning(f"Failed to get channel messages: {error}")
-        return f"Failed to get channel messages: {error}"
-    
-    messages = data.get("messages", [])
-    if not messages:
+    logger.info("Getting messages from channel: %s", channel_id)
+    if include_threads and output_format != "text":
+        # Reply rows follow their parent; this column tells them apart from top-level messages
+        fields = list(fields or DEFAULT_MESSAGE_FIELDS)
+        if "is_reply" not in fields:
+            fields.append("is_reply")
+    try:
+        formatter = make_formatter("message", output_format, fields, ts_format, truncate)
+    except ValueError as e:
+        return f"Failed to get channel messages: {e}"
+    channel_id = await resolve_channel(bot_token, channel_id)
+    if channel_id is None:
+        return "Failed to get channel messages: channel_not_found"
+
+    store = get_message_store()
+    in_store = store is not None
+    if store is not None:
+        try:
+            in_store = await sync_message_store(store, bot_token, channel_id, limit, oldest, latest)
+        except SlackAPIError as e:
+            if store.coverage(channel_id) is None:
+                logger.warning("Failed to get channel messages: %s", e.error)
+                return f"Failed to get channel messages: {e.error}"
+            logger.warning("Sync failed, serving stored messages for %s: %s", channel_id, e.error)
+        if not in_store:
+            logger.info("Window is beyond the stored history of %s; reading it from Slack", channel_id)
+    if in_store:
+        pages = stored_pages(store, channel_id, limit, oldest, latest)
+    else:
+        params = {
+            "channel": channel_id,
+            "inclusive": True,
+            "include_all_metadata": True
+        }
+        if oldest:
+            params["oldest"] = oldest
+        if latest:
+            params["latest"] = latest
+        pages = paginate("conversations.history", bot_token, params, "messages", limit)
+
+    directory = get_user_directory(bot_token)
+    formatted_messages = []
+    try:
+        async for messages in pages:
+            threads = {}
+            if include_threads and reply_budget > 0:
+                threads, used = await expand_threads(bot_token, channel_id, messages, reply_budget)
+                reply_budget -= used
+            # Resolve all unique users in the page (cached; misses are fetched concurrently)
+            user_ids = {msg.get("user") for msg in messages if msg.get("user")}
+            user_ids.update(r.get("user") for replies in threads.values() for r in replies if r.get("user"))
+            user_names = await directory.resolve(bot_token, user_ids, make_slack_request)
+            page = []
+            for msg in messages:
+                replies = threads.get(msg.get("ts"))
+                if formatter is None:
+                    text = format_message(dict(msg, text=truncate_text(msg.get("text", ""), truncate)), user_names)
+                    if replies is not None:
+                        text = text.rstrip() + "\n" + format_replies(msg, replies, user_names, truncate)
+                    page.append(text)
+                else:
+                    page.append(formatter.line(msg, user_names))
+                    for reply in replies or []:
+                        reply = dict(reply, thread_ts=reply.get("thread_ts") or msg.get("ts"))
+                        page.append(formatter.line(reply, user_names))
+            formatted_messages.extend(page)
+            if on_page and page:
+                await on_page(join_output(page, formatter), len(formatted_messages))
+    except SlackAPIError as e:
+        logger.warning("Failed to get channel messages: %s", e.error)
+        if not formatted_messages:
+            return f"Failed to get channel messages: {e.error}"
+        if formatter is None:
+            formatted_messages.append(f"\n(stopped after {len(formatted_messages)} messages: {e.error})\n")
+        else:
+            formatted_messages.append(formatter.trailer(e.error, len(formatted_messages)))
+
+    if not formatted_messages:
         logger.info("No messages found in the channel")
         return "No messages found in the channel"
-    
-    # Get user info for all unique users in the messages
+
+    logger.info("Returning %s messages from channel: %s", len(formatted_messages), channel_id)
+    return join_output(formatted_messages, formatter)
+
+
+async def wait_for_messages(bot_token: str, channel_id: str, since: str | None = None,
+                            timeout: float | None = None, limit: int = 50, output_format: str = "text",
+                            fields: list[str] | None = None, ts_format: str = "iso",
+                            truncate: int | None = None) -> str:
+    """Long-poll a channel: return messages newer than `since` as soon as there are any.
+
+    The channel is synced into the local store once. While the event stream is connected
+    (Socket Mode or the Events API route), the call then sleeps until a message event for
+    the channel arrives, making no Slack API calls while it waits. Without the stream the
+    channel is re-synced every SLACK_WAIT_POLL_INTERVAL seconds (default 5).
+
+    Args:
+        bot_token: Slack bot token
+        channel_id: The ID of the channel to watch, or its name (`#general`)
+        since: Only messages after this Slack ts (default: the channel's newest message, i.e.
+            wait for the next one). Pass the returned "Next since" to continue without gaps.
+        timeout: Seconds to wait (default SLACK_WAIT_TIMEOUT, 60; capped at SLACK_WAIT_MAX_TIMEOUT, 300)
+        limit: Maximum number of messages to return, oldest first
+        output_format, fields, ts_format, truncate: As for get_channel_messages
+
+    Returns:
+        The new messages followed by a "Next since: <ts>" line
+    """
+    logger.info("Waiting for messages in channel: %s (since %s)", channel_id, since)
+    try:
+        formatter = make_formatter("message", output_format, fields, ts_format, truncate)
+    except ValueError as e:
+        return f"Failed to wait for messages: {e}"
+    channel_id = await resolve_channel(bot_token, channel_id)
+    if channel_id is None:
+        return "Failed to wait for messages: channel_not_found"
+
+    if timeout is None:
+        timeout = float(os.environ.get("SLACK_WAIT_TIMEOUT", "60"))
+    timeout = max(0.0, min(timeout, float(os.environ.get("SLACK_WAIT_MAX_TIMEOUT", "300"))))
+    poll_interval = float(os.environ.get("SLACK_WAIT_POLL_INTERVAL", "5"))
+    store = get_session_store()
+    ingestor = get_event_ingestor()
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+
+    try:
+        await sync_message_store(store, bot_token, channel_id, limit if since else 1, oldest=since)
+    except SlackAPIError as e:
+        logger.warning("Failed to wait for messages: %s", e.error)
+        return f"Failed to wait for messages: {e.error}"
+    ingestor.mark_live(channel_id)
+    if since is None:
+        newest = store.read(channel_id, 1)
+        since = newest[0]["ts"] if newest else HISTORY_START
+
+    while True:
+        messages = store.read_after(channel_id, since, limit)
+        remaining = deadline - loop.time()
+        if messages or remaining <= 0:
+            break
+        if ingestor.is_live(store, channel_id):
+            await ingestor.wait(channel_id, remaining)
+            continue
+        await asyncio.sleep(min(poll_interval, remaining))
+        try:
+            await sync_message_store(store, bot_token, channel_id, limit, oldest=since)
+        except SlackAPIError as e:
+            logger.warning("Sync failed while waiting for messages in %s: %s", channel_id, e.error)
+        ingestor.mark_live(channel_id)
+
+    if not messages:
+        return f"No new messages after waiting {timeout:.0f}s\nNext since: {since}"
     user_ids = {msg.get("user") for msg in messages if msg.get("user")}
-    user_names = {}
-    
-    for user_id in user_ids:
-        user_data = await make_slack_request("users.info", bot_token, params={"user": user_id})
-        if user_data and user_data.get("ok"):
-            user = user_data.get("user", {})
-            user_names[user_id] = user.get("real_name") or user.get("name", "Unknown")
-    
-    formatted_messages = []
-    for msg in messages:
-        # Convert timestamp to readable format
-        ts = float(msg.get("ts", "0"))
-        dt = datetime.fromtimestamp(ts)
-        time_str = dt.strftime("%Y-%m-%d %H:%M:%S")
-        
-        # Get user name
-        user_id = msg.get("user", "Unknown")
-        user_name = user_names.get(user_id, "Unknown User")
-        
-        # Format message with reactions if any
-        reactions = msg.get("reactions", [])
-        reaction_str = ""
-        if reactions:
-            reaction_list = [f":{r['name']}: ({r['count']})" for r in reactions]
-            reaction_str = f"\nReactions: {' '.join(reaction_list)}"
-        
-        # Format thread info if any
-        thread_str = ""
-        if msg.get("thread_ts") and msg.get("reply_count"):
-            thread_str = f"\nThread: {msg.get('reply_count')} replies"
-        
-        message_text = f"""
-Time: {time_str}
-From: {user_name}
-Message: {msg.get('text', '')}{"" if not reaction_str else reaction_str}{"" if not thread_str else thread_str}
-        """
-        formatted_messages.append(message_text)
-    
-    logger.info(f"Returning {len(messages)} messages from channel: {channel_id}")
-    return "\n---\n".join(formatted_messages)
+    user_names = await get_user_directory(bot_token).resolve(bot_token, user_ids, make_slack_request)
+    if formatter is None:
+        lines = [format_message(dict(msg, text=truncate_text(msg.get("text", ""), truncate)), user_names)
+                 for msg in messages]
+    else:
+        lines = [formatter.line(msg, user_names) for msg in messages]
+    logger.info("Returning %s new messages from channel: %s", len(messages), channel_id)
+    return join_output(lines, formatter) + f"\n\nNext since: {messages[-1]['ts']}"
+
+
+async def search_slack_messages(bot_token: str, query: str, channels: list[str] | None = None,
+                                k: int = 10, mode: str = "keyword") -> str:
+    """Search cached channel history and return only the top-k messages with thread context.
+
+    The searched channels are synced into the message store first (incrementally; the
+    in-memory session store is used when SLACK_MESSAGE_STORE is unset). Without
+    `channels`, every channel the bot is a member of is searched, up to
+    SLACK_SEARCH_MAX_CHANNELS.
+
+    Args:
+        bot_token: Slack bot token
+        query: Words to search for
+        channels: Channel IDs or names to search (default: channels the bot is a member of)
+        k: Number of messages to return (default 10)
+        mode: "keyword" (BM25), "semantic" (embedding cosine, needs numpy) or "hybrid"
+
+    Returns:
+        Formatted string containing the matching messages
+    """
+    logger.info("Searching Slack history for: %r (mode=%s, k=%s)", query, mode, k)
+    store = get_session_store()
+    index = get_channel_index(bot_token)
+    if channels:
+        channel_ids = []
+        for channel in channels:
+            channel_id = await resolve_channel(bot_token, channel)
+            if channel_id is None:
+                return f"Failed to search messages: channel_not_found ({channel})"
+            channel_ids.append(channel_id)
+    else:
+        await index.ensure_fresh(bot_token, make_slack_request)
+        max_channels = int(os.environ.get("SLACK_SEARCH_MAX_CHANNELS", "20"))
+        channel_ids = index.member_channels()[:max_channels]
+        if not channel_ids:
+            return "No channels to search: the bot is not a member of any channel"
+
+    sync_limit = int(os.environ.get("SLACK_SEARCH_SYNC_LIMIT", "1000"))
+    results = await asyncio.gather(
+        *(sync_message_store(store, bot_token, channel_id, sync_limit) for channel_id in channel_ids),
+        return_exceptions=True)
+    for channel_id, result in zip(channel_ids, results):
+        if isinstance(result, SlackAPIError):
+            logger.warning("Could not sync %s for search: %s", channel_id, result.error)
+        elif isinstance(result, BaseException):
+            raise result
+
+    search_index = get_search_index(store)
+    search_index.refresh(channel_ids)
+    try:
+        hits = search_index.search(query, k=k, channels=channel_ids, mode=mode)
+    except ValueError as e:
+        return f"Failed to search messages: {e}"
+    if not hits:
+        return f"No messages found matching: {query}"
+
+    threads = await asyncio.gather(*(thread_context(bot_token, store, hit) for hit in hits))
+    user_ids = {m.get("user") for hit, replies in zip(hits, threads)
+                for m in [hit.message, *replies] if m.get("user")}
+    user_names = await get_user_directory(bot_token).resolve(bot_token, user_ids, make_slack_request)
+
+    formatted = []
+    for hit, replies in zip(hits, threads):
+        name = index.name_for(hit.channel) or hit.channel
+        text = f"Channel: #{name}  (score {hit.score:.2f})" + format_message(hit.message, user_names)
+        for reply in replies:
+            who = user_names.get(reply.get("user"), "Unknown User")
+            text += f"\n    > {who}: {reply.get('text', '')}"
+        formatted.append(text)
+    logger.info("Returning %s search results", len(hits))
+    return "\n---\n".join(formatted)
+
+
+async def thread_context(bot_token: str, store: MessageStore, hit: SearchHit) -> list[dict[str, Any]]:
+    """Parent of a threaded reply, or the first replies of a thread parent."""
+    message = hit.message
+    thread_ts = message.get("thread_ts")
+    if not thread_ts:
+        return []
+    if thread_ts != message.get("ts"):
+        parent = store.get(hit.channel, thread_ts)
+        return [parent] if parent else []
+    if not message.get("reply_count"):
+        return []
+    max_replies = int(os.environ.get("SLACK_SEARCH_THREAD_REPLIES", "5"))
+    try:
+        return await fetch_thread_replies(bot_token, hit.channel, message, max_replies)
+    except SlackAPIError:
+        return []
@@ -0,0 +1,61 @@
+"""Cache of Slack thread replies keyed by (channel, thread_ts)."""
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List
+
+
+class ThreadCache:
+    """LRU cache of conversations.replies results.
+
+    An entry is reused while it is younger than `ttl`, the parent's `latest_reply` has not
+    moved (i.e. nobody replied since), and it holds at least as many replies as requested
+    (or the whole thread).
+
+    Env:
+        SLACK_THREAD_CACHE_TTL: Seconds replies are reused (default 300)
+        SLACK_THREAD_CACHE_SIZE: Max threads kept (default 1000)
+    """
+
+    def __init__(self, ttl: float | None = None, max_threads: int | None = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl if ttl is not None else float(os.environ.get("SLACK_THREAD_CACHE_TTL", "300"))
+        self.max_threads = max_threads if max_threads is not None else int(
+            os.environ.get("SLACK_THREAD_CACHE_SIZE", "1000"))
+        self._clock = clock
+        # (channel, thread_ts) -> (latest_reply, replies, complete, stored_at)
+        self._entries: "OrderedDict[tuple[str, str], tuple[str | None, List[Dict[str, Any]], bool, float]]" = OrderedDict()
+
+    def get(self, channel: str, thread_ts: str, latest_reply: str | None,
+            wanted: int) -> List[Dict[str, Any]] | None:
+        entry = self._entries.get((channel, thread_ts))
+        if entry is None:
+            return None
+        cached_latest, replies, complete, stored_at = entry
+        if self._clock() - stored_at > self.ttl or (latest_reply and latest_reply != cached_latest):
+            del self._entries[(channel, thread_ts)]
+            return None
+        if len(replies) < wanted and not complete:
+            return None
+        self._entries.move_to_end((channel, thread_ts))
+        return replies[:wanted]
+
+    def put(self, channel: str, thread_ts: str, latest_reply: str | None,
+            replies: List[Dict[str, Any]], complete: bool) -> None:
+        self._entries[(channel, thread_ts)] = (latest_reply, replies, complete, self._clock())
+        self._entries.move_to_end((channel, thread_ts))
+        while len(self._entries) > self.max_threads:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+_thread_cache: ThreadCache | None = None
+
+
+def get_thread_cache() -> ThreadCache:
+    global _thread_cache
+    if _thread_cache is None:
+        _thread_cache = ThreadCache()
+    return _thread_cache
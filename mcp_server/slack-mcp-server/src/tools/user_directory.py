@@ -0,0 +1,148 @@
+"""Cached Slack user directory (user id -> display name)."""
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+# Signature of utils_mcp.make_slack_request; passed in by the caller so tests can patch it
+SlackRequest = Callable[..., Awaitable[Optional[Dict[str, Any]]]]
+
+
+def display_name(user: Dict[str, Any]) -> str:
+    """Name shown for a Slack user object (users.info / users.list member)."""
+    return user.get("real_name") or user.get("name", "Unknown")
+
+
+class UserDirectory:
+    """In-memory id -> display name cache for one workspace.
+
+    Cache misses are fetched with concurrent, bounded `users.info` calls. When a single
+    lookup misses on many users at once, the whole directory is also warmed with a paginated
+    `users.list` (one round trip per `page_size` users). The warm-up runs in the background
+    (`warming`), since on a large workspace it can take minutes at Slack's rate limits;
+    the lookup that started it is answered through `users.info`, later ones from the cache.
+
+    Env:
+        SLACK_USER_CACHE_TTL: Seconds a resolved name is kept (default 3600)
+        SLACK_USER_LOOKUP_CONCURRENCY: Max users.info calls in flight (default 8)
+        SLACK_USER_WARMUP_THRESHOLD: Misses in one lookup that trigger a users.list warm-up (default 20)
+    """
+
+    def __init__(self, ttl: float | None = None, concurrency: int | None = None,
+                 warmup_threshold: int | None = None, page_size: int = 200,
+                 clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl if ttl is not None else float(os.environ.get("SLACK_USER_CACHE_TTL", "3600"))
+        self.concurrency = concurrency if concurrency is not None else int(
+            os.environ.get("SLACK_USER_LOOKUP_CONCURRENCY", "8"))
+        self.warmup_threshold = warmup_threshold if warmup_threshold is not None else int(
+            os.environ.get("SLACK_USER_WARMUP_THRESHOLD", "20"))
+        self.page_size = page_size
+        self._clock = clock
+        self._names: Dict[str, Tuple[str, float]] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._warmed_at: float | None = None
+        self._warm_lock = asyncio.Lock()
+        self.warming: asyncio.Task | None = None
+
+    def get(self, user_id: str) -> str | None:
+        """Cached name for `user_id`, or None if unknown or expired."""
+        entry = self._names.get(user_id)
+        if entry is None or self._clock() - entry[1] > self.ttl:
+            return None
+        return entry[0]
+
+    def put(self, user_id: str, name: str) -> None:
+        self._names[user_id] = (name, self._clock())
+
+    def clear(self) -> None:
+        self._names.clear()
+        self._warmed_at = None
+
+    def _missing(self, user_ids: Iterable[str]) -> list[str]:
+        return [u for u in user_ids if self.get(u) is None]
+
+    async def resolve(self, bot_token: str, user_ids: Iterable[str], request: SlackRequest) -> Dict[str, str]:
+        """Return {user_id: display name} for every id that could be resolved."""
+        user_ids = set(user_ids)
+        missing = self._missing(user_ids)
+        warm_expired = self._warmed_at is None or self._clock() - self._warmed_at > self.ttl
+        if len(missing) >= self.warmup_threshold and warm_expired and (self.warming is None or self.warming.done()):
+            self.warming = asyncio.create_task(self._warm_in_background(bot_token, request))
+
+        if missing:
+            logger.info("Resolving %s uncached Slack users", len(missing))
+            semaphore = asyncio.Semaphore(self.concurrency)
+            await asyncio.gather(*(self._fetch(bot_token, u, request, semaphore) for u in missing))
+
+        names = {}
+        for user_id in user_ids:
+            name = self.get(user_id)
+            if name is not None:
+                names[user_id] = name
+        return names
+
+    async def warm(self, bot_token: str, request: SlackRequest) -> int:
+        """Load the whole directory with paginated users.list; returns the number of users cached."""
+        async with self._warm_lock:
+            if self._warmed_at is not None and self._clock() - self._warmed_at <= self.ttl:
+                return 0
+            loaded = 0
+            cursor = None
+            while True:
+                params = {"limit": self.page_size}
+                if cursor:
+                    params["cursor"] = cursor
+                data = await request("users.list", bot_token, params=params)
+                if not data or not data.get("ok"):
+                    error = data.get("error", "unknown error") if data else "unknown error"
+                    logger.warning("Failed to warm user directory: %s", error)
+                    return loaded
+                for member in data.get("members", []):
+                    if member.get("id"):
+                        self.put(member["id"], display_name(member))
+                        loaded += 1
+                cursor = (data.get("response_metadata") or {}).get("next_cursor")
+                if not cursor:
+                    break
+            self._warmed_at = self._clock()
+            logger.info("Warmed user directory with %s users", loaded)
+            return loaded
+
+    async def _warm_in_background(self, bot_token: str, request: SlackRequest) -> None:
+        try:
+            await self.warm(bot_token, request)
+        except Exception:
+            logger.exception("Failed to warm user directory")
+
+    async def _fetch(self, bot_token: str, user_id: str, request: SlackRequest,
+                     semaphore: asyncio.Semaphore) -> None:
+        # Concurrent lookups of the same user share one users.info call
+        pending = self._inflight.get(user_id)
+        if pending is not None:
+            await pending
+            return
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[user_id] = future
+        try:
+            async with semaphore:
+                user_data = await request("users.info", bot_token, params={"user": user_id})
+            if user_data and user_data.get("ok"):
+                self.put(user_id, display_name(user_data.get("user", {})))
+        finally:
+            del self._inflight[user_id]
+            future.set_result(None)
+
+
+# One directory per bot token (i.e. per workspace)
+_directories: Dict[str, UserDirectory] = {}
+
+
+def get_user_directory(bot_token: str) -> UserDirectory:
+    directory = _directories.get(bot_token)
+    if directory is None:
+        directory = _directories[bot_token] = UserDirectory()
+    return directory
@@ -0,0 +1,66 @@
+"""Weather MCP tools backed by the National Weather Service API."""
+from typing import Any
+
+import logging
+
+from src.utils.utils_mcp import NWS_API_BASE, fetch_nws
+from src.tools.nws_cache import get_nws_cache
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+FORECAST_PERIODS = 5
+
+
+def format_alert(feature: dict[str, Any]) -> str:
+    props = feature.get("properties", {})
+    return f"""
+Event: {props.get('event', 'Unknown')}
+Area: {props.get('areaDesc', 'Unknown')}
+Severity: {props.get('severity', 'Unknown')}
+Description: {props.get('description', 'No description available')}
+Instructions: {props.get('instruction', 'No specific instructions provided')}
+"""
+
+
+def format_period(period: dict[str, Any]) -> str:
+    return f"""
+{period.get('name', 'Unknown')}:
+Temperature: {period.get('temperature')}°{period.get('temperatureUnit', '')}
+Wind: {period.get('windSpeed', '')} {period.get('windDirection', '')}
+Forecast: {period.get('detailedForecast', '')}
+"""
+
+
+def points_url(latitude: float, longitude: float) -> str:
+    # NWS accepts at most 4 decimals and redirects non-canonical forms, so normalise once;
+    # this also makes nearby lookups share a cache entry
+    return f"{NWS_API_BASE}/points/{round(latitude, 4)},{round(longitude, 4)}"
+
+
+async def get_alerts(state: str) -> str:
+    """Active alerts for a two-letter US state, cached for as long as NWS allows."""
+    state = state.strip().upper()
+    if len(state) != 2 or not state.isalpha():
+        return f"Invalid state code: {state!r} (use two letters, e.g. CA)"
+    data = await get_nws_cache().fetch(f"{NWS_API_BASE}/alerts/active/area/{state}", fetch_nws)
+    if not data or "features" not in data:
+        return "Unable to fetch alerts or no alerts found."
+    if not data["features"]:
+        return "No active alerts for this state."
+    return "\n---\n".join(format_alert(feature) for feature in data["features"])
+
+
+async def get_forecast(latitude: float, longitude: float) -> str:
+    """Forecast for a location; the lat/lon -> gridpoint lookup is cached for good."""
+    cache = get_nws_cache()
+    points = await cache.fetch(points_url(latitude, longitude), fetch_nws, permanent=True)
+    forecast_url = ((points or {}).get("properties") or {}).get("forecast")
+    if not forecast_url:
+        return "Unable to fetch forecast data for this location."
+
+    forecast = await cache.fetch(forecast_url, fetch_nws)
+    periods = ((forecast or {}).get("properties") or {}).get("periods")
+    if not periods:
+        return "Unable to fetch detailed forecast."
+    return "\n---\n".join(format_period(period) for period in periods[:FORECAST_PERIODS])
@@ -0,0 +1,173 @@
+"""Client-side scheduling for Slack's per-method rate limits.
+
+Slack assigns every Web API method a tier (https://api.slack.com/docs/rate-limits):
+
+    Tier 1:   1+ requests/minute      Tier 3:  50+ requests/minute
+    Tier 2:  20+ requests/minute      Tier 4: 100+ requests/minute
+
+and chat.postMessage is limited to about one message per second per channel. Each
+method (and channel, for chat.postMessage) gets a token bucket refilled at its tier rate.
+Callers reserve a token and sleep until it is theirs, so a burst is spread out in arrival
+order instead of tripping 429s. A 429 `Retry-After` pauses the bucket for everyone.
+"""
+import asyncio
+import logging
+import os
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+# Requests per minute for each tier
+TIER_RATES = {1: 1, 2: 20, 3: 50, 4: 100}
+
+METHOD_TIERS = {
+    "auth.test": 4,
+    "chat.postMessage": "post",
+    "conversations.history": 3,
+    "conversations.info": 3,
+    "conversations.list": 2,
+    "conversations.members": 4,
+    "conversations.replies": 3,
+    "users.info": 4,
+    "users.list": 2,
+}
+DEFAULT_TIER = 3
+
+# chat.postMessage: ~1 per second per channel, with a short burst allowance
+POST_MESSAGE_RATE = 60
+POST_MESSAGE_BURST = 3
+
+
+class RateLimitTimeout(Exception):
+    """Waiting for a rate-limit slot would exceed the caller's deadline."""
+
+    def __init__(self, key: str, wait: float):
+        super().__init__(f"rate limit for {key} needs a {wait:.1f}s wait")
+        self.key = key
+        self.wait = wait
+
+
+class TokenBucket:
+    """Token bucket that hands out reservations; waiters are served in arrival order."""
+
+    def __init__(self, per_minute: float, burst: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = per_minute / 60.0
+        self.capacity = burst
+        self._clock = clock
+        self._tokens = burst
+        self._updated = clock()
+
+    def _refill(self, now: float) -> None:
+        # _updated lies in the future while the bucket is paused by block()
+        if now > self._updated:
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+    def reserve(self, max_wait: float | None = None) -> float:
+        """Take a token and return how long to sleep before using it.
+
+        Raises RateLimitTimeout, without taking a token, if that is longer than `max_wait`.
+        """
+        now = self._clock()
+        self._refill(now)
+        wait = max(0.0, self._updated - now) + max(0.0, (1 - self._tokens) / self.rate)
+        if max_wait is not None and wait > max_wait:
+            raise RateLimitTimeout("bucket", wait)
+        self._tokens -= 1
+        return wait
+
+    def block(self, seconds: float) -> None:
+        """Pause the bucket (Slack answered 429 with Retry-After: seconds)."""
+        now = self._clock()
+        self._refill(now)
+        self._tokens = min(self._tokens, 1.0)
+        self._updated = max(self._updated, now + seconds)
+
+
+class RateLimiter:
+    """Per-method (and per-channel for chat.postMessage) token buckets plus throttling metrics.
+
+    `share` scales every bucket's rate; N server processes on one token each take 1/N.
+
+    Env:
+        SLACK_RATE_LIMIT_SHARE: Fraction of Slack's published rates this process uses (default 1)
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic, sleep=asyncio.sleep,
+                 share: float | None = None):
+        self.share = share if share is not None else float(os.environ.get("SLACK_RATE_LIMIT_SHARE", "1"))
+        self._clock = clock
+        self._sleep = sleep
+        self._buckets: Dict[str, TokenBucket] = {}
+        self.throttled_seconds: Dict[str, float] = defaultdict(float)
+        self.throttled_calls: Dict[str, int] = defaultdict(int)
+        self.rate_limited: Dict[str, int] = defaultdict(int)
+        self.timeouts: Dict[str, int] = defaultdict(int)
+
+    @staticmethod
+    def bucket_key(method: str, channel: str | None = None) -> str:
+        if METHOD_TIERS.get(method) == "post" and channel:
+            return f"{method}:{channel}"
+        return method
+
+    def bucket(self, key: str) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            tier = METHOD_TIERS.get(key.split(":", 1)[0], DEFAULT_TIER)
+            if tier == "post":
+                bucket = TokenBucket(POST_MESSAGE_RATE * self.share,
+                                     max(1, POST_MESSAGE_BURST * self.share), self._clock)
+            else:
+                per_minute = TIER_RATES[tier] * self.share
+                bucket = TokenBucket(per_minute, max(1, per_minute // 6), self._clock)
+            self._buckets[key] = bucket
+        return bucket
+
+    async def acquire(self, key: str, max_wait: float | None = None) -> float:
+        """Wait for a slot in `key`'s bucket; returns the time spent waiting."""
+        try:
+            wait = self.bucket(key).reserve(max_wait)
+        except RateLimitTimeout as e:
+            self.timeouts[key] += 1
+            raise RateLimitTimeout(key, e.wait) from None
+        if wait > 0:
+            self.throttled_calls[key] += 1
+            self.throttled_seconds[key] += wait
+            logger.debug("Throttling %s for %.2fs", key, wait)
+            await self._sleep(wait)
+        return wait
+
+    def on_rate_limited(self, key: str, retry_after: float) -> None:
+        self.rate_limited[key] += 1
+        logger.warning("Slack rate limited %s; pausing for %.1fs", key, retry_after)
+        self.bucket(key).block(retry_after)
+
+    def metrics(self) -> Dict[str, Any]:
+        keys = set(self.throttled_calls) | set(self.rate_limited) | set(self.timeouts)
+        return {
+            key: {
+                "throttled_calls": self.throttled_calls.get(key, 0),
+                "throttled_seconds": round(self.throttled_seconds.get(key, 0.0), 3),
+                "rate_limited": self.rate_limited.get(key, 0),
+                "timeouts": self.timeouts.get(key, 0),
+            }
+            for key in sorted(keys)
+        }
+
+
+_rate_limiter: RateLimiter | None = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    global _rate_limiter
+    if _rate_limiter is None:
+        _rate_limiter = RateLimiter()
+    return _rate_limiter
+
+
+def max_wait() -> float:
+    """Longest a request may queue for a rate-limit slot (SLACK_RATE_LIMIT_MAX_WAIT, default 30s)."""
+    return float(os.environ.get("SLACK_RATE_LIMIT_MAX_WAIT", "30"))
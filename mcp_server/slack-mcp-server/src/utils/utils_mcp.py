@@ -1,9 +1,15 @@
 """Utility functions for MCP tools."""
+from collections import OrderedDict
 from typing import Any
 
 import httpx
 
+import importlib.util
 import logging
+import os
+import time
+
+from src.utils.rate_limiter import RateLimitTimeout, get_rate_limiter, max_wait
 
 # Set up logger
 logger = logging.getLogger(__name__)
@@ -13,46 +19,182 @@ NWS_API_BASE = "https://api.weather.gov"
 SLACK_API_BASE = "https://slack.com/api"
 USER_AGENT = "MCP-Slack-Server/1.0"
 
+# Process-wide HTTP client shared by every Slack/NWS request (see init_http_client)
+_http_client: httpx.AsyncClient | None = None
+
+# NWS url -> (ETag, Last-Modified, parsed body) for conditional requests (see fetch_nws)
+_nws_validators: "OrderedDict[str, tuple[str | None, str | None, Any]]" = OrderedDict()
+
+
+def create_http_client(**overrides: Any) -> httpx.AsyncClient:
+    """Build the shared client from the environment.
+
+    Env:
+        SLACK_HTTP_MAX_CONNECTIONS: Max open connections in the pool (default 100)
+        SLACK_HTTP_MAX_KEEPALIVE: Max idle keep-alive connections (default 20)
+        SLACK_HTTP_KEEPALIVE_EXPIRY: Seconds an idle connection is kept (default 30)
+        SLACK_HTTP_TIMEOUT: Request timeout in seconds (default 30)
+        SLACK_HTTP2: Enable HTTP/2 when the `h2` package is installed (default false)
+    """
+    http2 = os.environ.get("SLACK_HTTP2", "false").lower() in ("1", "true", "yes")
+    if http2 and importlib.util.find_spec("h2") is None:
+        logger.warning("SLACK_HTTP2 is set but the 'h2' package is not installed "
+                       "(pip install 'httpx[http2]'); falling back to HTTP/1.1")
+        http2 = False
+    options: dict[str, Any] = {
+        "limits": httpx.Limits(
+            max_connections=int(os.environ.get("SLACK_HTTP_MAX_CONNECTIONS", "100")),
+            max_keepalive_connections=int(os.environ.get("SLACK_HTTP_MAX_KEEPALIVE", "20")),
+            keepalive_expiry=float(os.environ.get("SLACK_HTTP_KEEPALIVE_EXPIRY", "30")),
+        ),
+        "timeout": float(os.environ.get("SLACK_HTTP_TIMEOUT", "30")),
+        "http2": http2,
+    }
+    options.update(overrides)
+    return httpx.AsyncClient(**options)
+
+
+async def init_http_client(**overrides: Any) -> httpx.AsyncClient:
+    """Create the shared client; called once on server startup."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = create_http_client(**overrides)
+        logger.info("Shared HTTP client started")
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the shared client and its connection pool; called on server shutdown."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+        logger.info("Shared HTTP client closed")
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared client, creating it on first use when the server lifespan has not."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = create_http_client()
+    return _http_client
+
+
+def parse_retry_after(value: str | None, default: float = 1.0) -> float:
+    """Seconds from a Retry-After header (Slack always sends delta-seconds)."""
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return default
+
 
 async def make_slack_request(endpoint: str, bot_token: str, params: dict = None, json_data: dict = None, method: str = "GET") -> dict[str, Any] | None:
-    """Make a request to the Slack API with proper error handling."""
-    logger.debug(f"Making {method} request to Slack API: {endpoint}")
+    """Make a request to the Slack API with proper error handling.
+
+    Requests are paced by the per-method rate limiter. A 429 pauses the method's bucket
+    for `Retry-After` seconds and the request is retried. If no slot frees up within
+    SLACK_RATE_LIMIT_MAX_WAIT, `{"ok": False, "error": "ratelimited"}` is returned.
+    """
+    logger.debug("Making %s request to Slack API: %s", method, endpoint)
     headers = {
         "Authorization": f"Bearer {bot_token}",
         "Content-Type": "application/json; charset=utf-8"
     }
-    url = f"{SLACK_API_BASE}/{endpoint}"
-    
-    async with httpx.AsyncClient() as client:
+    url = f"{os.environ.get('SLACK_API_BASE', SLACK_API_BASE)}/{endpoint}"
+
+    client = get_http_client()
+    limiter = get_rate_limiter()
+    key = limiter.bucket_key(endpoint, (json_data or params or {}).get("channel"))
+    deadline = time.monotonic() + max_wait()
+    while True:
+        try:
+            await limiter.acquire(key, max_wait=deadline - time.monotonic())
+        except RateLimitTimeout as e:
+            logger.warning("Giving up on Slack API: %s - %s", endpoint, e)
+            return {"ok": False, "error": "ratelimited"}
         try:
             if method == "GET":
-                response = await client.get(url, headers=headers, params=params, timeout=30.0)
+                response = await client.get(url, headers=headers, params=params)
             else:  # POST
-                response = await client.post(url, headers=headers, json=json_data, timeout=30.0)
+                response = await client.post(url, headers=headers, json=json_data)
+            if response.status_code == 429:
+                limiter.on_rate_limited(key, parse_retry_after(response.headers.get("Retry-After")))
+                continue
             response.raise_for_status()
-            logger.debug(f"Successfully received response from Slack API: {endpoint}")
+            logger.debug("Successfully received response from Slack API: %s", endpoint)
             return response.json()
         except Exception as e:
-            logger.error(f"Error making request to Slack API: {endpoint} - Error: {str(e)}")
+            logger.error("Error making request to Slack API: %s - Error: %s", endpoint, e)
             return None
 
 
-async def make_nws_request(url: str) -> dict[str, Any] | None:
-    """Make a request to the NWS API with proper error handling."""
-    logger.debug(f"Making request to NWS API: {url}")
-    headers = {
+async def nws_response(url: str, headers: dict[str, str] | None = None) -> httpx.Response | None:
+    """GET an NWS API URL on the shared client; the raw response (200 or 304) or None on error."""
+    logger.debug("Making request to NWS API: %s", url)
+    request_headers = {
         "User-Agent": USER_AGENT,
-        "Accept": "application/geo+json"
+        "Accept": "application/geo+json",
+        **(headers or {}),
     }
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(url, headers=headers, timeout=30.0)
+    client = get_http_client()
+    try:
+        response = await client.get(url, headers=request_headers)
+        if response.status_code != 304:  # raise_for_status treats 304 as a redirect
             response.raise_for_status()
-            logger.debug(f"Successfully received response from NWS API: {url}")
-            return response.json()
-        except Exception as e:
-            logger.error(f"Error making request to NWS API: {url} - Error: {str(e)}")
-            return None
+        logger.debug("Successfully received response from NWS API: %s (%s)", url, response.status_code)
+        return response
+    except Exception as e:
+        logger.error("Error making request to NWS API: %s - Error: %s", url, e)
+        return None
+
+
+async def fetch_nws(url: str) -> tuple[Any, httpx.Headers] | None:
+    """Parsed JSON and response headers for an NWS URL, or None on error.
+
+    When an earlier response carried an ETag or Last-Modified, the request is sent with
+    If-None-Match / If-Modified-Since. A 304 then returns the body parsed last time, without
+    downloading or parsing the GeoJSON again. The 304's headers (fresh Cache-Control) are returned.
+
+    Env:
+        NWS_VALIDATOR_CACHE_SIZE: URLs whose validators and body are kept (default 256)
+    """
+    stored = _nws_validators.get(url)
+    conditional = {}
+    if stored is not None:
+        etag, last_modified, _ = stored
+        if etag:
+            conditional["If-None-Match"] = etag
+        if last_modified:
+            conditional["If-Modified-Since"] = last_modified
+
+    response = await nws_response(url, conditional)
+    if response is None:
+        return None
+    if response.status_code == 304 and stored is not None:
+        logger.debug("NWS response not modified: %s", url)
+        _nws_validators.move_to_end(url)
+        return stored[2], response.headers
+    try:
+        data = response.json()
+    except ValueError as e:
+        logger.error("Invalid JSON from NWS API: %s - Error: %s", url, e)
+        return None
+
+    etag, last_modified = response.headers.get("etag"), response.headers.get("last-modified")
+    if etag or last_modified:
+        _nws_validators[url] = (etag, last_modified, data)
+        _nws_validators.move_to_end(url)
+        while len(_nws_validators) > int(os.environ.get("NWS_VALIDATOR_CACHE_SIZE", "256")):
+            _nws_validators.popitem(last=False)
+    else:
+        _nws_validators.pop(url, None)
+    return data, response.headers
+
+
+async def make_nws_request(url: str) -> dict[str, Any] | None:
+    """Make a request to the NWS API with proper error handling."""
+    result = await fetch_nws(url)
+    return result[0] if result is not None else None
 
 
 if __name__ == "__main__":